@@ -2,9 +2,7 @@ from logging.config import fileConfig
 import sys
 import os
 
-from sqlalchemy import pool
 from app.models import collection, item, package, suite, testimonial
-from sqlalchemy.ext.asyncio import create_async_engine
 from app.config import get_settings
 
 
@@ -12,7 +10,7 @@ from alembic import context
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
-from app.database import Base
+from app.database import Base, build_engine
 from app.config import (
     get_settings,
 )
@@ -67,10 +65,8 @@ def run_migrations_online() -> None:
     and associate a connection with the context.
 
     """
-    connectable = create_async_engine(
-        database_url,
-        poolclass=pool.NullPool,
-    )
+    # Unpooled and without the API's statement timeout
+    connectable = build_engine(pooled=False, statement_timeout_ms=0)
 
     import asyncio
 
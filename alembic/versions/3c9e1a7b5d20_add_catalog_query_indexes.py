@@ -0,0 +1,80 @@
+"""add indexes for catalog foreign keys, ordering and filter columns
+
+Revision ID: 3c9e1a7b5d20
+Revises: 1f2a5d9c4b7e
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "3c9e1a7b5d20"
+down_revision: Union[str, None] = "1f2a5d9c4b7e"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Every ordering in app/crud uses id as a tie-breaker for keyset pagination,
+# so ordering indexes end in id. Btrees are scanned backwards for DESC sorts.
+INDEXES = [
+    # also serves selectinload(Collection.items) and FK cascade deletes
+    (
+        "ix_items_collection_id_created_at",
+        "items",
+        ["collection_id", "created_at", "id"],
+    ),
+    ("ix_items_created_at", "items", ["created_at", "id"]),
+    ("ix_items_category_created_at", "items", ["category", "created_at", "id"]),
+    ("ix_collections_suite_id", "collections", ["suite_id"]),
+    ("ix_collections_display_order", "collections", ["display_order", "id"]),
+    ("ix_packages_display_order", "packages", ["display_order", "id"]),
+    ("ix_testimonials_display_order", "testimonials", ["display_order", "id"]),
+    (
+        "ix_testimonials_rating",
+        "testimonials",
+        [sa.text("rating DESC"), "display_order"],
+    ),
+]
+
+
+# An interrupted concurrent build leaves an INVALID index behind, which IF
+# NOT EXISTS would keep; those are dropped and built again.
+INVALID_INDEX = sa.text(
+    "SELECT NOT indisvalid FROM pg_index WHERE indexrelid = to_regclass(:name)"
+)
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block; it
+    # builds the index without taking a write lock on the table.
+    with op.get_context().autocommit_block():
+        bind = op.get_bind()
+        for name, table, columns in INDEXES:
+            if bind.scalar(INVALID_INDEX, {"name": name}):
+                op.drop_index(
+                    name,
+                    table_name=table,
+                    if_exists=True,
+                    postgresql_concurrently=True,
+                )
+            op.create_index(
+                name,
+                table,
+                columns,
+                if_not_exists=True,
+                postgresql_concurrently=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(
+                name,
+                table_name=table,
+                if_exists=True,
+                postgresql_concurrently=True,
+            )
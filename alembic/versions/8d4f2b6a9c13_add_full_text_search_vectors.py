@@ -0,0 +1,77 @@
+"""add generated full-text search vectors with GIN indexes
+
+Revision ID: 8d4f2b6a9c13
+Revises: 3c9e1a7b5d20
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from app.db_types import weighted_vector_sql
+
+# revision identifiers, used by Alembic.
+revision: str = "8d4f2b6a9c13"
+down_revision: Union[str, None] = "3c9e1a7b5d20"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SEARCH_VECTORS = [
+    (
+        "items",
+        weighted_vector_sql(
+            ("name", "A"),
+            ("description", "B"),
+            ("fabric", "C"),
+            ("fabric_composition", "C"),
+        ),
+    ),
+    ("packages", weighted_vector_sql(("name", "A"))),
+    (
+        "testimonials",
+        weighted_vector_sql(("client_name", "A"), ("review_text", "B")),
+    ),
+]
+
+
+def upgrade() -> None:
+    # Adding a STORED generated column rewrites the table; the catalog
+    # tables are small enough for that to be brief.
+    for table, expression in SEARCH_VECTORS:
+        op.add_column(
+            table,
+            sa.Column(
+                "search_vector",
+                postgresql.TSVECTOR(),
+                sa.Computed(expression, persisted=True),
+                nullable=True,
+            ),
+        )
+
+    with op.get_context().autocommit_block():
+        for table, _ in SEARCH_VECTORS:
+            op.create_index(
+                f"ix_{table}_search_vector",
+                table,
+                ["search_vector"],
+                postgresql_using="gin",
+                if_not_exists=True,
+                postgresql_concurrently=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for table, _ in reversed(SEARCH_VECTORS):
+            op.drop_index(
+                f"ix_{table}_search_vector",
+                table_name=table,
+                if_exists=True,
+                postgresql_concurrently=True,
+            )
+    for table, _ in reversed(SEARCH_VECTORS):
+        op.drop_column(table, "search_vector")
@@ -0,0 +1,162 @@
+"""add trigger-maintained item facet counts and facet filter indexes
+
+Revision ID: b5e7c1d9a2f4
+Revises: 8d4f2b6a9c13
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "b5e7c1d9a2f4"
+down_revision: Union[str, None] = "8d4f2b6a9c13"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Facet values of one item; ("_all", "") counts the item itself so the
+# unfiltered total is a primary key lookup as well.
+FACET_VALUES_FUNCTION = """
+CREATE OR REPLACE FUNCTION item_facet_values(
+    category categoryenum, fabric varchar, colors varchar[], sizes varchar[]
+)
+RETURNS TABLE (facet varchar, value varchar) AS $$
+    SELECT '_all', ''
+    UNION SELECT 'category', category::text WHERE category IS NOT NULL
+    UNION SELECT 'fabric', fabric WHERE fabric IS NOT NULL
+    UNION SELECT 'colors', v FROM unnest(colors) AS v WHERE v IS NOT NULL
+    UNION SELECT 'sizes', v FROM unnest(sizes) AS v WHERE v IS NOT NULL
+$$ LANGUAGE sql IMMUTABLE;
+"""
+
+# Statement-level triggers over transition tables apply one aggregated delta
+# per facet value and statement, so bulk writes don't upsert the same
+# counter rows once per item. Updates that leave the faceted columns alone
+# net out to zero and write nothing.
+APPLY_DELTAS = """
+        INSERT INTO item_facet_counts AS c (facet, value, item_count)
+        SELECT f.facet, f.value, sum(changed.delta)
+        FROM ({source}) AS changed
+        CROSS JOIN LATERAL item_facet_values(
+            changed.category, changed.fabric, changed.colors, changed.sizes
+        ) AS f
+        GROUP BY f.facet, f.value
+        HAVING sum(changed.delta) <> 0
+        -- a stable lock order keeps concurrent item writes from deadlocking
+        ORDER BY f.facet, f.value
+        ON CONFLICT (facet, value)
+        DO UPDATE SET item_count = c.item_count + EXCLUDED.item_count;
+"""
+OLD_ROWS = "SELECT category, fabric, colors, sizes, -1 AS delta FROM old_rows"
+NEW_ROWS = "SELECT category, fabric, colors, sizes, 1 AS delta FROM new_rows"
+
+STATEMENT_TRIGGER_FUNCTION = f"""
+CREATE OR REPLACE FUNCTION items_facet_counts_statement() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+{APPLY_DELTAS.format(source=NEW_ROWS)}
+    ELSIF TG_OP = 'DELETE' THEN
+{APPLY_DELTAS.format(source=OLD_ROWS)}
+    ELSE
+{APPLY_DELTAS.format(source=f"{OLD_ROWS} UNION ALL {NEW_ROWS}")}
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+TRUNCATE_TRIGGER_FUNCTION = """
+CREATE OR REPLACE FUNCTION items_facet_counts_truncate() RETURNS trigger AS $$
+BEGIN
+    TRUNCATE item_facet_counts;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+# Postgres allows transition tables only on single-event triggers
+TRIGGERS = [
+    ("items_facet_counts_insert", "INSERT", "REFERENCING NEW TABLE AS new_rows"),
+    (
+        "items_facet_counts_update",
+        "UPDATE",
+        "REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows",
+    ),
+    ("items_facet_counts_delete", "DELETE", "REFERENCING OLD TABLE AS old_rows"),
+]
+
+BACKFILL = """
+INSERT INTO item_facet_counts (facet, value, item_count)
+SELECT f.facet, f.value, count(*)
+FROM items
+CROSS JOIN LATERAL item_facet_values(
+    items.category, items.fabric, items.colors, items.sizes
+) AS f
+GROUP BY f.facet, f.value
+"""
+
+INDEXES = [
+    ("ix_items_colors", ["colors"], "gin"),
+    ("ix_items_sizes", ["sizes"], "gin"),
+    ("ix_items_fabric", ["fabric"], None),
+    ("ix_items_price", ["price", "id"], None),
+]
+
+
+def upgrade() -> None:
+    op.create_table(
+        "item_facet_counts",
+        sa.Column("facet", sa.String(length=20), nullable=False),
+        sa.Column("value", sa.String(length=255), nullable=False),
+        sa.Column("item_count", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("facet", "value"),
+    )
+    op.execute(FACET_VALUES_FUNCTION)
+    op.execute(STATEMENT_TRIGGER_FUNCTION)
+    op.execute(TRUNCATE_TRIGGER_FUNCTION)
+    for name, event, transition_tables in TRIGGERS:
+        op.execute(
+            f"CREATE TRIGGER {name} AFTER {event} ON items {transition_tables} "
+            "FOR EACH STATEMENT EXECUTE FUNCTION items_facet_counts_statement()"
+        )
+    op.execute(
+        "CREATE TRIGGER items_facet_counts_truncate "
+        "AFTER TRUNCATE ON items "
+        "FOR EACH STATEMENT EXECUTE FUNCTION items_facet_counts_truncate()"
+    )
+    op.execute(BACKFILL)
+
+    with op.get_context().autocommit_block():
+        for name, columns, using in INDEXES:
+            op.create_index(
+                name,
+                "items",
+                columns,
+                postgresql_using=using,
+                if_not_exists=True,
+                postgresql_concurrently=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, _, _ in reversed(INDEXES):
+            op.drop_index(
+                name,
+                table_name="items",
+                if_exists=True,
+                postgresql_concurrently=True,
+            )
+    op.execute("DROP TRIGGER IF EXISTS items_facet_counts_truncate ON items")
+    for name, _, _ in reversed(TRIGGERS):
+        op.execute(f"DROP TRIGGER IF EXISTS {name} ON items")
+    op.execute("DROP FUNCTION IF EXISTS items_facet_counts_truncate()")
+    op.execute("DROP FUNCTION IF EXISTS items_facet_counts_statement()")
+    op.execute(
+        "DROP FUNCTION IF EXISTS "
+        "item_facet_values(categoryenum, varchar, varchar[], varchar[])"
+    )
+    op.drop_table("item_facet_counts")
@@ -0,0 +1,36 @@
+"""add items.image_variants for image derivatives
+
+Revision ID: c4a8e2f6b1d3
+Revises: b5e7c1d9a2f4
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "c4a8e2f6b1d3"
+down_revision: Union[str, None] = "b5e7c1d9a2f4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # A constant default, so Postgres adds the column without rewriting items
+    op.add_column(
+        "items",
+        sa.Column(
+            "image_variants",
+            postgresql.JSONB(),
+            nullable=False,
+            server_default=sa.text("'{}'::jsonb"),
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("items", "image_variants")
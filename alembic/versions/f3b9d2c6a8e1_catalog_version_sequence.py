@@ -0,0 +1,79 @@
+"""keep the catalog version in a sequence instead of a single row
+
+Revision ID: f3b9d2c6a8e1
+Revises: d1e5f8a3b7c9
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "f3b9d2c6a8e1"
+down_revision: Union[str, None] = "d1e5f8a3b7c9"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# nextval takes no lock, so catalog writes no longer queue up behind the row
+# lock the UPDATE held until commit. But it is not transactional either: the
+# new last_value is visible before the write commits. Readers therefore go
+# by the notification, which Postgres delivers only on commit (and never
+# for a rolled-back write), not by last_value. Still one bump per statement:
+# the triggers are unchanged.
+BUMP_FUNCTION = """
+CREATE OR REPLACE FUNCTION bump_catalog_version() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_notify(
+        'catalog_version', nextval('catalog_version_seq')::text
+    );
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+ROW_BUMP_FUNCTION = """
+CREATE OR REPLACE FUNCTION bump_catalog_version() RETURNS trigger AS $$
+BEGIN
+    UPDATE catalog_version SET version = version + 1, updated_at = now()
+    WHERE id = 1;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+
+def upgrade() -> None:
+    op.execute(sa.schema.CreateSequence(sa.Sequence("catalog_version_seq")))
+    # Carry the version on, so clients keyed on it see it keep going up. Marked
+    # as called: otherwise the first nextval would return last_value unchanged.
+    op.execute(
+        "SELECT setval('catalog_version_seq', "
+        "GREATEST((SELECT version FROM catalog_version WHERE id = 1), 1))"
+    )
+    op.execute(BUMP_FUNCTION)
+    op.drop_table("catalog_version")
+
+
+def downgrade() -> None:
+    op.create_table(
+        "catalog_version",
+        sa.Column("id", sa.SmallInteger(), autoincrement=False, nullable=False),
+        sa.Column("version", sa.BigInteger(), nullable=False),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.CheckConstraint("id = 1", name="ck_catalog_version_single_row"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.execute(
+        "INSERT INTO catalog_version (id, version) "
+        "SELECT 1, last_value FROM catalog_version_seq"
+    )
+    op.execute(ROW_BUMP_FUNCTION)
+    op.execute(sa.schema.DropSequence(sa.Sequence("catalog_version_seq")))
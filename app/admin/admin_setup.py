@@ -6,12 +6,12 @@ from starlette.responses import Response
 from starlette_admin import I18nConfig
 from starlette_admin.contrib.sqla import Admin
 from starlette_admin.auth import AuthProvider, login_not_required
-from sqlalchemy.ext.asyncio import create_async_engine
 
+from app.assets import asset_url
 from app.config import settings
 
-# Database engine for admin
-async_engine = create_async_engine(settings.async_database_url, echo=True)
+# The admin shares the application's engine and connection pool
+from app.database import engine as async_engine
 
 
 class SimpleAuthProvider(AuthProvider):
@@ -68,6 +68,6 @@ admin = Admin(
     title="Clothing Brand Admin",
     auth_provider=SimpleAuthProvider(),
     i18n_config=I18nConfig(default_locale="en"),
-    logo_url=settings.ADMIN_LOGO_URL,
-    login_logo_url=settings.ADMIN_LOGIN_LOGO_URL,
+    logo_url=asset_url(settings.ADMIN_LOGO_URL),
+    login_logo_url=asset_url(settings.ADMIN_LOGIN_LOGO_URL),
 )
@@ -3,9 +3,28 @@ from starlette_admin import DropDown
 from starlette_admin.fields import TextAreaField
 
 from app.models import Suite, Collection, Item, Package, Testimonial
+from app.cache import CATALOG_NAMESPACES, invalidate
 
 
-class SuiteView(ModelView):
+class CachedModelView(ModelView):
+    """
+    ModelView that drops the API read cache after admin writes, since
+    starlette_admin commits through its own session and skips the CRUD layer.
+    """
+
+    cache_namespaces = CATALOG_NAMESPACES
+
+    async def after_create(self, request, obj):
+        invalidate(self.cache_namespaces)
+
+    async def after_edit(self, request, obj):
+        invalidate(self.cache_namespaces)
+
+    async def after_delete(self, request, obj):
+        invalidate(self.cache_namespaces)
+
+
+class SuiteView(CachedModelView):
     """
     Admin view for Suite management
     """
@@ -24,7 +43,7 @@ class SuiteView(ModelView):
     sortable_fields = ["name", "created_at"]
 
 
-class CollectionView(ModelView):
+class CollectionView(CachedModelView):
     """
     Admin view for Collection management
     """
@@ -45,7 +64,7 @@ class CollectionView(ModelView):
     sortable_fields = ["name", "display_order", "created_at"]
 
 
-class ItemView(ModelView):
+class ItemView(CachedModelView):
     """
     Admin view for Item management
     """
@@ -82,11 +101,12 @@ class ItemView(ModelView):
     sortable_fields = ["name", "price", "created_at", "updated_at"]
 
 
-class PackageView(ModelView):
+class PackageView(CachedModelView):
     """
     Admin view for Package management
     """
 
+    cache_namespaces = ("package",)
     label = "Packages"
     icon = "fa fa-folder"
     fields = [
@@ -110,11 +130,12 @@ class PackageView(ModelView):
     sortable_fields = ["name", "display_order", "created_at"]
 
 
-class TestimonialView(ModelView):
+class TestimonialView(CachedModelView):
     """
     Admin view for Testimonial management
     """
 
+    cache_namespaces = ("testimonial",)
     label = "Testimonials"
     icon = "fa fa-comment"
     fields = [
@@ -0,0 +1,72 @@
+import asyncio
+import contextlib
+import hashlib
+from dataclasses import dataclass
+from typing import List
+
+from fastapi import APIRouter, Depends, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.conditional import evaluate_conditional
+from app.api.responses import carried_headers, dumps, type_adapter
+from app.cache import cached, catalog_version
+from app.config import settings
+from app.crud.catalog import catalog as crud_catalog
+from app.database import get_db
+from app.query_budget import query_budget
+from app.schemas.catalog import CatalogSuite
+
+router = APIRouter()
+
+# One build at a time on a miss: requests arriving during a build wait for
+# its result. Hits never take it.
+_build_lock = asyncio.Lock()
+
+
+@dataclass(frozen=True)
+class TreeSnapshot:
+    """The catalog tree encoded once, with a digest of the bytes"""
+
+    body: bytes
+    digest: str
+
+
+@cached("suite")
+async def tree_snapshot(db: AsyncSession, *, version: int) -> TreeSnapshot:
+    """
+    The encoded catalog tree. ``version`` (catalog_version() read before the
+    call) keys the cache, so a tree built while a write commits is stored
+    under a version nobody asks for again.
+    """
+    adapter = type_adapter(List[CatalogSuite])
+    tree = adapter.validate_python(await crud_catalog.get_tree(db))
+    body = dumps(adapter.dump_python(tree))
+    return TreeSnapshot(body, hashlib.blake2b(body, digest_size=16).hexdigest())
+
+
+@router.get("/tree", response_model=List[CatalogSuite])
+@query_budget(1)
+async def read_catalog_tree(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Every suite with its collections and their item summaries, for the
+    storefront menu. Served from memory until the catalog changes.
+    """
+    version = catalog_version()
+    snapshot = tree_snapshot.peek(db, version=version)
+    if snapshot is None:
+        # Without the cache there is no result to wait for
+        lock = _build_lock if settings.READ_CACHE_ENABLED else contextlib.nullcontext()
+        async with lock:
+            snapshot = await tree_snapshot(db, version=version)
+    not_modified = evaluate_conditional(request, response, "catalog", snapshot.digest)
+    if not_modified:
+        return not_modified
+    return Response(
+        snapshot.body,
+        media_type="application/json",
+        headers=carried_headers(response),
+    )
@@ -1,14 +1,27 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List, Optional, Union
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
-from app.crud.collection import collection as crud_collection
+from app.query_budget import query_budget
+from app.cache import read_cache
+from app.api.conditional import evaluate_conditional, last_modified_of
+from app.api.pagination import set_next_cursor
+from app.api.views import ListView
+from app.api.fieldsets import fieldset_query, sparse_response
+from app.api.responses import model_response
+from app.crud.pagination import normalize_order_by
+from app.crud.fieldsets import FieldSet
+from app.exceptions.pagination import InvalidCursorError
+from app.crud.collection import collection as crud_collection, COLLECTION_SORT_FIELDS
 from app.schemas.collection import (
     CollectionCreate,
     CollectionUpdate,
     CollectionResponse,
+    CollectionSummary,
+    CollectionBatchRequest,
 )
+from app.schemas.batch import BatchResult
 
 router = APIRouter()
 
@@ -16,45 +29,176 @@ router = APIRouter()
 @router.post(
     "/", response_model=CollectionResponse, status_code=status.HTTP_201_CREATED
 )
+@query_budget(5)
 async def create_collection(
     collection_in: CollectionCreate, db: AsyncSession = Depends(get_db)
 ):
     return await crud_collection.create(db=db, obj_in=collection_in)
 
 
-@router.get("/", response_model=List[CollectionResponse])
+@router.post("/batch", response_model=BatchResult)
+@query_budget(16)
+async def batch_collections(
+    batch_in: CollectionBatchRequest,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Create, update and delete many collections in one transaction, with a
+    result per operation. Responds 409 when a database constraint rolled it back.
+    """
+    result = await crud_collection.batch(db=db, operations=batch_in.operations)
+    if not result.committed:
+        response.status_code = status.HTTP_409_CONFLICT
+    return result
+
+
+@router.get(
+    "/",
+    response_model=Union[List[CollectionSummary], List[CollectionResponse]],
+)
+@query_budget(3)
 async def list_collections(
-    skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_db)
+    request: Request,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    order_by: str = "display_order",
+    cursor: Optional[str] = None,
+    view: ListView = ListView.summary,
+    fieldset: Optional[FieldSet] = Depends(fieldset_query("collection")),
+    db: AsyncSession = Depends(get_db),
 ):
-    return await crud_collection.get_all(db=db, skip=skip, limit=limit)
+    """
+    List collections as summaries (item count and cover image), with
+    view=full including all of their items, or as fields= and include= select
+    """
+    order_by = normalize_order_by(order_by, COLLECTION_SORT_FIELDS, "display_order")
+    version = await crud_collection.get_version(db=db)
+    not_modified = evaluate_conditional(
+        request,
+        response,
+        "collections",
+        view.value,
+        request.url.query,
+        version.count,
+        last_modified=version.last_modified,
+    )
+    if not_modified:
+        return not_modified
+    try:
+        if view is ListView.summary and fieldset is None:
+            collections = await crud_collection.get_summaries(
+                db=db, skip=skip, limit=limit, order_by=order_by, cursor=cursor
+            )
+            page_type = List[CollectionSummary]
+        else:
+            collections = await crud_collection.get_all(
+                db=db,
+                skip=skip,
+                limit=limit,
+                order_by=order_by,
+                cursor=cursor,
+                fieldset=fieldset,
+            )
+            page_type = List[CollectionResponse]
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    set_next_cursor(response, collections, order_by, limit)
+    if fieldset is not None:
+        return sparse_response(response, [fieldset.dump(c) for c in collections])
+    return model_response(page_type, collections, response)
 
 
-@router.get("/suite/{suite_name}", response_model=List[CollectionResponse])
+@router.get(
+    "/suite/{suite_name}",
+    response_model=Union[List[CollectionSummary], List[CollectionResponse]],
+)
+@query_budget(3)
 async def list_collections_by_suite(
-    suite_name: str, skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_db)
+    suite_name: str,
+    request: Request,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    view: ListView = ListView.summary,
+    fieldset: Optional[FieldSet] = Depends(fieldset_query("collection")),
+    db: AsyncSession = Depends(get_db),
 ):
-    return await crud_collection.get_by_suite(
+    """
+    List the collections of a suite as summaries, with view=full including
+    all of their items, or as fields= and include= select
+    """
+    version = await crud_collection.get_version(db=db, suite_name=suite_name)
+    not_modified = evaluate_conditional(
+        request,
+        response,
+        "collections",
+        suite_name,
+        view.value,
+        request.url.query,
+        version.count,
+        last_modified=version.last_modified,
+    )
+    if not_modified:
+        return not_modified
+    if fieldset is not None:
+        collections = await crud_collection.get_by_suite_name(
+            db=db, suite_name=suite_name, skip=skip, limit=limit, fieldset=fieldset
+        )
+        return sparse_response(response, [fieldset.dump(c) for c in collections])
+    if view is ListView.summary:
+        summaries = await crud_collection.get_summaries(
+            db=db, suite_name=suite_name, skip=skip, limit=limit
+        )
+        return model_response(List[CollectionSummary], summaries, response)
+    collections = await crud_collection.get_by_suite_name(
         db=db, suite_name=suite_name, skip=skip, limit=limit
     )
+    return model_response(List[CollectionResponse], collections, response)
 
 
 @router.get("/{collection_name}", response_model=CollectionResponse)
-async def get_collection(collection_name: str, db: AsyncSession = Depends(get_db)):
-    collection = await crud_collection.get(db=db, collection_name=collection_name)
+@query_budget(2)
+async def get_collection(
+    collection_name: str,
+    request: Request,
+    response: Response,
+    fieldset: Optional[FieldSet] = Depends(fieldset_query("collection")),
+    db: AsyncSession = Depends(get_db),
+):
+    collection = await crud_collection.get_by_name(
+        db=db, name=collection_name, fieldset=fieldset
+    )
     if not collection:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Collection not found"
         )
-    return collection
+    if fieldset is not None:
+        data = fieldset.dump(collection)
+        not_modified = evaluate_conditional(request, response, "collection", data)
+        return not_modified or sparse_response(response, data)
+    not_modified = evaluate_conditional(
+        request,
+        response,
+        "collection",
+        collection.id,
+        collection.suite_name,
+        len(collection.items),
+        last_modified=last_modified_of(collection, *collection.items),
+    )
+    return not_modified or collection
 
 
 @router.put("/{collection_id}", response_model=CollectionResponse)
+@query_budget(4)
 async def update_collection(
     collection_id: int,
     collection_in: CollectionUpdate,
     db: AsyncSession = Depends(get_db),
 ):
-    db_obj = await crud_collection.get(db=db, collection_id=collection_id)
+    with read_cache.bypass():
+        db_obj = await crud_collection.get(db=db, collection_id=collection_id)
     if not db_obj:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Collection not found"
@@ -63,6 +207,7 @@ async def update_collection(
 
 
 @router.delete("/{collection_id}", status_code=status.HTTP_204_NO_CONTENT)
+@query_budget(5)
 async def delete_collection(collection_id: int, db: AsyncSession = Depends(get_db)):
     deleted = await crud_collection.delete(db=db, collection_id=collection_id)
     if not deleted:
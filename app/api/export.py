@@ -0,0 +1,97 @@
+import csv
+import enum
+import io
+import json
+import uuid
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, AsyncIterator, Callable, Dict, List, Sequence
+
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import AsyncSessionLocal
+
+Batches = AsyncIterator[List[Dict[str, Any]]]
+
+
+class ExportFormat(str, enum.Enum):
+    ndjson = "ndjson"
+    csv = "csv"
+
+
+MEDIA_TYPES = {
+    ExportFormat.ndjson: "application/x-ndjson",
+    ExportFormat.csv: "text/csv",
+}
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (uuid.UUID, Decimal)):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, enum.Enum):
+        return value.value
+    raise TypeError(f"Cannot export {value!r}")
+
+
+def _csv_value(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, list):
+        return ",".join(str(v) for v in value)
+    if isinstance(value, (datetime, enum.Enum)):
+        return _json_default(value)
+    return value
+
+
+def _encode_ndjson(batch: List[Dict[str, Any]], columns: Sequence[str]) -> bytes:
+    lines = (
+        json.dumps(
+            {c: row[c] for c in columns}, default=_json_default, separators=(",", ":")
+        )
+        for row in batch
+    )
+    return ("\n".join(lines) + "\n").encode()
+
+
+def _encode_csv(batch: List[Dict[str, Any]], columns: Sequence[str]) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerows([_csv_value(row[c]) for c in columns] for row in batch)
+    return buffer.getvalue().encode()
+
+
+def export_response(
+    query: Callable[[AsyncSession], Batches],
+    *,
+    columns: Sequence[str],
+    fmt: ExportFormat,
+    filename: str,
+) -> StreamingResponse:
+    """
+    Stream the batches produced by query(db) as NDJSON or CSV.
+
+    The body is produced after the endpoint returns, when request-scoped
+    sessions are already closed, so the stream opens a session of its own
+    and holds it until the last row is sent.
+    """
+    encode = _encode_csv if fmt is ExportFormat.csv else _encode_ndjson
+
+    async def body():
+        if fmt is ExportFormat.csv:
+            yield _encode_csv([dict(zip(columns, columns))], columns)
+        async with AsyncSessionLocal() as db:
+            async for batch in query(db):
+                yield encode(batch, columns)
+
+    return StreamingResponse(
+        body(),
+        media_type=MEDIA_TYPES[fmt],
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}.{fmt.value}"'
+        },
+    )
@@ -0,0 +1,43 @@
+from typing import Any, Callable, Optional
+
+from fastapi import HTTPException, Query, Response, status
+
+from app.api.responses import ORJSONResponse, carried_headers
+from app.crud.fieldsets import FieldSet
+from app.exceptions.fieldsets import InvalidFieldSetError
+
+
+def fieldset_query(resource: str) -> Callable[..., Optional[FieldSet]]:
+    """
+    Dependency reading the fields= and include= parameters of a route that
+    returns ``resource`` objects: None when neither is given, a 400 when
+    they name something the resource does not have.
+    """
+
+    def dependency(
+        fields: Optional[str] = Query(
+            None,
+            description="Comma-separated fields to return, e.g. id,name,images[0] "
+            "(dotted names such as items.name narrow an included relationship)",
+        ),
+        include: Optional[str] = Query(
+            None, description="Comma-separated relationships to embed"
+        ),
+    ) -> Optional[FieldSet]:
+        if not fields and not include:
+            return None
+        try:
+            return FieldSet.parse(resource, fields, include)
+        except InvalidFieldSetError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    return dependency
+
+
+def sparse_response(response: Response, content: Any) -> ORJSONResponse:
+    """
+    Serialize FieldSet.dump() output. It bypasses the route's response
+    model, so headers already set on ``response`` (ETag, X-Next-Cursor)
+    are carried over explicitly.
+    """
+    return ORJSONResponse(content, headers=carried_headers(response))
@@ -1,41 +1,313 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from datetime import datetime
+from decimal import Decimal
+from typing import List, Optional, Union
+import io
+import uuid
+from fastapi import (
+    APIRouter,
+    Depends,
+    File,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    UploadFile,
+    status,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
-from app.crud.item import item as crud_item
-from app.schemas.item import ItemCreate, ItemUpdate, ItemResponse
+from app.query_budget import query_budget
+from app.cache import read_cache
+from app.api.conditional import evaluate_conditional, last_modified_of
+from app.api.pagination import set_next_cursor
+from app.api.export import ExportFormat, export_response
+from app.api.views import ListView
+from app.api.fieldsets import fieldset_query, sparse_response
+from app.api.responses import model_response
+from app.api.uploads import file_upload_body, receive_upload
+from app.crud.pagination import normalize_order_by
+from app.crud.fieldsets import FieldSet
+from app.crud.item import item as crud_item, ITEM_SORT_FIELDS, ITEM_EXPORT_COLUMNS
+from app.exceptions.pagination import InvalidCursorError
+from app.config import settings
+from app.exceptions.images import ImageSourceError
+from app.exceptions.item_import import ImportMergeError
+from app.images import image_pipeline
+from app.models.item import CategoryEnum
+from app.schemas.item import (
+    ItemCreate,
+    ItemUpdate,
+    ItemResponse,
+    ItemSummary,
+    ItemSearchResult,
+    ItemFacetPage,
+    ItemImportResult,
+    ItemBatchRequest,
+)
+from app.schemas.batch import BatchResult
+from app.uploads import IMAGE_TYPES, discard_upload, upload_dir
 
 router = APIRouter()
 
 
 @router.post("/", response_model=ItemResponse, status_code=status.HTTP_201_CREATED)
+@query_budget(3)
 async def create_item(item_in: ItemCreate, db: AsyncSession = Depends(get_db)):
     """Create a new item"""
     return await crud_item.create(db=db, obj_in=item_in)
 
 
-@router.get("/", response_model=List[ItemResponse])
+@router.post("/batch", response_model=BatchResult)
+@query_budget(16)
+async def batch_items(
+    batch_in: ItemBatchRequest,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Create, update and delete many items in one transaction, with a result
+    per operation. Responds 409 when a database constraint rolled it back.
+    """
+    result = await crud_item.batch(db=db, operations=batch_in.operations)
+    if not result.committed:
+        response.status_code = status.HTTP_409_CONFLICT
+    return result
+
+
+@router.post("/import", response_model=ItemImportResult)
+@query_budget(5)
+async def import_items(
+    file: UploadFile = File(..., description="CSV with a header row, or NDJSON"),
+    format: Optional[ExportFormat] = Query(
+        None, description="Defaults to the file extension"
+    ),
+    dry_run: bool = False,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Create or update many items in one transaction. Rows carrying the id of an
+    existing item update it; collections may be given by collection_name.
+    Invalid rows are reported per row and skipped.
+    """
+    if format is None:
+        is_csv = (file.filename or "").lower().endswith(".csv")
+        format = ExportFormat.csv if is_csv else ExportFormat.ndjson
+    lines = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    try:
+        return await crud_item.bulk_import(
+            db=db, lines=lines, fmt=format.value, dry_run=dry_run
+        )
+    except UnicodeDecodeError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Import files must be UTF-8 encoded",
+        )
+    except ImportMergeError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@router.get("/", response_model=Union[List[ItemSummary], List[ItemResponse]])
+@query_budget(3)
 async def list_items(
-    skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_db)
+    request: Request,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    order_by: str = "-created_at",
+    cursor: Optional[str] = None,
+    view: ListView = ListView.full,
+    fieldset: Optional[FieldSet] = Depends(fieldset_query("item")),
+    db: AsyncSession = Depends(get_db),
 ):
-    """List items (paginated)"""
-    return await crud_item.get_all(db=db, skip=skip, limit=limit)
+    """
+    List items (paginated by skip, or by the X-Next-Cursor of the previous
+    page); view=summary returns only the fields of an item card, fields=
+    and include= take precedence over view
+    """
+    order_by = normalize_order_by(order_by, ITEM_SORT_FIELDS, "-created_at")
+    version = await crud_item.get_version(db=db)
+    not_modified = evaluate_conditional(
+        request,
+        response,
+        "items",
+        view.value,
+        request.url.query,
+        version.count,
+        last_modified=version.last_modified,
+    )
+    if not_modified:
+        return not_modified
+    try:
+        if view is ListView.summary and fieldset is None:
+            items = await crud_item.get_summaries(
+                db=db, skip=skip, limit=limit, order_by=order_by, cursor=cursor
+            )
+            page_type = List[ItemSummary]
+        else:
+            items = await crud_item.get_all(
+                db=db,
+                skip=skip,
+                limit=limit,
+                order_by=order_by,
+                cursor=cursor,
+                fieldset=fieldset,
+            )
+            page_type = List[ItemResponse]
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    set_next_cursor(response, items, order_by, limit)
+    if fieldset is not None:
+        return sparse_response(response, [fieldset.dump(item) for item in items])
+    return model_response(page_type, items, response)
+
+
+@router.get("/search", response_model=List[ItemSearchResult])
+@query_budget(2)
+async def search_items(
+    response: Response,
+    q: str = Query(..., min_length=1, description="Words to search for"),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    """Full-text search over item name, description and fabric, best matches first"""
+    try:
+        items = await crud_item.search(db=db, query=q, limit=limit, cursor=cursor)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    set_next_cursor(response, items, "-search_rank", limit)
+    return items
+
+
+@router.get("/facets", response_model=ItemFacetPage)
+@query_budget(5)
+async def filter_items(
+    request: Request,
+    response: Response,
+    category: Optional[List[CategoryEnum]] = Query(None),
+    colors: Optional[List[str]] = Query(None),
+    sizes: Optional[List[str]] = Query(None),
+    fabric: Optional[List[str]] = Query(None),
+    price_min: Optional[Decimal] = Query(None, ge=0),
+    price_max: Optional[Decimal] = Query(None, ge=0),
+    limit: int = Query(24, ge=1, le=100),
+    order_by: str = "-created_at",
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Filter items by category, colors, sizes, fabric and price range (repeat a
+    parameter to match any of several values) and count the items behind
+    every facet value for the current selection
+    """
+    order_by = normalize_order_by(order_by, ITEM_SORT_FIELDS, "-created_at")
+    version = await crud_item.get_version(db=db)
+    not_modified = evaluate_conditional(
+        request,
+        response,
+        "item-facets",
+        request.url.query,
+        version.count,
+        last_modified=version.last_modified,
+    )
+    if not_modified:
+        return not_modified
+
+    selection = dict(
+        category=category,
+        colors=colors,
+        sizes=sizes,
+        fabric=fabric,
+        price_min=price_min,
+        price_max=price_max,
+    )
+    try:
+        items = await crud_item.filter(
+            db=db, limit=limit, order_by=order_by, cursor=cursor, **selection
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    counts = await crud_item.get_facet_counts(db=db, **selection)
+    return {
+        "items": items,
+        "next_cursor": set_next_cursor(response, items, order_by, limit),
+        **counts,
+    }
+
+
+@router.get("/export")
+@query_budget(0)
+async def export_items(
+    format: ExportFormat = ExportFormat.ndjson,
+    since: Optional[datetime] = Query(
+        None, description="Only items created or updated at or after this time"
+    ),
+    collection_id: Optional[uuid.UUID] = None,
+    category: Optional[List[CategoryEnum]] = Query(None),
+    colors: Optional[List[str]] = Query(None),
+    sizes: Optional[List[str]] = Query(None),
+    fabric: Optional[List[str]] = Query(None),
+    price_min: Optional[Decimal] = Query(None, ge=0),
+    price_max: Optional[Decimal] = Query(None, ge=0),
+):
+    """
+    Stream the whole (optionally filtered) item catalog as NDJSON or CSV,
+    for feed consumers that would otherwise page through the list endpoint
+    """
+    return export_response(
+        lambda db: crud_item.export(
+            db,
+            since=since,
+            collection_id=collection_id,
+            category=category,
+            colors=colors,
+            sizes=sizes,
+            fabric=fabric,
+            price_min=price_min,
+            price_max=price_max,
+        ),
+        columns=ITEM_EXPORT_COLUMNS,
+        fmt=format,
+        filename="items",
+    )
 
 
 @router.get("/{item_id}", response_model=ItemResponse)
-async def get_item(item_id: int, db: AsyncSession = Depends(get_db)):
-    """Get an item by ID"""
-    db_obj = await crud_item.get(db=db, item_id=item_id)
+@query_budget(2)
+async def get_item(
+    item_id: int,
+    request: Request,
+    response: Response,
+    fieldset: Optional[FieldSet] = Depends(fieldset_query("item")),
+    db: AsyncSession = Depends(get_db),
+):
+    """Get an item by ID (fields= and include= select what is returned)"""
+    db_obj = await crud_item.get(db=db, item_id=item_id, fieldset=fieldset)
     if not db_obj:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Item not found"
         )
-    return db_obj
+    if fieldset is not None:
+        data = fieldset.dump(db_obj)
+        not_modified = evaluate_conditional(request, response, "item", data)
+        return not_modified or sparse_response(response, data)
+    not_modified = evaluate_conditional(
+        request,
+        response,
+        "item",
+        db_obj.id,
+        db_obj.collection_name,
+        last_modified=last_modified_of(db_obj),
+    )
+    return not_modified or db_obj
 
 
 @router.get("/slug/{slug}", response_model=ItemResponse)
-async def get_item_by_slug(slug: str, db: AsyncSession = Depends(get_db)):
+@query_budget(2)
+async def get_item_by_slug(
+    slug: str, request: Request, response: Response, db: AsyncSession = Depends(get_db)
+):
     """Get an item by slug (if implemented)"""
     if not hasattr(crud_item, "get_by_slug"):
         raise HTTPException(
@@ -47,28 +319,90 @@ async def get_item_by_slug(slug: str, db: AsyncSession = Depends(get_db)):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Item not found"
         )
-    return db_obj
+    not_modified = evaluate_conditional(
+        request,
+        response,
+        "item",
+        db_obj.id,
+        db_obj.collection_name,
+        last_modified=last_modified_of(db_obj),
+    )
+    return not_modified or db_obj
 
 
-@router.get("/collection/{collection_id}", response_model=List[ItemResponse])
+@router.get(
+    "/collection/{collection_id}",
+    response_model=Union[List[ItemSummary], List[ItemResponse]],
+)
+@query_budget(3)
 async def list_items_by_collection(
     collection_id: int,
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    order_by: str = "-created_at",
+    cursor: Optional[str] = None,
+    view: ListView = ListView.full,
+    fieldset: Optional[FieldSet] = Depends(fieldset_query("item")),
     db: AsyncSession = Depends(get_db),
 ):
-    """List items belonging to a collection"""
-    return await crud_item.get_by_collection(
-        db=db, collection_id=collection_id, skip=skip, limit=limit
+    """
+    List items belonging to a collection (view=summary for item cards, or
+    fields= and include= for any other selection)
+    """
+    order_by = normalize_order_by(order_by, ITEM_SORT_FIELDS, "-created_at")
+    version = await crud_item.get_version(db=db, collection_id=collection_id)
+    not_modified = evaluate_conditional(
+        request,
+        response,
+        "items",
+        collection_id,
+        view.value,
+        request.url.query,
+        version.count,
+        last_modified=version.last_modified,
     )
+    if not_modified:
+        return not_modified
+    try:
+        if view is ListView.summary and fieldset is None:
+            items = await crud_item.get_summaries(
+                db=db,
+                collection_id=collection_id,
+                skip=skip,
+                limit=limit,
+                order_by=order_by,
+                cursor=cursor,
+            )
+            page_type = List[ItemSummary]
+        else:
+            items = await crud_item.get_by_collection(
+                db=db,
+                collection_id=collection_id,
+                skip=skip,
+                limit=limit,
+                order_by=order_by,
+                cursor=cursor,
+                fieldset=fieldset,
+            )
+            page_type = List[ItemResponse]
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    set_next_cursor(response, items, order_by, limit)
+    if fieldset is not None:
+        return sparse_response(response, [fieldset.dump(item) for item in items])
+    return model_response(page_type, items, response)
 
 
 @router.put("/{item_id}", response_model=ItemResponse)
+@query_budget(4)
 async def update_item(
     item_id: int, item_in: ItemUpdate, db: AsyncSession = Depends(get_db)
 ):
     """Update an item"""
-    db_obj = await crud_item.get(db=db, item_id=item_id)
+    with read_cache.bypass():
+        db_obj = await crud_item.get(db=db, item_id=item_id)
     if not db_obj:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Item not found"
@@ -76,7 +410,87 @@ async def update_item(
     return await crud_item.update(db=db, db_obj=db_obj, obj_in=item_in)
 
 
+@router.post(
+    "/{item_id}/images",
+    response_model=ItemResponse,
+    status_code=status.HTTP_201_CREATED,
+    openapi_extra=file_upload_body("file"),
+)
+@query_budget(3)
+async def upload_item_image(
+    item_id: uuid.UUID,
+    request: Request,
+    derivatives: bool = Query(
+        True, description="Also render resized copies (see /images/derivatives)"
+    ),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Upload a JPEG, PNG or WebP image (multipart field "file") and append it to
+    the item's images. The body is streamed to disk, so large photos don't
+    sit in memory; a file uploaded before is stored only once.
+    """
+    with read_cache.bypass():
+        db_obj = await crud_item.get(db=db, item_id=item_id)
+    if not db_obj:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Item not found"
+        )
+    # Don't hold a pooled connection while the body arrives
+    await db.commit()
+    upload = await receive_upload(
+        request,
+        upload_dir("items"),
+        accept=IMAGE_TYPES,
+        max_bytes=settings.UPLOAD_MAX_IMAGE_BYTES,
+    )
+    variants = None
+    if derivatives:
+        try:
+            variants = await image_pipeline.derive(upload.url)
+        except ImageSourceError:
+            await discard_upload(upload)
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="The file is not a readable image",
+            )
+    db_obj = await crud_item.append_image(
+        db=db, db_obj=db_obj, url=upload.url, variants=variants
+    )
+    if not db_obj:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Item not found"
+        )
+    return db_obj
+
+
+@router.post("/{item_id}/images/derivatives", response_model=ItemResponse)
+@query_budget(5)
+async def derive_item_images(
+    item_id: uuid.UUID,
+    force: bool = Query(False, description="Render originals that are unchanged too"),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Render resized WebP/JPEG copies and a blurhash placeholder of each of the
+    item's images stored under /static; remote images are left alone
+    """
+    with read_cache.bypass():
+        db_obj = await crud_item.get(db=db, item_id=item_id)
+    if not db_obj:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Item not found"
+        )
+    # Don't hold a pooled connection while the images render
+    await db.commit()
+    variants = await image_pipeline.derive_all(
+        db_obj.images, db_obj.image_variants, force=force
+    )
+    return await crud_item.set_image_variants(db=db, db_obj=db_obj, variants=variants)
+
+
 @router.delete("/{item_id}", status_code=status.HTTP_204_NO_CONTENT)
+@query_budget(3)
 async def delete_item(item_id: int, db: AsyncSession = Depends(get_db)):
     """Delete an item"""
     deleted = await crud_item.delete(db=db, item_id=item_id)
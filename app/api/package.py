@@ -1,13 +1,32 @@
+from datetime import datetime
 from typing import List, Optional
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from fastapi.responses import RedirectResponse
 from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
 
 # Explicitly import get_db and use standard imports
 from app.database import get_db
-from app.crud.package import package as crud_package
-from app.schemas.package import PackageCreate, PackageUpdate, PackageOut
+from app.query_budget import query_budget
+from app.crud.package import package as crud_package, PACKAGE_EXPORT_COLUMNS
+from app.schemas.package import (
+    PackageCreate,
+    PackageUpdate,
+    PackageOut,
+    PackageBatchRequest,
+)
+from app.schemas.batch import BatchResult
 from app.exceptions.package import PackageNotFoundError, PackageAlreadyExistsError
+from app.api.conditional import evaluate_conditional, last_modified_of
+from app.api.export import ExportFormat, export_response
+from app.api.fieldsets import fieldset_query, sparse_response
+from app.api.uploads import file_upload_body, receive_upload
+from app.assets import REVALIDATE
+from app.config import settings
+from app.crud.fieldsets import FieldSet
+from app.file_responses import SendfileResponse, ranged
+from app.uploads import PDF_TYPES, stored_path, upload_dir, upload_url_prefix
 
 
 router = APIRouter()
@@ -19,6 +38,7 @@ router = APIRouter()
     status_code=status.HTTP_201_CREATED,
     summary="Create a new package",
 )
+@query_budget(3)
 async def create_package_endpoint(
     package_in: PackageCreate,
     db: AsyncSession = Depends(get_db),  # Inline dependency injection
@@ -33,57 +53,159 @@ async def create_package_endpoint(
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
 
 
+# --- POST /packages/batch (Batch Create/Update/Delete) ---
+@router.post(
+    "/batch",
+    response_model=BatchResult,
+    summary="Create, update and delete packages in one transaction",
+)
+@query_budget(16)
+async def batch_packages_endpoint(
+    batch_in: PackageBatchRequest,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Applies every operation in a single transaction and reports a result per
+    operation. Responds 409 when a constraint (e.g. a duplicate name) rolled
+    the batch back.
+    """
+    result = await crud_package.batch(db=db, operations=batch_in.operations)
+    if not result.committed:
+        response.status_code = status.HTTP_409_CONFLICT
+    return result
+
+
 # --- GET /packages (Read All/List) ---
 @router.get("/", response_model=List[PackageOut], summary="List all packages")
+@query_budget(2)
 async def read_all_packages_endpoint(
+    request: Request,
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, le=1000),
+    fieldset: Optional[FieldSet] = Depends(fieldset_query("package")),
     db: AsyncSession = Depends(get_db),  # Inline dependency injection
 ):
     """
     Retrieves a list of all packages, allowing for pagination using skip and limit parameters.
+    Use fields= to return only some of their fields.
     """
-    return await crud_package.get_all(db=db, skip=skip, limit=limit)
-
-
-# --- GET /packages/{package_id} (Read One by ID) ---
-@router.get("/{package_id}", response_model=PackageOut, summary="Get package by ID")
-async def read_package_by_id_endpoint(
-    package_id: UUID, db: AsyncSession = Depends(get_db)  # Inline dependency injection
-):
-    """
-    Retrieves a single package by its UUID.
-    """
-    try:
-        # The CRUD layer raises PackageNotFoundError if not found
-        return await crud_package.get_by_id(db, package_id)
-    except PackageNotFoundError as e:
-        # Translate application error (not found) to 404 Not Found
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    version = await crud_package.get_version(db)
+    not_modified = evaluate_conditional(
+        request,
+        response,
+        "packages",
+        request.url.query,
+        version.count,
+        last_modified=version.last_modified,
+    )
+    if not_modified:
+        return not_modified
+    packages = await crud_package.get_all(
+        db=db, skip=skip, limit=limit, fieldset=fieldset
+    )
+    if fieldset is not None:
+        return sparse_response(response, [fieldset.dump(p) for p in packages])
+    return packages
 
 
 # --- GET /packages/search (Search by Name) ---
+# Declared before /{package_id} so "search" is not parsed as a UUID
 @router.get(
     "/search", response_model=List[PackageOut], summary="Search packages by name"
 )
+@query_budget(2)
 async def search_packages_endpoint(
+    request: Request,
+    response: Response,
     name: str = Query(
-        ..., min_length=1, description="Partial name to search for (case-insensitive)"
+        ..., min_length=1, description="Word prefixes to search for in the name"
     ),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, le=1000),
     db: AsyncSession = Depends(get_db),  # Inline dependency injection
 ):
     """
-    Searches for packages whose names contain the provided search term.
+    Searches for packages whose names contain words starting with every search term.
     """
+    version = await crud_package.get_version(db, name=name)
+    not_modified = evaluate_conditional(
+        request,
+        response,
+        "packages",
+        request.url.query,
+        version.count,
+        last_modified=version.last_modified,
+    )
+    if not_modified:
+        return not_modified
     return await crud_package.search_by_name(db, name=name, skip=skip, limit=limit)
 
 
+# --- GET /packages/export (Bulk Export) ---
+# Declared before /{package_id} so "export" is not parsed as a UUID
+@router.get("/export", summary="Stream every package as NDJSON or CSV")
+@query_budget(0)
+async def export_packages_endpoint(
+    format: ExportFormat = ExportFormat.ndjson,
+    since: Optional[datetime] = Query(
+        None, description="Only packages created or updated at or after this time"
+    ),
+    is_active: Optional[bool] = None,
+    is_popular: Optional[bool] = None,
+):
+    """
+    Streams all matching packages in display order through a server-side cursor.
+    """
+    return export_response(
+        lambda db: crud_package.export(
+            db, since=since, is_active=is_active, is_popular=is_popular
+        ),
+        columns=PACKAGE_EXPORT_COLUMNS,
+        fmt=format,
+        filename="packages",
+    )
+
+
+# --- GET /packages/{package_id} (Read One by ID) ---
+@router.get("/{package_id}", response_model=PackageOut, summary="Get package by ID")
+@query_budget(1)
+async def read_package_by_id_endpoint(
+    package_id: UUID,
+    request: Request,
+    response: Response,
+    fieldset: Optional[FieldSet] = Depends(fieldset_query("package")),
+    db: AsyncSession = Depends(get_db),  # Inline dependency injection
+):
+    """
+    Retrieves a single package by its UUID (or only the fields= given).
+    """
+    try:
+        # The CRUD layer raises PackageNotFoundError if not found
+        db_package = await crud_package.get_by_id(db, package_id, fieldset=fieldset)
+    except PackageNotFoundError as e:
+        # Translate application error (not found) to 404 Not Found
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    if fieldset is not None:
+        data = fieldset.dump(db_package)
+        not_modified = evaluate_conditional(request, response, "package", data)
+        return not_modified or sparse_response(response, data)
+    not_modified = evaluate_conditional(
+        request,
+        response,
+        "package",
+        db_package.id,
+        last_modified=last_modified_of(db_package),
+    )
+    return not_modified or db_package
+
+
 # --- PUT /packages/{package_id} (Update) ---
 @router.put(
     "/{package_id}", response_model=PackageOut, summary="Update an existing package"
 )
+@query_budget(4)
 async def update_package_endpoint(
     package_id: UUID,
     package_in: PackageUpdate,
@@ -102,12 +224,103 @@ async def update_package_endpoint(
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
 
 
+# --- POST /packages/{package_id}/brochure (Upload Brochure) ---
+@router.post(
+    "/{package_id}/brochure",
+    response_model=PackageOut,
+    summary="Upload the package's brochure PDF",
+    openapi_extra=file_upload_body("file"),
+)
+@query_budget(2)
+async def upload_package_brochure_endpoint(
+    package_id: UUID,
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Stores a PDF (multipart field "file") as the package's brochure. The body
+    is streamed to disk and a file uploaded before is stored only once.
+    """
+    if not await crud_package.exists(db, package_id=package_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Package with ID '{package_id}' not found.",
+        )
+    # Don't hold a pooled connection while the body arrives
+    await db.commit()
+    upload = await receive_upload(
+        request,
+        upload_dir("packages"),
+        accept=PDF_TYPES,
+        max_bytes=settings.UPLOAD_MAX_PDF_BYTES,
+    )
+    try:
+        return await crud_package.set_pdf_url(
+            db, package_id=package_id, pdf_url=upload.url
+        )
+    except PackageNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+
+
+# --- GET /packages/{package_id}/brochure (Download Brochure) ---
+@router.get(
+    "/{package_id}/brochure",
+    response_class=SendfileResponse,
+    summary="Download the package's brochure PDF",
+)
+@query_budget(1)
+async def download_package_brochure_endpoint(
+    package_id: UUID,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Sends an uploaded brochure with byte-range support, so interrupted
+    downloads resume; other brochure URLs are redirected to.
+    """
+    try:
+        db_package = await crud_package.get_by_id(db, package_id)
+    except PackageNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    pdf_url = db_package.pdf_url
+    if not pdf_url:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="This package has no brochure"
+        )
+    path = stored_path(pdf_url, "packages")
+    if path is None:
+        if pdf_url.startswith(upload_url_prefix("packages")):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="The brochure file is missing",
+            )
+        return RedirectResponse(pdf_url)
+
+    # Stored brochures are named by their content hash
+    not_modified = evaluate_conditional(
+        request, response, "brochure", path.stem, db_package.name
+    )
+    if not_modified:
+        return not_modified
+    stat_result = await run_in_threadpool(path.stat)
+    brochure = SendfileResponse(
+        path,
+        headers={"etag": response.headers["etag"], "cache-control": REVALIDATE},
+        media_type="application/pdf",
+        filename=f"{db_package.name}.pdf",
+        stat_result=stat_result,
+    )
+    return ranged(brochure, request.headers)
+
+
 # --- DELETE /packages/{package_id} (Delete) ---
 @router.delete(
     "/{package_id}",
     status_code=status.HTTP_204_NO_CONTENT,
     summary="Delete package by ID",
 )
+@query_budget(3)
 async def delete_package_endpoint(
     package_id: UUID, db: AsyncSession = Depends(get_db)  # Inline dependency injection
 ):
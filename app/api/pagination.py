@@ -0,0 +1,20 @@
+from typing import Any, Optional, Sequence
+
+from fastapi import Response
+
+from app.crud.pagination import next_cursor
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def set_next_cursor(
+    response: Response, rows: Sequence[Any], order_by: str, limit: int
+) -> Optional[str]:
+    """
+    Expose the cursor of the following page in the X-Next-Cursor header.
+    List bodies stay plain arrays so existing skip/limit clients are unaffected.
+    """
+    cursor = next_cursor(rows, order_by, limit)
+    if cursor:
+        response.headers[NEXT_CURSOR_HEADER] = cursor
+    return cursor
@@ -0,0 +1,73 @@
+import functools
+import uuid
+from decimal import Decimal
+from typing import Any, Dict, Optional
+
+import orjson
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from app.config import settings
+
+
+def _default(value: Any) -> Any:
+    # Written as strings, like pydantic serializes Decimal fields
+    if isinstance(value, Decimal):
+        return str(value)
+    # asyncpg's UUID subclass, which orjson does not recognize
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    """
+    Encode with orjson, which writes UUIDs, datetimes (UTC as "Z") and enums
+    itself; Decimals and UUID subclasses go through _default.
+    """
+    return orjson.dumps(content, default=_default, option=orjson.OPT_UTC_Z)
+
+
+class ORJSONResponse(JSONResponse):
+    """JSONResponse rendered with dumps()."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+@functools.lru_cache(maxsize=None)
+def type_adapter(type_: Any) -> TypeAdapter:
+    """One TypeAdapter per response type; building its validator is costly."""
+    return TypeAdapter(type_)
+
+
+def carried_headers(response: Optional[Response]) -> Dict[str, str]:
+    """
+    Headers a route set on its injected Response (ETag, X-Next-Cursor),
+    which FastAPI drops when the route returns a Response of its own.
+    """
+    if response is None:
+        return {}
+    return {
+        name: value
+        for name, value in response.headers.items()
+        if name != "content-length"
+    }
+
+
+def model_response(
+    type_: Any, content: Any, response: Optional[Response] = None
+) -> Any:
+    """
+    Validate ORM objects into ``type_`` once and render them with orjson,
+    instead of FastAPI's response_model validation, serialization pass and
+    stdlib json. Declare the same type as the route's response_model so the
+    OpenAPI schema stays accurate. With FAST_JSON_RESPONSES off the content
+    is returned unchanged for FastAPI to serialize.
+    """
+    if not settings.FAST_JSON_RESPONSES:
+        return content
+    adapter = type_adapter(type_)
+    value = adapter.validate_python(content, from_attributes=True)
+    return ORJSONResponse(adapter.dump_python(value), headers=carried_headers(response))
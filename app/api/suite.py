@@ -1,60 +1,146 @@
 # api/suite.py
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
-from typing import List
+from typing import List, Optional, Union
 from app.database import get_db
-from app.schemas.suite import Suite, SuiteCreate, SuiteUpdate, SuiteWithCollections
+from app.query_budget import query_budget
+from app.cache import read_cache
+from app.api.conditional import evaluate_conditional, last_modified_of
+from app.api.views import ListView
+from app.api.fieldsets import fieldset_query, sparse_response
+from app.api.responses import model_response
+from app.crud.fieldsets import FieldSet
+from app.schemas.suite import (
+    Suite,
+    SuiteCreate,
+    SuiteUpdate,
+    SuiteWithCollections,
+    SuiteWithCollectionSummaries,
+)
 from app.crud.suite import suite as crud_suite
 
 router = APIRouter()
 
 
 @router.post("/", response_model=Suite)
+@query_budget(2)
 async def create_suite(suite_in: SuiteCreate, db: AsyncSession = Depends(get_db)):
     """Create a new suite (returns simple suite without collections)"""
     return await crud_suite.create(db=db, obj_in=suite_in)
 
 
 @router.get("/name/{suite_name}", response_model=SuiteWithCollections)
-async def read_suite_by_name(suite_name: str, db: AsyncSession = Depends(get_db)):
-    """Get a suite by name with all collections"""
-    db_suite = await crud_suite.get_by_name(db, name=suite_name)
+@query_budget(3)
+async def read_suite_by_name(
+    suite_name: str,
+    request: Request,
+    response: Response,
+    fieldset: Optional[FieldSet] = Depends(fieldset_query("suite")),
+    db: AsyncSession = Depends(get_db),
+):
+    """Get a suite by name with all collections, or as fields= and include= select"""
+    db_suite = await crud_suite.get_by_name(db, name=suite_name, fieldset=fieldset)
     if db_suite is None:
         raise HTTPException(status_code=404, detail="Suite not found")
-    return db_suite
+    if fieldset is not None:
+        data = fieldset.dump(db_suite)
+        not_modified = evaluate_conditional(request, response, "suite", data)
+        return not_modified or sparse_response(response, data)
+    not_modified = evaluate_conditional(
+        request,
+        response,
+        "suite",
+        db_suite.id,
+        len(db_suite.collections),
+        last_modified=last_modified_of(db_suite, *db_suite.collections),
+    )
+    return not_modified or db_suite
 
 
 @router.get("/", response_model=List[Suite])
+@query_budget(3)
 async def read_suites(
-    skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_db)
+    request: Request,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    fieldset: Optional[FieldSet] = Depends(fieldset_query("suite")),
+    db: AsyncSession = Depends(get_db),
 ):
-    """Get all suites (simple list without collections)"""
-    suites = await crud_suite.get_all(db, skip=skip, limit=limit)
+    """Get all suites (simple list without collections, unless include=collections)"""
+    version = await crud_suite.get_version(db)
+    not_modified = evaluate_conditional(
+        request,
+        response,
+        "suites",
+        request.url.query,
+        version.count,
+        last_modified=version.last_modified,
+    )
+    if not_modified:
+        return not_modified
+    suites = await crud_suite.get_all(db, skip=skip, limit=limit, fieldset=fieldset)
+    if fieldset is not None:
+        return sparse_response(response, [fieldset.dump(s) for s in suites])
     return suites
 
 
-@router.get("/with-collections/", response_model=List[SuiteWithCollections])
+@router.get(
+    "/with-collections/",
+    response_model=Union[
+        List[SuiteWithCollectionSummaries], List[SuiteWithCollections]
+    ],
+)
+@query_budget(4)
 async def read_suites_with_collections(
-    skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_db)
+    request: Request,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    view: ListView = ListView.summary,
+    db: AsyncSession = Depends(get_db),
 ):
-    """Get all suites with collections (use sparingly - can be heavy)"""
+    """
+    Get all suites with their collections: summaries with item count and
+    cover image, or with view=full every collection's items (heavy)
+    """
+    version = await crud_suite.get_version(db, with_collections=True)
+    not_modified = evaluate_conditional(
+        request,
+        response,
+        "suites-with-collections",
+        view.value,
+        request.url.query,
+        version.count,
+        last_modified=version.last_modified,
+    )
+    if not_modified:
+        return not_modified
+    if view is ListView.summary:
+        suites = await crud_suite.get_all_with_collection_summaries(
+            db, skip=skip, limit=limit
+        )
+        return model_response(List[SuiteWithCollectionSummaries], suites, response)
     suites = await crud_suite.get_all_with_collections(db, skip=skip, limit=limit)
-    return suites
+    return model_response(List[SuiteWithCollections], suites, response)
 
 
 @router.put("/{suite_id}", response_model=Suite)
+@query_budget(5)
 async def update_suite(
     suite_id: UUID, suite_in: SuiteUpdate, db: AsyncSession = Depends(get_db)
 ):
     """Update a suite (returns simple suite without collections)"""
-    db_suite = await crud_suite.get(db, suite_id=suite_id)
+    with read_cache.bypass():
+        db_suite = await crud_suite.get(db, suite_id=suite_id)
     if db_suite is None:
         raise HTTPException(status_code=404, detail="Suite not found")
     return await crud_suite.update(db=db, db_obj=db_suite, obj_in=suite_in)
 
 
 @router.delete("/{suite_id}", response_model=Suite)
+@query_budget(6)
 async def delete_suite(suite_id: UUID, db: AsyncSession = Depends(get_db)):
     """Delete a suite (returns simple suite without collections)"""
     db_suite = await crud_suite.delete(db, suite_id=suite_id)
@@ -1,12 +1,20 @@
 # app/api/endpoints/testimonials.py
 from typing import List, Optional
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
+from app.query_budget import query_budget
+from app.api.conditional import evaluate_conditional, last_modified_of
+from app.api.pagination import set_next_cursor
+from app.api.fieldsets import fieldset_query, sparse_response
+from app.crud.fieldsets import FieldSet
+from app.crud.pagination import normalize_order_by
+from app.exceptions.pagination import InvalidCursorError
 from app.crud.testimonial import (
     testimonial,
+    TESTIMONIAL_SORT_FIELDS,
     TestimonialNotFoundError,
     TestimonialAlreadyExistsError,
 )
@@ -26,6 +34,7 @@ router = APIRouter()
     status_code=status.HTTP_201_CREATED,
     summary="Create a new testimonial",
 )
+@query_budget(3)
 async def create_testimonial(
     testimonial_in: TestimonialCreate, db: AsyncSession = Depends(get_db)
 ):
@@ -51,28 +60,51 @@ async def create_testimonial(
 @router.get(
     "/", response_model=List[TestimonialResponse], summary="Get all testimonials"
 )
+@query_budget(2)
 async def read_testimonials(
+    request: Request,
+    response: Response,
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(100, ge=1, le=200, description="Maximum records to return"),
     order_by: str = Query("display_order", description="Sort field (- for descending)"),
+    cursor: Optional[str] = Query(
+        None, description="X-Next-Cursor of the previous page (replaces skip)"
+    ),
     search: Optional[str] = Query(
         None, description="Search in client name or review text"
     ),
     min_rating: Optional[int] = Query(None, ge=0, le=5, description="Minimum rating"),
     max_rating: Optional[int] = Query(None, ge=0, le=5, description="Maximum rating"),
+    fieldset: Optional[FieldSet] = Depends(fieldset_query("testimonial")),
     db: AsyncSession = Depends(get_db),
 ):
     """
     Get all testimonials with optional filtering and sorting.
 
     - **skip**: Pagination offset
+    - **cursor**: Keyset cursor from the previous page's X-Next-Cursor header
     - **limit**: Maximum items per page (max 200)
     - **order_by**: Sort by field (e.g., "rating", "-created_at", "display_order")
     - **search**: Search in client name or review text
     - **min_rating**: Filter by minimum rating (0-5)
     - **max_rating**: Filter by maximum rating (0-5)
+    - **fields**: Return only these fields (e.g., "id,client_name,rating")
     """
     try:
+        version = await testimonial.get_version(
+            db=db, search=search, min_rating=min_rating, max_rating=max_rating
+        )
+        not_modified = evaluate_conditional(
+            request,
+            response,
+            "testimonials",
+            request.url.query,
+            version.count,
+            last_modified=version.last_modified,
+        )
+        if not_modified:
+            return not_modified
+
         if search:
             # Use search method
             testimonials = await testimonial.search(
@@ -87,10 +119,23 @@ async def read_testimonials(
             )
         else:
             # Get all with ordering
+            order_by = normalize_order_by(
+                order_by, TESTIMONIAL_SORT_FIELDS, "display_order"
+            )
             testimonials = await testimonial.get_all(
-                db=db, skip=skip, limit=limit, order_by=order_by
+                db=db,
+                skip=skip,
+                limit=limit,
+                order_by=order_by,
+                cursor=cursor,
+                fieldset=fieldset,
             )
+            set_next_cursor(response, testimonials, order_by, limit)
+        if fieldset is not None:
+            return sparse_response(response, [fieldset.dump(t) for t in testimonials])
         return testimonials
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -103,12 +148,33 @@ async def read_testimonials(
     response_model=TestimonialResponse,
     summary="Get a testimonial by ID",
 )
-async def read_testimonial(testimonial_id: UUID, db: AsyncSession = Depends(get_db)):
+@query_budget(1)
+async def read_testimonial(
+    testimonial_id: UUID,
+    request: Request,
+    response: Response,
+    fieldset: Optional[FieldSet] = Depends(fieldset_query("testimonial")),
+    db: AsyncSession = Depends(get_db),
+):
     """
-    Get a specific testimonial by its UUID.
+    Get a specific testimonial by its UUID (or only the fields= given).
     """
     try:
-        return await testimonial.get_by_id(db=db, testimonial_id=testimonial_id)
+        testimonial_obj = await testimonial.get_by_id(
+            db=db, testimonial_id=testimonial_id, fieldset=fieldset
+        )
+        if fieldset is not None:
+            data = fieldset.dump(testimonial_obj)
+            not_modified = evaluate_conditional(request, response, "testimonial", data)
+            return not_modified or sparse_response(response, data)
+        not_modified = evaluate_conditional(
+            request,
+            response,
+            "testimonial",
+            testimonial_obj.id,
+            last_modified=last_modified_of(testimonial_obj),
+        )
+        return not_modified or testimonial_obj
     except TestimonialNotFoundError as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
     except Exception as e:
@@ -123,8 +189,12 @@ async def read_testimonial(testimonial_id: UUID, db: AsyncSession = Depends(get_
     response_model=TestimonialResponse,
     summary="Get a testimonial by client name",
 )
+@query_budget(1)
 async def read_testimonial_by_client_name(
-    client_name: str, db: AsyncSession = Depends(get_db)
+    client_name: str,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
 ):
     """
     Get a testimonial by client name (case-insensitive).
@@ -138,7 +208,14 @@ async def read_testimonial_by_client_name(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Testimonial for client '{client_name}' not found.",
             )
-        return testimonial_obj
+        not_modified = evaluate_conditional(
+            request,
+            response,
+            "testimonial",
+            testimonial_obj.id,
+            last_modified=last_modified_of(testimonial_obj),
+        )
+        return not_modified or testimonial_obj
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -151,6 +228,7 @@ async def read_testimonial_by_client_name(
     response_model=TestimonialResponse,
     summary="Update a testimonial",
 )
+@query_budget(4)
 async def update_testimonial(
     testimonial_id: UUID,
     testimonial_in: TestimonialUpdate,
@@ -182,6 +260,7 @@ async def update_testimonial(
     status_code=status.HTTP_204_NO_CONTENT,
     summary="Delete a testimonial",
 )
+@query_budget(3)
 async def delete_testimonial(testimonial_id: UUID, db: AsyncSession = Depends(get_db)):
     """
     Delete a testimonial by ID.
@@ -200,6 +279,7 @@ async def delete_testimonial(testimonial_id: UUID, db: AsyncSession = Depends(ge
 
 
 @router.get("/stats/count", summary="Get testimonial count")
+@query_budget(1)
 async def get_testimonial_count(db: AsyncSession = Depends(get_db)):
     """
     Get total number of testimonials.
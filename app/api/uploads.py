@@ -0,0 +1,57 @@
+from pathlib import Path
+from typing import Any, Dict, Sequence
+
+from fastapi import HTTPException, Request, status
+
+from app.exceptions.uploads import (
+    InvalidUploadError,
+    UnsupportedFileTypeError,
+    UploadTooLargeError,
+)
+from app.uploads import FileType, StoredUpload, store_upload
+
+
+def file_upload_body(field: str = "file") -> Dict[str, Any]:
+    """
+    openapi_extra documenting a multipart body with one file, for routes that
+    read the request stream themselves instead of declaring an UploadFile.
+    """
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {
+                "multipart/form-data": {
+                    "schema": {
+                        "type": "object",
+                        "required": [field],
+                        "properties": {field: {"type": "string", "format": "binary"}},
+                    }
+                }
+            },
+        }
+    }
+
+
+async def receive_upload(
+    request: Request,
+    directory: Path,
+    *,
+    accept: Sequence[FileType],
+    max_bytes: int,
+    field: str = "file",
+) -> StoredUpload:
+    """store_upload(), with its errors turned into 413, 415 and 400 responses."""
+    try:
+        return await store_upload(
+            request, directory, accept=accept, max_bytes=max_bytes, field=field
+        )
+    except UploadTooLargeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e)
+        )
+    except UnsupportedFileTypeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, detail=str(e)
+        )
+    except InvalidUploadError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
@@ -0,0 +1,12 @@
+import enum
+
+
+class ListView(str, enum.Enum):
+    """
+    How much of every row a list route returns: ``summary`` selects the
+    columns a listing needs (with counts and a cover image instead of nested
+    objects), ``full`` loads and serializes the complete object graph.
+    """
+
+    summary = "summary"
+    full = "full"
@@ -0,0 +1,180 @@
+"""
+Static files with content-hash fingerprints.
+
+Every file under static/ can also be fetched as name.<hash>.ext. Those URLs
+are served with a year-long immutable Cache-Control, so browsers never
+revalidate them; the plain names get no-cache and revalidate through their
+ETag. The manifest maps logical names to fingerprinted ones, and
+asset_url() resolves /static URLs such as ADMIN_LOGO_URL through it.
+Files that are named by their content already (image derivatives and
+uploads) are immutable under their own names.
+
+scripts/build_static.py writes the manifest and pre-compressed .br/.gz
+siblings at deploy time; without a manifest file the fingerprints are
+computed on first use. Siblings are sent to clients that accept their
+coding, and byte ranges of the plain file are honoured; files go out through
+sendfile where the server supports it.
+"""
+
+import functools
+import hashlib
+import json
+import os
+from mimetypes import guess_type
+from pathlib import Path
+from typing import Dict, Tuple
+
+from starlette.datastructures import Headers
+from starlette.responses import Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette._utils import get_route_path
+from starlette.types import Scope
+
+from app.compression import negotiate
+from app.config import settings
+from app.file_responses import SendfileResponse, ranged
+from app.images import STATIC_DIR, STATIC_URL
+
+MANIFEST_NAME = "manifest.json"
+FINGERPRINT_LENGTH = 12
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+
+# Suffix of the pre-compressed sibling for each content-coding
+PRECOMPRESSED = {"br": ".br", "gzip": ".gz"}
+
+
+def content_addressed_dirs() -> Tuple[str, ...]:
+    """Top-level static/ directories whose files are named by their content."""
+    return (settings.IMAGE_DERIVATIVES_DIR, settings.UPLOAD_DIR)
+
+
+def fingerprint(name: str, data: bytes) -> str:
+    """images/logo.png -> images/logo.<hash>.png"""
+    digest = hashlib.blake2b(data, digest_size=FINGERPRINT_LENGTH // 2).hexdigest()
+    stem, dot, suffix = name.rpartition(".")
+    if not dot or "/" in suffix:
+        return f"{name}.{digest}"
+    return f"{stem}.{digest}.{suffix}"
+
+
+def is_asset(path: Path, directory: Path) -> bool:
+    """Whether a file under ``directory`` gets a fingerprint."""
+    relative = path.relative_to(directory)
+    if relative.parts[0] in content_addressed_dirs():
+        return False
+    if any(part.startswith(".") for part in relative.parts):
+        return False
+    return path.suffix not in PRECOMPRESSED.values() and path.name != MANIFEST_NAME
+
+
+def build_manifest(directory: Path = STATIC_DIR) -> Dict[str, str]:
+    """Logical name -> fingerprinted name of every asset under ``directory``."""
+    manifest = {}
+    for path in sorted(directory.rglob("*")):
+        if path.is_file() and is_asset(path, directory):
+            name = path.relative_to(directory).as_posix()
+            manifest[name] = fingerprint(name, path.read_bytes())
+    return manifest
+
+
+@functools.lru_cache(maxsize=None)
+def manifest() -> Dict[str, str]:
+    """The manifest written by scripts/build_static.py, else a fresh one."""
+    path = STATIC_DIR / MANIFEST_NAME
+    if path.is_file():
+        return json.loads(path.read_text())
+    return build_manifest()
+
+
+@functools.lru_cache(maxsize=None)
+def fingerprinted() -> Dict[str, str]:
+    """Fingerprinted name -> logical name."""
+    return {value: name for name, value in manifest().items()}
+
+
+def asset_url(url: str) -> str:
+    """The fingerprinted form of a /static URL, or the URL itself."""
+    prefix = f"{STATIC_URL}/"
+    if not url.startswith(prefix):
+        return url
+    name = manifest().get(url[len(prefix) :])
+    return f"{prefix}{name}" if name else url
+
+
+class AssetFiles(StaticFiles):
+    """
+    StaticFiles serving fingerprinted names, cache policy, pre-compressed
+    siblings and byte ranges (see the module docstring).
+    """
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        logical = fingerprinted().get(Path(path).as_posix())
+        if logical is not None:
+            path = os.path.normpath(logical)
+        return await super().get_response(path, scope)
+
+    @staticmethod
+    def _immutable(scope: Scope) -> bool:
+        name = get_route_path(scope).lstrip("/")
+        if name in fingerprinted():
+            return True
+        return name.split("/", 1)[0] in content_addressed_dirs()
+
+    def file_response(
+        self,
+        full_path: str,
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+    ) -> Response:
+        request_headers = Headers(scope=scope)
+        headers = {"cache-control": IMMUTABLE if self._immutable(scope) else REVALIDATE}
+        media_type = guess_type(str(full_path))[0] or "text/plain"
+
+        siblings = self._precompressed(str(full_path), stat_result)
+        if siblings:
+            headers["vary"] = "Accept-Encoding"
+        coding = negotiate(
+            request_headers.get("accept-encoding", ""),
+            tuple(c for c in PRECOMPRESSED if c in siblings),
+        )
+        # Ranges are served from the plain file only
+        if coding in siblings and "range" not in request_headers:
+            sibling_path, sibling_stat = siblings[coding]
+            headers["content-encoding"] = coding
+            response = SendfileResponse(
+                sibling_path,
+                status_code=status_code,
+                headers=headers,
+                media_type=media_type,
+                stat_result=sibling_stat,
+            )
+        else:
+            response = SendfileResponse(
+                full_path,
+                status_code=status_code,
+                headers=headers,
+                media_type=media_type,
+                stat_result=stat_result,
+            )
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        if "content-encoding" in response.headers:
+            return response
+        return ranged(response, request_headers)
+
+    @staticmethod
+    def _precompressed(
+        full_path: str, stat_result: os.stat_result
+    ) -> Dict[str, Tuple[str, os.stat_result]]:
+        siblings = {}
+        for coding, suffix in PRECOMPRESSED.items():
+            try:
+                sibling_stat = os.stat(full_path + suffix)
+            except OSError:
+                continue
+            # A sibling older than its file was built from a previous version
+            if sibling_stat.st_mtime >= stat_result.st_mtime:
+                siblings[coding] = (full_path + suffix, sibling_stat)
+        return siblings
@@ -0,0 +1,274 @@
+import functools
+import inspect
+import logging
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Set, Tuple
+
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.orm import InstanceState
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Namespaces whose cached reads embed each other's data (collections carry
+# their suite name and items, items carry their collection name, suites are
+# returned with their collections). A write to any of them invalidates all.
+CATALOG_NAMESPACES = ("suite", "collection", "item")
+
+_MISSING = object()
+_bypass: ContextVar[bool] = ContextVar("read_cache_bypass", default=False)
+
+# Told the namespaces of every invalidation a write makes, e.g. to pass it
+# on to other processes (see app.invalidation)
+_invalidation_hooks: List[Callable[[Tuple[str, ...]], None]] = []
+
+
+class ReadCache:
+    """
+    In-process TTL + LRU cache for CRUD read results.
+
+    Keys are tuples whose first element is a namespace (one per model), so a
+    write can drop every entry that may contain stale rows for that model.
+    Cached values are detached ORM objects and must be treated as read-only.
+    Each namespace also has a generation, bumped by every invalidation, so a
+    read that overlapped a write can tell its result is stale, and for values
+    keyed by the state of the data rather than dropped with it.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 300.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._generations: Dict[str, int] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable) -> Any:
+        """Return the cached value for key, or _MISSING."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return _MISSING
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self.misses += 1
+                return _MISSING
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, *namespaces: str) -> int:
+        """Drop every entry belonging to the given namespaces."""
+        with self._lock:
+            stale = [key for key in self._entries if key[0] in namespaces]
+            for key in stale:
+                del self._entries[key]
+            for namespace in namespaces:
+                self._generations[namespace] = self._generations.get(namespace, 0) + 1
+            self.invalidations += len(stale)
+        if stale:
+            logger.debug(f"Invalidated {len(stale)} cache entries for {namespaces}")
+        return len(stale)
+
+    def generation(self, *namespaces: str) -> int:
+        """How often the given namespaces were invalidated, taken together."""
+        with self._lock:
+            return sum(self._generations.get(n, 0) for n in namespaces)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    @contextmanager
+    def bypass(self):
+        """Read straight from the database for the duration of the block."""
+        token = _bypass.set(True)
+        try:
+            yield
+        finally:
+            _bypass.reset(token)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": settings.READ_CACHE_ENABLED,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+
+read_cache = ReadCache(
+    max_entries=settings.READ_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.READ_CACHE_TTL_SECONDS,
+)
+
+
+def _freeze(value: Any) -> Hashable:
+    """Turn call arguments into something usable inside a cache key."""
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    try:
+        hash(value)
+    except TypeError:
+        return repr(value)
+    return value
+
+
+def _detach(value: Any, seen: Set[int]) -> None:
+    """
+    Expunge the ORM objects in a read result, and the related objects loaded
+    with them, from their session, so a cached value is never tied to the
+    session of the request that read it.
+    """
+    if isinstance(value, (list, tuple, set)):
+        for element in value:
+            _detach(element, seen)
+        return
+    if isinstance(value, dict):
+        for element in value.values():
+            _detach(element, seen)
+        return
+    state = sa_inspect(value, raiseerr=False)
+    if not isinstance(state, InstanceState) or id(value) in seen:
+        return
+    seen.add(id(value))
+    if state.session is not None:
+        state.session.expunge(value)
+    for relationship in state.mapper.relationships:
+        if relationship.key in state.dict:
+            _detach(state.dict[relationship.key], seen)
+
+
+def cached(namespace: str) -> Callable:
+    """
+    Cache the result of an async CRUD read method.
+
+    The key is built from the namespace, the method's qualified name and its
+    bound arguments (``self`` and the session are ignored), so positional and
+    keyword calls share entries. Results are detached from the session
+    before they are shared, and a result read while a write invalidated the
+    namespace is returned but not cached.
+
+    ``method.peek(...)`` takes the same arguments and returns the cached
+    result, or None, without ever calling the method.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        signature = inspect.signature(func)
+
+        def cache_key(args: tuple, kwargs: dict) -> Hashable:
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            return (
+                namespace,
+                func.__qualname__,
+                tuple(
+                    (name, _freeze(value))
+                    for name, value in bound.arguments.items()
+                    if name not in ("self", "db")
+                ),
+            )
+
+        def peek(*args, **kwargs) -> Any:
+            if not settings.READ_CACHE_ENABLED or _bypass.get():
+                return None
+            value = read_cache.get(cache_key(args, kwargs))
+            if value is _MISSING:
+                return None
+            return list(value) if isinstance(value, list) else value
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            if not settings.READ_CACHE_ENABLED or _bypass.get():
+                return await func(*args, **kwargs)
+
+            key = cache_key(args, kwargs)
+            value = read_cache.get(key)
+            if value is not _MISSING:
+                return list(value) if isinstance(value, list) else value
+
+            generation = read_cache.generation(namespace)
+            value = await func(*args, **kwargs)
+            if isinstance(value, (list, tuple)):
+                value = list(value)
+            _detach(value, set())
+            if read_cache.generation(namespace) == generation:
+                read_cache.set(key, value)
+            return list(value) if isinstance(value, list) else value
+
+        wrapper.peek = peek
+        return wrapper
+
+    return decorator
+
+
+def invalidates(*namespaces: str) -> Callable:
+    """
+    Mark an async CRUD write method.
+
+    Nested reads made by the method skip the cache (so the object being
+    modified is never a shared cached instance), and the given namespaces are
+    invalidated once the method returns, i.e. after its commit succeeded.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            with read_cache.bypass():
+                result = await func(*args, **kwargs)
+            invalidate(namespaces)
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+def catalog_version() -> int:
+    """
+    Changes whenever suites, collections or items are written, so a value
+    cached under it is never served after a write (in this process).
+    """
+    return read_cache.generation(*CATALOG_NAMESPACES)
+
+
+def on_invalidate(hook: Callable[[Tuple[str, ...]], None]) -> None:
+    """Call ``hook`` with the namespaces of every write's invalidation."""
+    _invalidation_hooks.append(hook)
+
+
+def invalidate(namespaces: Iterable[str]) -> int:
+    """
+    Invalidate namespaces after a write, here and through the hooks in other
+    processes. Also for code paths that bypass the CRUD layer.
+    """
+    namespaces = tuple(namespaces)
+    for hook in _invalidation_hooks:
+        hook(namespaces)
+    return read_cache.invalidate(*namespaces)
@@ -0,0 +1,122 @@
+"""
+The catalog version: the catalog_version_seq sequence, which triggers
+advance on every write to suites, collections or items, whichever worker or
+tool made it, sending the new value on the catalog_version channel.
+
+last_value alone can't tell when the data changed: nextval is not
+transactional, so it moves before the write commits. A worker dropping its
+cache then would cache the old rows again and, the version not moving on
+commit, keep them. Notifications are delivered only on commit (and never for
+a rolled-back write), so each worker follows those instead, over the
+invalidation listener's connection (app.invalidation), and drops its cached
+catalog reads on every one. Writes made through another worker, the admin
+or raw SQL are seen within milliseconds instead of when the entries expire.
+
+The version is sent to clients as X-Catalog-Version, for keying their own
+caches; requests never query it.
+"""
+
+import asyncio
+import logging
+from typing import Optional, Set
+
+from sqlalchemy import text
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.cache import CATALOG_NAMESPACES, read_cache
+from app.config import settings
+from app.database import engine
+from app.invalidation import invalidation_listener
+from app.models.catalog_version import catalog_version_seq
+
+logger = logging.getLogger(__name__)
+
+CATALOG_VERSION_HEADER = "X-Catalog-Version"
+# Notified by the bump_catalog_version() trigger with the new version
+CATALOG_VERSION_CHANNEL = "catalog_version"
+
+
+class CatalogVersionWatcher:
+    """Keeps ``version`` at the last committed catalog version."""
+
+    def __init__(self):
+        self.version: Optional[int] = None
+        self.bumps = 0
+        self._bumping: Set[asyncio.Task] = set()
+
+    async def fetch(self) -> Optional[int]:
+        async with engine.connect() as conn:
+            return await conn.scalar(
+                text(f"SELECT last_value FROM {catalog_version_seq.name}")
+            )
+
+    async def catch_up(self) -> None:
+        """
+        Take the version from the sequence, once listening: there is no
+        notification to go by until the next write, and the listener has
+        just cleared the cache anyway.
+        """
+        self.version = await self.fetch()
+
+    def on_notification(self, payload: str) -> None:
+        # Local only: the write was made elsewhere, or already invalidated here
+        read_cache.invalidate(*CATALOG_NAMESPACES)
+        version = int(payload)
+        if self.version is None or version > self.version:
+            logger.debug(f"Catalog version {self.version} -> {version}")
+            self.version = version
+            return
+        # Committed after a write that took a later value (or after catch_up
+        # read last_value): the version was already reported for data without
+        # this write, so move it past that for every worker.
+        task = asyncio.get_running_loop().create_task(self._bump())
+        self._bumping.add(task)
+        task.add_done_callback(self._bumping.discard)
+
+    async def _bump(self) -> None:
+        try:
+            async with engine.connect() as conn:
+                await conn.execute(
+                    text("SELECT pg_notify(:channel, nextval(:sequence)::text)"),
+                    {
+                        "channel": CATALOG_VERSION_CHANNEL,
+                        "sequence": catalog_version_seq.name,
+                    },
+                )
+                await conn.commit()
+            self.bumps += 1
+        except Exception:
+            # The cache is invalidated already; only the header lags behind
+            logger.warning("Could not bump the catalog version", exc_info=True)
+
+
+catalog_watcher = CatalogVersionWatcher()
+invalidation_listener.subscribe(
+    CATALOG_VERSION_CHANNEL,
+    catalog_watcher.on_notification,
+    on_listening=catalog_watcher.catch_up,
+)
+
+
+class CatalogVersionMiddleware:
+    """Adds X-Catalog-Version to API responses once the version is known."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not scope["path"].startswith(settings.API_V1_STR):
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message: Message) -> None:
+            version = catalog_watcher.version
+            if message["type"] == "http.response.start" and version is not None:
+                headers = list(message.get("headers", []))
+                headers.append(
+                    (CATALOG_VERSION_HEADER.lower().encode(), str(version).encode())
+                )
+                message["headers"] = headers
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
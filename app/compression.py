@@ -0,0 +1,258 @@
+"""
+gzip/brotli response compression negotiated from Accept-Encoding.
+
+Buffered responses of at least COMPRESSION_MIN_SIZE bytes are compressed
+in one go, and the compressed body is kept under the digest of the raw body
+in a cache of its own, bounded by COMPRESSION_CACHE_MAX_BYTES, so a hot page
+is compressed once rather than on every hit. Streaming responses (exports) are compressed chunk by chunk.
+Brotli is offered only when the brotli package is installed.
+"""
+
+import gzip
+import hashlib
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Sequence
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import settings
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Preferred first when the client accepts several with the same q-value
+CODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+    "text/",
+)
+
+
+def negotiate(accept_encoding: str, codings: Sequence[str] = CODINGS) -> Optional[str]:
+    """The content-coding (of ``codings``) to use for an Accept-Encoding header."""
+    weights = {}
+    for part in accept_encoding.split(","):
+        coding, *params = (p.strip() for p in part.split(";"))
+        if not coding:
+            continue
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        weights[coding.lower()] = q
+    best, best_q = None, 0.0
+    for coding in codings:
+        q = weights.get(coding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def compress(body: bytes, coding: str) -> bytes:
+    if coding == "br":
+        return brotli.compress(body, quality=settings.COMPRESSION_BROTLI_QUALITY)
+    # mtime=0 keeps the output (and so its cache entry) deterministic
+    return gzip.compress(body, compresslevel=settings.COMPRESSION_GZIP_LEVEL, mtime=0)
+
+
+class CompressedBodyCache:
+    """
+    LRU of compressed bodies bounded by their total size. Keys carry the
+    digest of the raw body, so entries never go stale and need no TTL or
+    invalidation.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries: "OrderedDict[Hashable, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[bytes]:
+        with self._lock:
+            body = self._entries.get(key)
+            if body is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return body
+
+    def set(self, key: Hashable, body: bytes) -> None:
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.size -= len(previous)
+            self._entries[key] = body
+            self.size += len(body)
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+                self.evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "bytes": self.size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+compressed_cache = CompressedBodyCache(settings.COMPRESSION_CACHE_MAX_BYTES)
+
+
+def compress_cached(body: bytes, coding: str) -> bytes:
+    """compress(), reusing the result for a body seen before."""
+    key = (coding, hashlib.blake2b(body, digest_size=16).digest())
+    cached = compressed_cache.get(key)
+    if cached is not None:
+        return cached
+    compressed = compress(body, coding)
+    compressed_cache.set(key, compressed)
+    return compressed
+
+
+class StreamCompressor:
+    """Incremental compressor flushing every chunk, so streams stay live."""
+
+    def __init__(self, coding: str):
+        self.coding = coding
+        if coding == "br":
+            self._brotli = brotli.Compressor(
+                quality=settings.COMPRESSION_BROTLI_QUALITY
+            )
+        else:
+            self._zlib = zlib.compressobj(
+                settings.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, zlib.MAX_WBITS | 16
+            )
+
+    def compress(self, data: bytes, *, final: bool) -> bytes:
+        if self.coding == "br":
+            out = self._brotli.process(data)
+            return out + (self._brotli.finish() if final else self._brotli.flush())
+        out = self._zlib.compress(data)
+        return out + self._zlib.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+def _compressible(status: int, headers: MutableHeaders) -> bool:
+    if status < 200 or status in (204, 206, 304):
+        return False
+    if "content-encoding" in headers or "content-range" in headers:
+        return False
+    content_type = headers.get("content-type", "")
+    return content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+def _vary_on_accept_encoding(headers: MutableHeaders) -> None:
+    vary = headers.get("vary")
+    if not vary:
+        headers["Vary"] = "Accept-Encoding"
+        return
+    values = [v.strip().lower() for v in vary.split(",")]
+    if "*" not in values and "accept-encoding" not in values:
+        headers["Vary"] = f"{vary}, Accept-Encoding"
+
+
+def _weaken_etag(headers: MutableHeaders) -> None:
+    etag = headers.get("etag")
+    if etag and not etag.startswith("W/"):
+        headers["ETag"] = f"W/{etag}"
+
+
+class CompressionMiddleware:
+    """
+    Pure ASGI middleware. Every response whose body could be compressed
+    gets Vary: Accept-Encoding, including uncompressed ones and 304s, so
+    shared caches keep one copy per coding. Strong ETags are weakened on
+    compressed responses (the bytes differ from the identity encoding);
+    If-None-Match compares weakly, so revalidation still gets a 304.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+
+        coding = negotiate(Headers(scope=scope).get("accept-encoding", ""))
+        start: Optional[Message] = None
+        compressor: Optional[StreamCompressor] = None
+        passthrough = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start, compressor, passthrough
+            if message["type"] == "http.response.start":
+                # Held back until the first body chunk shows the size
+                start = message
+                return
+            if message["type"] != "http.response.body" and start is not None:
+                if not passthrough and compressor is None:
+                    # A body sent some other way (zero-copy sendfile) goes as is
+                    passthrough = True
+                    await send(start)
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if compressor is not None:
+                chunk = compressor.compress(body, final=not more_body)
+                await send({**message, "body": chunk})
+                return
+
+            headers = MutableHeaders(raw=list(start["headers"]))
+            status = start["status"]
+            if status == 304:
+                # Matches the 200 this client would get in its coding
+                _vary_on_accept_encoding(headers)
+                if coding is not None:
+                    _weaken_etag(headers)
+            eligible = _compressible(status, headers) and (
+                more_body or len(body) >= settings.COMPRESSION_MIN_SIZE
+            )
+            if eligible:
+                _vary_on_accept_encoding(headers)
+            if not eligible or coding is None:
+                passthrough = True
+                await send({**start, "headers": headers.raw})
+                await send(message)
+                return
+
+            headers["Content-Encoding"] = coding
+            _weaken_etag(headers)
+            if more_body:
+                compressor = StreamCompressor(coding)
+                body = compressor.compress(body, final=False)
+                del headers["Content-Length"]
+            else:
+                body = compress_cached(body, coding)
+                headers["Content-Length"] = str(len(body))
+            await send({**start, "headers": headers.raw})
+            await send({**message, "body": body})
+
+        await self.app(scope, receive, send_wrapper)
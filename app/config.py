@@ -20,6 +20,101 @@ class Settings(BaseSettings):
         "ADMIN_LOGIN_LOGO_URL", "/static/images/admin_login_logo.png"
     )
 
+    # database pool
+
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", 5))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", 5))
+    DB_POOL_TIMEOUT: int = int(os.getenv("DB_POOL_TIMEOUT", 30))
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", 1800))
+    DB_POOL_PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+    DB_STATEMENT_TIMEOUT_MS: int = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", 15000))
+    DB_ECHO: bool = os.getenv("DB_ECHO", "false").lower() == "true"
+
+    # slow query log (SLOW_QUERY_MS=0 logs every statement)
+
+    SLOW_QUERY_LOG_ENABLED: bool = (
+        os.getenv("SLOW_QUERY_LOG_ENABLED", "true").lower() == "true"
+    )
+    SLOW_QUERY_MS: int = int(os.getenv("SLOW_QUERY_MS", 250))
+    SLOW_QUERY_SAMPLE_RATE: float = float(os.getenv("SLOW_QUERY_SAMPLE_RATE", 1.0))
+    SLOW_QUERY_EXPLAIN_RATE: float = float(os.getenv("SLOW_QUERY_EXPLAIN_RATE", 0.0))
+    SLOW_QUERY_LOG_PARAMETERS: bool = (
+        os.getenv("SLOW_QUERY_LOG_PARAMETERS", "false").lower() == "true"
+    )
+
+    # read cache
+
+    READ_CACHE_ENABLED: bool = os.getenv("READ_CACHE_ENABLED", "true").lower() == "true"
+    READ_CACHE_TTL_SECONDS: int = int(os.getenv("READ_CACHE_TTL_SECONDS", 300))
+    READ_CACHE_MAX_ENTRIES: int = int(os.getenv("READ_CACHE_MAX_ENTRIES", 2048))
+    # Tell other workers about invalidations over LISTEN/NOTIFY, and follow
+    # the catalog version; see app.invalidation and app.catalog_version
+    CACHE_INVALIDATION_ENABLED: bool = (
+        os.getenv("CACHE_INVALIDATION_ENABLED", "true").lower() == "true"
+    )
+
+    # bulk export
+
+    EXPORT_BATCH_SIZE: int = int(os.getenv("EXPORT_BATCH_SIZE", 1000))
+
+    # query budgets declared with @query_budget: off / warn / raise
+
+    QUERY_BUDGET_MODE: str = os.getenv("QUERY_BUDGET_MODE", "warn").lower()
+    QUERY_BUDGET_MAX_REPEATS: int = int(os.getenv("QUERY_BUDGET_MAX_REPEATS", 3))
+
+    # metrics
+
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+
+    # list routes render with TypeAdapter + orjson instead of response_model
+
+    FAST_JSON_RESPONSES: bool = (
+        os.getenv("FAST_JSON_RESPONSES", "true").lower() == "true"
+    )
+
+    # response compression (brotli needs the brotli package; gzip always works)
+
+    COMPRESSION_ENABLED: bool = (
+        os.getenv("COMPRESSION_ENABLED", "true").lower() == "true"
+    )
+    COMPRESSION_MIN_SIZE: int = int(os.getenv("COMPRESSION_MIN_SIZE", 1024))
+    COMPRESSION_GZIP_LEVEL: int = int(os.getenv("COMPRESSION_GZIP_LEVEL", 6))
+    COMPRESSION_BROTLI_QUALITY: int = int(os.getenv("COMPRESSION_BROTLI_QUALITY", 5))
+    # Compressed bodies kept for reuse, in bytes of compressed output (0 = off)
+    COMPRESSION_CACHE_MAX_BYTES: int = int(
+        os.getenv("COMPRESSION_CACHE_MAX_BYTES", 32 * 1024 * 1024)
+    )
+
+    # image derivatives, written to static/IMAGE_DERIVATIVES_DIR (widths in px)
+
+    IMAGE_DERIVATIVE_WIDTHS: str = os.getenv(
+        "IMAGE_DERIVATIVE_WIDTHS", "320,640,960,1280"
+    )
+    IMAGE_DERIVATIVE_FORMATS: str = os.getenv("IMAGE_DERIVATIVE_FORMATS", "webp,jpeg")
+    IMAGE_DERIVATIVES_DIR: str = os.getenv("IMAGE_DERIVATIVES_DIR", "derivatives")
+    IMAGE_JPEG_QUALITY: int = int(os.getenv("IMAGE_JPEG_QUALITY", 82))
+    IMAGE_WEBP_QUALITY: int = int(os.getenv("IMAGE_WEBP_QUALITY", 80))
+    IMAGE_WORKERS: int = int(os.getenv("IMAGE_WORKERS", 2))
+
+    # uploads, stored under static/UPLOAD_DIR and named by content hash
+
+    UPLOAD_DIR: str = os.getenv("UPLOAD_DIR", "uploads")
+    UPLOAD_MAX_IMAGE_BYTES: int = int(
+        os.getenv("UPLOAD_MAX_IMAGE_BYTES", 40 * 1024 * 1024)
+    )
+    UPLOAD_MAX_PDF_BYTES: int = int(
+        os.getenv("UPLOAD_MAX_PDF_BYTES", 200 * 1024 * 1024)
+    )
+
+    # batch writes
+
+    BATCH_MAX_OPERATIONS: int = int(os.getenv("BATCH_MAX_OPERATIONS", 1000))
+
+    # bulk import
+
+    IMPORT_BATCH_SIZE: int = int(os.getenv("IMPORT_BATCH_SIZE", 5000))
+    IMPORT_MAX_REPORTED_ERRORS: int = int(os.getenv("IMPORT_MAX_REPORTED_ERRORS", 1000))
+
     @property
     def async_database_url(self) -> str:
         """Get URL converted for asyncpg"""
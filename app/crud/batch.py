@@ -0,0 +1,172 @@
+import functools
+import uuid
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import column, delete, func, insert, update, values
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.schemas.batch import BatchOperationResult, BatchResult
+
+
+class _BatchFailed(Exception):
+    def __init__(self, indexes: List[int], error: DBAPIError):
+        self.indexes = indexes
+        self.error = error
+
+
+def _row_values(table: Any, data: Dict[str, Any]) -> Dict[str, Any]:
+    # Schemas may carry computed or read-only fields; keep real columns only
+    return {k: v for k, v in data.items() if k in table.c and k != "id"}
+
+
+async def _create(db: AsyncSession, table: Any, ops: List[Tuple[int, Any]], results):
+    rows = [
+        {"id": uuid.uuid4(), **_row_values(table, op.data.model_dump())}
+        for _, op in ops
+    ]
+    # insertmanyvalues: one multi-row INSERT ... RETURNING, rows in input order
+    stmt = insert(table).returning(table.c.id, sort_by_parameter_order=True)
+    try:
+        created = (await db.execute(stmt, rows)).scalars().all()
+    except DBAPIError as exc:
+        raise _BatchFailed([index for index, _ in ops], exc) from exc
+    for (index, _), row_id in zip(ops, created):
+        results[index] = BatchOperationResult(
+            index=index, op="create", id=row_id, status="created"
+        )
+
+
+# Given the changed columns and the VALUES source, more columns to assign
+UpdateHook = Callable[[Tuple[str, ...], Any], Dict[str, Any]]
+
+
+async def _update(
+    db: AsyncSession,
+    table: Any,
+    ops: List[Tuple[int, Any]],
+    results,
+    on_update: Optional[UpdateHook] = None,
+):
+    # One UPDATE ... FROM (VALUES ...) per distinct set of changed columns
+    groups = defaultdict(list)
+    for index, op in ops:
+        data = _row_values(table, op.data.model_dump(exclude_unset=True))
+        groups[tuple(sorted(data))].append((index, op.id, data))
+
+    for columns, members in groups.items():
+        source = values(
+            column("id", table.c.id.type),
+            *(column(name, table.c[name].type) for name in columns),
+            name="batch",
+        ).data([(row_id, *(data[c] for c in columns)) for _, row_id, data in members])
+        # An update without fields still bumps updated_at (and so the ETags)
+        assignments = {name: source.c[name] for name in columns} or {
+            "updated_at": func.now()
+        }
+        if on_update is not None:
+            assignments.update(on_update(columns, source))
+        stmt = (
+            update(table)
+            .where(table.c.id == source.c.id)
+            .values(assignments)
+            .returning(table.c.id)
+        )
+        try:
+            updated = set((await db.execute(stmt)).scalars().all())
+        except DBAPIError as exc:
+            raise _BatchFailed([index for index, _, _ in members], exc) from exc
+        for index, row_id, _ in members:
+            results[index] = BatchOperationResult(
+                index=index,
+                op="update",
+                id=row_id,
+                status="updated" if row_id in updated else "not_found",
+            )
+
+
+async def _delete(db: AsyncSession, table: Any, ops: List[Tuple[int, Any]], results):
+    stmt = (
+        delete(table)
+        .where(table.c.id.in_([op.id for _, op in ops]))
+        .returning(table.c.id)
+    )
+    try:
+        deleted = set((await db.execute(stmt)).scalars().all())
+    except DBAPIError as exc:
+        raise _BatchFailed([index for index, _ in ops], exc) from exc
+    for index, op in ops:
+        results[index] = BatchOperationResult(
+            index=index,
+            op="delete",
+            id=op.id,
+            status="deleted" if op.id in deleted else "not_found",
+        )
+
+
+async def apply_batch(
+    db: AsyncSession,
+    model: Any,
+    operations: Sequence[Any],
+    *,
+    on_update: Optional[UpdateHook] = None,
+) -> BatchResult:
+    """
+    Apply create/update/delete operations on model's table in one
+    transaction: all creates in one INSERT, updates in one UPDATE per set of
+    changed columns, all deletes in one DELETE, each with RETURNING so every
+    operation gets its own result.
+
+    Updates and deletes of missing rows are reported as not_found and don't
+    stop the batch. A database error (e.g. a unique or foreign key
+    violation) rolls the whole batch back; the operations of the failing
+    statement are marked failed and all others rolled_back.
+
+    ``on_update(columns, source)`` may add assignments to each UPDATE, for
+    columns derived from the changed ones.
+    """
+    table = model.__table__
+    by_kind = defaultdict(list)
+    for index, op in enumerate(operations):
+        by_kind[op.op].append((index, op))
+
+    results: List[BatchOperationResult] = [None] * len(operations)
+    try:
+        for kind, apply in (
+            ("create", _create),
+            ("update", functools.partial(_update, on_update=on_update)),
+            ("delete", _delete),
+        ):
+            if by_kind[kind]:
+                await apply(db, table, by_kind[kind], results)
+        await db.commit()
+    except _BatchFailed as failure:
+        await db.rollback()
+        failed = set(failure.indexes)
+        error = str(failure.error.orig)
+        return BatchResult(
+            committed=False,
+            results=[
+                BatchOperationResult(
+                    index=index,
+                    op=op.op,
+                    id=getattr(op, "id", None),
+                    status="failed" if index in failed else "rolled_back",
+                    error=error if index in failed else None,
+                )
+                for index, op in enumerate(operations)
+            ],
+        )
+
+    counts = defaultdict(int)
+    for result in results:
+        counts[result.status] += 1
+    return BatchResult(
+        committed=True,
+        created=counts["created"],
+        updated=counts["updated"],
+        deleted=counts["deleted"],
+        not_found=counts["not_found"],
+        results=results,
+    )
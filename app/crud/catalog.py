@@ -0,0 +1,109 @@
+from typing import Any, Dict, List
+
+import orjson
+from sqlalchemy import Text, cast, func, literal_column, select
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud.item import first_image
+from app.models.collection import Collection
+from app.models.item import Item
+from app.models.suite import Suite
+
+_EMPTY_ARRAY = literal_column("'[]'::json")
+
+
+def _json_object(**fields: Any):
+    """json_build_object() of keyword name -> column expression."""
+    args = []
+    for name, value in fields.items():
+        args.extend((name, value))
+    return func.json_build_object(*args)
+
+
+def _json_array(value: Any, *order_by: Any):
+    """json_agg() in a given order, [] rather than NULL when there are no rows."""
+    return func.coalesce(
+        func.json_agg(aggregate_order_by(value, *order_by)), _EMPTY_ARRAY
+    )
+
+
+def catalog_tree_select():
+    """
+    One statement returning every suite with its collections and their item
+    summaries as a single JSON array, nested by correlated json_agg
+    subqueries answered from the suite_id and collection_id indexes.
+    """
+    items = (
+        select(
+            _json_array(
+                _json_object(
+                    id=Item.id,
+                    name=Item.name,
+                    price=Item.price,
+                    category=Item.category,
+                    cover_image=first_image(),
+                    cover_variants=Item.image_variants[first_image()],
+                    collection_id=Item.collection_id,
+                    collection_name=Collection.name,
+                    created_at=Item.created_at,
+                    updated_at=Item.updated_at,
+                ),
+                Item.created_at.desc(),
+                Item.id.desc(),
+            )
+        )
+        .where(Item.collection_id == Collection.id)
+        .correlate(Collection)
+        .scalar_subquery()
+    )
+    collections = (
+        select(
+            _json_array(
+                _json_object(
+                    id=Collection.id,
+                    name=Collection.name,
+                    description=Collection.description,
+                    is_active=Collection.is_active,
+                    display_order=Collection.display_order,
+                    suite_id=Collection.suite_id,
+                    created_at=Collection.created_at,
+                    updated_at=Collection.updated_at,
+                    items=items,
+                ),
+                Collection.display_order,
+                Collection.id,
+            )
+        )
+        .where(Collection.suite_id == Suite.id)
+        .correlate(Suite)
+        .scalar_subquery()
+    )
+    tree = _json_array(
+        _json_object(
+            id=Suite.id,
+            name=Suite.name,
+            description=Suite.description,
+            is_active=Suite.is_active,
+            created_at=Suite.created_at,
+            updated_at=Suite.updated_at,
+            collections=collections,
+        ),
+        Suite.name,
+        Suite.id,
+    )
+    # As text: orjson parses it faster than the driver's json codec
+    return select(cast(tree, Text))
+
+
+class CatalogCRUD:
+    async def get_tree(self, db: AsyncSession) -> List[Dict[str, Any]]:
+        """
+        Every suite, its collections (in display order) and their items
+        (newest first, as ItemSummary fields), in one statement.
+        """
+        result = await db.execute(catalog_tree_select())
+        return orjson.loads(result.scalar_one())
+
+
+catalog = CatalogCRUD()
@@ -1,16 +1,61 @@
-from typing import List, Optional
-from sqlalchemy import select
+from typing import Any, List, Optional
+from sqlalchemy import func, select
 from sqlalchemy.orm import selectinload
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from sqlalchemy.orm import selectinload, joinedload
 
 from app.models.collection import Collection
+from app.models.item import Item
+from app.models.suite import Suite
 from app.schemas.collection import CollectionCreate, CollectionUpdate
+from app.cache import CATALOG_NAMESPACES, cached, invalidates
+from app.crud.version import ListVersion, get_list_version
+from app.crud.pagination import normalize_order_by, paginate
+from app.crud.fieldsets import FieldSet
+from app.crud.batch import apply_batch
+from app.crud.item import first_image
+from app.schemas.batch import BatchResult
 from sqlalchemy.dialects.postgresql import UUID
 
+COLLECTION_SORT_FIELDS = ("display_order", "name", "created_at", "updated_at")
+
+
+def collection_summary_select():
+    """
+    Collection rows with the columns of a CollectionSummary. Item count and
+    cover image are correlated subqueries answered from
+    ix_items_collection_id_created_at, so no item rows are loaded.
+    """
+    item_count = (
+        select(func.count(Item.id))
+        .where(Item.collection_id == Collection.id)
+        .scalar_subquery()
+    )
+    cover_image = (
+        select(first_image())
+        .where(Item.collection_id == Collection.id, first_image().is_not(None))
+        .order_by(Item.created_at.desc(), Item.id.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+    return select(
+        Collection.id,
+        Collection.name,
+        Collection.description,
+        Collection.is_active,
+        Collection.display_order,
+        Collection.suite_id,
+        Suite.name.label("suite_name"),
+        item_count.label("item_count"),
+        cover_image.label("cover_image"),
+        Collection.created_at,
+        Collection.updated_at,
+    ).outerjoin(Suite, Collection.suite_id == Suite.id)
+
 
 class CollectionCRUD:
+    @invalidates(*CATALOG_NAMESPACES)
     async def create(self, db: AsyncSession, *, obj_in: CollectionCreate) -> Collection:
         """
         Create a new collection.
@@ -40,7 +85,15 @@ class CollectionCRUD:
         await db.refresh(db_collection)
         return db_collection
 
+    @staticmethod
+    def _load_options(fieldset: Optional[FieldSet], *extra: str) -> list:
+        """The items eagerly, or what the fieldset selects plus extra columns."""
+        if fieldset is None:
+            return [selectinload(Collection.items)]
+        return fieldset.options(*extra)
+
     # crud/collection.py
+    @cached("collection")
     async def get(self, db: AsyncSession, collection_id: UUID) -> Optional[Collection]:
         stmt = (
             select(Collection)
@@ -53,15 +106,38 @@ class CollectionCRUD:
         result = await db.execute(stmt)
         return result.scalars().first()
 
+    @cached("collection")
+    async def get_by_name(
+        self, db: AsyncSession, *, name: str, fieldset: Optional[FieldSet] = None
+    ) -> Optional[Collection]:
+        """
+        Get a collection by name with items and suite eagerly loaded, or with
+        only what a fieldset selects.
+        """
+        if fieldset is None:
+            options = [selectinload(Collection.items), joinedload(Collection.suite)]
+        else:
+            options = fieldset.options()
+        stmt = select(Collection).options(*options).filter(Collection.name == name)
+        result = await db.execute(stmt)
+        return result.scalars().first()
+
+    @cached("collection")
     async def get_by_suite_name(
-        self, db: AsyncSession, *, suite_name: str, skip: int = 0, limit: int = 100
+        self,
+        db: AsyncSession,
+        *,
+        suite_name: str,
+        skip: int = 0,
+        limit: int = 100,
+        fieldset: Optional[FieldSet] = None,
     ) -> List[Collection]:
         """
         Get all collections for a specific suite by suite name.
         """
         stmt = (
             select(Collection)
-            .options(selectinload(Collection.items))
+            .options(*self._load_options(fieldset))
             .join(Collection.suite)  # Join through the relationship
             .filter(Suite.name == suite_name)
             .offset(skip)
@@ -70,21 +146,71 @@ class CollectionCRUD:
         result = await db.execute(stmt)
         return result.scalars().all()
 
+    @cached("collection")
     async def get_all(
-        self, db: AsyncSession, *, skip: int = 0, limit: int = 100
+        self,
+        db: AsyncSession,
+        *,
+        skip: int = 0,
+        limit: int = 100,
+        order_by: str = "display_order",
+        cursor: Optional[str] = None,
+        fieldset: Optional[FieldSet] = None,
     ) -> List[Collection]:
         """
-        Get all collections.
+        Get all collections. Pass the cursor of the previous page instead of
+        skip for keyset pagination.
         """
-        stmt = (
-            select(Collection)
-            .options(selectinload(Collection.items))
-            .offset(skip)
-            .limit(limit)
+        order_by = normalize_order_by(order_by, COLLECTION_SORT_FIELDS, "display_order")
+        stmt = select(Collection).options(
+            *self._load_options(fieldset, order_by.lstrip("-"))
+        )
+        stmt = paginate(
+            stmt, Collection, order_by=order_by, skip=skip, limit=limit, cursor=cursor
         )
         result = await db.execute(stmt)
         return result.scalars().all()
 
+    @cached("collection")
+    async def get_summaries(
+        self,
+        db: AsyncSession,
+        *,
+        suite_name: Optional[str] = None,
+        skip: int = 0,
+        limit: int = 100,
+        order_by: str = "display_order",
+        cursor: Optional[str] = None,
+    ) -> List[Any]:
+        """
+        Collection summaries (optionally of one suite) without loading any
+        items. Pass the cursor of the previous page instead of skip for
+        keyset pagination.
+        """
+        order_by = normalize_order_by(order_by, COLLECTION_SORT_FIELDS, "display_order")
+        stmt = collection_summary_select()
+        if suite_name is not None:
+            stmt = stmt.filter(Suite.name == suite_name)
+        stmt = paginate(
+            stmt, Collection, order_by=order_by, skip=skip, limit=limit, cursor=cursor
+        )
+        result = await db.execute(stmt)
+        return result.all()
+
+    async def get_version(
+        self, db: AsyncSession, *, suite_name: Optional[str] = None
+    ) -> ListVersion:
+        """
+        Count and newest modification time of a collection listing, used as
+        its HTTP validator.
+        """
+        criteria = []
+        if suite_name is not None:
+            suite_id = select(Suite.id).filter(Suite.name == suite_name)
+            criteria.append(Collection.suite_id.in_(suite_id))
+        return await get_list_version(db, Collection, *criteria, related=(Suite, Item))
+
+    @invalidates(*CATALOG_NAMESPACES)
     async def update(
         self, db: AsyncSession, *, db_obj: Collection, obj_in: CollectionUpdate
     ) -> Collection:
@@ -99,6 +225,14 @@ class CollectionCRUD:
         await db.refresh(db_obj)
         return db_obj
 
+    @invalidates(*CATALOG_NAMESPACES)
+    async def batch(self, db: AsyncSession, *, operations: List[Any]) -> BatchResult:
+        """
+        Apply create/update/delete operations in one transaction.
+        """
+        return await apply_batch(db, Collection, operations)
+
+    @invalidates(*CATALOG_NAMESPACES)
     async def delete(
         self, db: AsyncSession, *, collection_id: int
     ) -> Optional[Collection]:
@@ -0,0 +1,26 @@
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List
+
+from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+
+from app.config import settings
+
+
+def changed_since(model: Any, since: datetime):
+    """Rows created or last updated at or after since."""
+    return func.coalesce(model.updated_at, model.created_at) >= since
+
+
+async def stream_rows(
+    db: AsyncSession, stmt: Select, *, batch_size: int = 0
+) -> AsyncIterator[List[Dict[str, Any]]]:
+    """
+    Yield the rows of stmt as batches of plain dicts, fetched through a
+    server-side cursor so only one batch is held in memory at a time.
+    """
+    stmt = stmt.execution_options(yield_per=batch_size or settings.EXPORT_BATCH_SIZE)
+    result = await db.stream(stmt)
+    async for partition in result.mappings().partitions():
+        yield [dict(row) for row in partition]
@@ -0,0 +1,228 @@
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import ARRAY, inspect
+from sqlalchemy.orm import joinedload, load_only, raiseload, selectinload
+
+from app.exceptions.fieldsets import InvalidFieldSetError
+from app.models.collection import Collection
+from app.models.item import Item
+from app.models.package import Package
+from app.models.suite import Suite
+from app.models.testimonial import Testimonial
+
+# Loaded whatever the fieldset: identity, and the timestamps HTTP validators use
+ALWAYS_LOADED = ("id", "created_at", "updated_at")
+
+_SELECTOR = re.compile(r"^(?P<name>[a-z_]+)(?:\[(?P<index>\d+)\])?$")
+
+
+class Resource:
+    """
+    What a model exposes to fields= and include=: its (non-deferred) columns,
+    fields derived from a to-one relationship, and the relationships that
+    may be embedded, each mapped to the resource of the related model.
+    """
+
+    def __init__(
+        self,
+        model: Any,
+        *,
+        relations: Optional[Dict[str, str]] = None,
+        derived: Optional[Dict[str, Tuple[str, str]]] = None,
+    ):
+        mapper = inspect(model)
+        self.model = model
+        self.relations = relations or {}
+        self.derived = derived or {}
+        self.columns = tuple(
+            prop.key for prop in mapper.column_attrs if not prop.deferred
+        )
+        self.arrays = frozenset(
+            prop.key
+            for prop in mapper.column_attrs
+            if isinstance(getattr(prop.columns[0].type, "impl", None), ARRAY)
+            or isinstance(prop.columns[0].type, ARRAY)
+        )
+        self.relationships = {
+            name: mapper.relationships[name] for name in self.relations
+        }
+
+    def target(self, relation: str) -> "Resource":
+        return RESOURCES[self.relations[relation]]
+
+
+RESOURCES: Dict[str, Resource] = {}
+RESOURCES.update(
+    item=Resource(
+        Item,
+        relations={"collection": "collection"},
+        derived={"collection_name": ("collection", "name")},
+    ),
+    collection=Resource(
+        Collection,
+        relations={"items": "item", "suite": "suite"},
+        derived={"suite_name": ("suite", "name")},
+    ),
+    suite=Resource(Suite, relations={"collections": "collection"}),
+    package=Resource(Package),
+    testimonial=Resource(Testimonial),
+)
+
+
+def _split(selector: str) -> Tuple[str, Optional[int]]:
+    """("images", 0) for "images[0]", ("name", None) for "name"."""
+    match = _SELECTOR.match(selector)
+    if match is None:
+        raise InvalidFieldSetError(f"Malformed field '{selector}'")
+    index = match.group("index")
+    return match.group("name"), None if index is None else int(index)
+
+
+def _check_selector(resource: Resource, selector: str, *, nested: bool) -> None:
+    name, index = _split(selector)
+    known = resource.columns if nested else (*resource.columns, *resource.derived)
+    if name not in known:
+        hint = f"; embed it with include={name}" if name in resource.relations else ""
+        raise InvalidFieldSetError(
+            f"Unknown field '{selector}' for {resource.model.__tablename__}{hint}"
+        )
+    if index is not None and name not in resource.arrays:
+        raise InvalidFieldSetError(f"Field '{name}' is not an array")
+
+
+def _names(value: Optional[str]) -> List[str]:
+    if not value:
+        return []
+    return list(
+        dict.fromkeys(part.strip() for part in value.split(",") if part.strip())
+    )
+
+
+@dataclass(frozen=True)
+class FieldSet:
+    """
+    The parsed fields= and include= of a request. ``fields`` are the
+    top-level selectors (None for every column), ``include`` pairs each
+    embedded relationship with its own selectors (None for every column).
+    Hashable, so it can be part of a read cache key.
+    """
+
+    resource: str
+    fields: Optional[Tuple[str, ...]] = None
+    include: Tuple[Tuple[str, Optional[Tuple[str, ...]]], ...] = ()
+
+    @classmethod
+    def parse(
+        cls, resource_name: str, fields: Optional[str], include: Optional[str]
+    ) -> "FieldSet":
+        """
+        Parse comma-separated fields ("id,name,images[0],items.name") and
+        include ("items,suite"). Dotted fields narrow an embedded
+        relationship, which they include implicitly.
+        """
+        resource = RESOURCES[resource_name]
+        top: List[str] = []
+        nested: Dict[str, List[str]] = {}
+        for relation in _names(include):
+            if relation not in resource.relations:
+                raise InvalidFieldSetError(
+                    f"Cannot include '{relation}' in "
+                    f"{resource.model.__tablename__}; "
+                    f"available: {', '.join(resource.relations) or 'none'}"
+                )
+            nested.setdefault(relation, [])
+        for selector in _names(fields):
+            relation, dot, sub = selector.partition(".")
+            if not dot:
+                _check_selector(resource, selector, nested=False)
+                top.append(selector)
+            elif relation in resource.relations:
+                _check_selector(resource.target(relation), sub, nested=True)
+                nested.setdefault(relation, []).append(sub)
+            else:
+                raise InvalidFieldSetError(f"Unknown relationship in '{selector}'")
+        return cls(
+            resource=resource_name,
+            fields=tuple(top) if top else None,
+            include=tuple(
+                (relation, tuple(sub) if sub else None)
+                for relation, sub in nested.items()
+            ),
+        )
+
+    def options(self, *extra: str) -> list:
+        """
+        Loader options that fetch only the selected columns (plus
+        ALWAYS_LOADED and ``extra``, e.g. the sort field of a cursor) and
+        only the requested relationships: to-many ones with selectinload,
+        to-one ones with joinedload. Every other relationship raises
+        instead of lazy loading.
+        """
+        resource = RESOURCES[self.resource]
+        model = resource.model
+        columns = {*ALWAYS_LOADED, *extra}
+        related: Dict[str, set] = {}
+        for name, _ in map(_split, self.fields or resource.columns):
+            if name in resource.derived:
+                relation, column = resource.derived[name]
+                related.setdefault(relation, set()).add(column)
+            else:
+                columns.add(name)
+        for relation, sub in self.include:
+            target = resource.target(relation)
+            selected = [_split(s)[0] for s in sub] if sub else target.columns
+            related.setdefault(relation, set()).update(selected)
+
+        options = [load_only(*(getattr(model, name) for name in sorted(columns)))]
+        for relation, selected in related.items():
+            prop = resource.relationships[relation]
+            target = resource.target(relation)
+            # the child side of a one-to-many needs its foreign key to be matched
+            selected = {*ALWAYS_LOADED, *selected}
+            if prop.uselist:
+                selected.update(column.key for column in prop.remote_side)
+            loader = selectinload if prop.uselist else joinedload
+            options.append(
+                loader(getattr(model, relation)).options(
+                    load_only(
+                        *(getattr(target.model, name) for name in sorted(selected))
+                    ),
+                    raiseload("*"),
+                )
+            )
+        options.append(raiseload("*"))
+        return options
+
+    def dump(self, obj: Any) -> Dict[str, Any]:
+        """The selected fields and embedded relationships of a loaded object."""
+        resource = RESOURCES[self.resource]
+        data = _dump(resource, obj, self.fields or resource.columns)
+        for relation, sub in self.include:
+            target = resource.target(relation)
+            value = getattr(obj, relation)
+            selectors = sub or target.columns
+            if resource.relationships[relation].uselist:
+                data[relation] = [_dump(target, child, selectors) for child in value]
+            else:
+                data[relation] = (
+                    None if value is None else _dump(target, value, selectors)
+                )
+        return data
+
+
+def _dump(resource: Resource, obj: Any, selectors: Sequence[str]) -> Dict[str, Any]:
+    data: Dict[str, Any] = {}
+    for name, index in map(_split, selectors):
+        if name in resource.derived:
+            relation, column = resource.derived[name]
+            related = getattr(obj, relation)
+            data[name] = None if related is None else getattr(related, column)
+        elif index is None:
+            data[name] = getattr(obj, name)
+        else:
+            # images[0] and images[2] give a two-element "images" list
+            value = getattr(obj, name) or []
+            data[name] = [*data.get(name, ()), *value[index : index + 1]]
+    return data
@@ -1,16 +1,107 @@
-from typing import List, Optional
-from sqlalchemy import select
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import (
+    String,
+    any_,
+    case,
+    cast,
+    distinct,
+    func,
+    literal,
+    select,
+    true,
+    type_coerce,
+    union_all,
+    update,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB
 from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
 from fastapi import HTTPException
 
-from app.models.item import Item
-from app.schemas.item import ItemCreate, ItemUpdate
+from app.models.item import CategoryEnum, Item
+from app.models.facet import ItemFacetCount
+from app.models.collection import Collection
+from app.schemas.item import ItemCreate, ItemUpdate, ItemImportResult
+from app.schemas.batch import BatchResult
+from app.cache import CATALOG_NAMESPACES, cached, invalidates
+from app.crud.version import ListVersion, get_list_version
+from app.crud.pagination import normalize_order_by, paginate
+from app.crud.fieldsets import FieldSet
+from app.crud.export import changed_since, stream_rows
+from app.crud.item_import import ItemImporter, read_records
+from app.crud.batch import apply_batch
+from app.crud import search as fts
 import uuid
 
+ITEM_SORT_FIELDS = ("created_at", "updated_at", "name", "price")
+ITEM_FACETS = ("category", "colors", "sizes", "fabric")
+ITEM_EXPORT_COLUMNS = (
+    "id",
+    "name",
+    "description",
+    "price",
+    "category",
+    "fabric",
+    "fabric_composition",
+    "colors",
+    "sizes",
+    "images",
+    "collection_id",
+    "collection_name",
+    "created_at",
+    "updated_at",
+)
+
+
+def first_image(images: Any = Item.images):
+    """The first element of an images array column, NULL when it is empty."""
+    # Index the plain array: ListStringType would bind the index as an array too
+    return type_coerce(images, ARRAY(String))[1]
+
+
+def kept_image_variants(images: Any) -> Any:
+    """
+    image_variants without the entries of images not in ``images``, for
+    statements that set images without loading the row.
+    """
+    variant = func.jsonb_each(Item.image_variants).table_valued("key", "value")
+    kept = (
+        select(func.jsonb_object_agg(variant.c.key, variant.c.value))
+        .where(variant.c.key == any_(type_coerce(images, ARRAY(String))))
+        .scalar_subquery()
+    )
+    return func.coalesce(kept, literal({}, JSONB))
+
+
+def _prune_image_variants(columns: Tuple[str, ...], source: Any) -> Dict[str, Any]:
+    # Batch updates: derivatives of images no longer on the item are dropped
+    if "images" not in columns:
+        return {}
+    return {"image_variants": kept_image_variants(source.c.images)}
+
+
+def item_summary_select():
+    """Item rows with only the columns of an ItemSummary."""
+    return select(
+        Item.id,
+        Item.name,
+        Item.price,
+        Item.category,
+        first_image().label("cover_image"),
+        Item.image_variants[first_image()].label("cover_variants"),
+        Item.collection_id,
+        Collection.name.label("collection_name"),
+        Item.created_at,
+        Item.updated_at,
+    ).outerjoin(Collection, Item.collection_id == Collection.id)
+
 
 class ItemCRUD:
+    @invalidates(*CATALOG_NAMESPACES)
     async def create(self, db: AsyncSession, *, obj_in: ItemCreate) -> Item:
         """
         Create a new item. Ensure array fields are passed as Python lists (not JSON strings).
@@ -43,61 +134,413 @@ class ItemCRUD:
 
         return db_item
 
-    async def get(self, db: AsyncSession, *, item_id: uuid.UUID) -> Optional[Item]:
+    @invalidates(*CATALOG_NAMESPACES)
+    async def batch(self, db: AsyncSession, *, operations: List[Any]) -> BatchResult:
+        """
+        Apply create/update/delete operations in one transaction.
+        """
+        return await apply_batch(db, Item, operations, on_update=_prune_image_variants)
+
+    @invalidates(*CATALOG_NAMESPACES)
+    async def bulk_import(
+        self,
+        db: AsyncSession,
+        *,
+        lines: Iterable[str],
+        fmt: str,
+        dry_run: bool = False,
+        batch_size: int = 0,
+    ) -> ItemImportResult:
+        """
+        Create or update items from CSV or NDJSON lines in one transaction.
+
+        Rows are validated and COPYed into a staging table in batches, then
+        merged into items with a single statement. Invalid rows are reported
+        and skipped. With dry_run the merge is rolled back, so the counts
+        show what the import would do.
+        """
+        importer = ItemImporter(db, batch_size=batch_size)
+        return await importer.run(read_records(lines, fmt), dry_run=dry_run)
+
+    @staticmethod
+    def _load_options(fieldset: Optional[FieldSet], *extra: str) -> list:
+        """The collection eagerly, or what the fieldset selects plus extra columns."""
+        if fieldset is None:
+            return [selectinload(Item.collection)]
+        return fieldset.options(*extra)
+
+    @cached("item")
+    async def get(
+        self,
+        db: AsyncSession,
+        *,
+        item_id: uuid.UUID,
+        fieldset: Optional[FieldSet] = None,
+    ) -> Optional[Item]:
         """
-        Get an item by ID with collection relationship eagerly loaded.
+        Get an item by ID with collection relationship eagerly loaded, or
+        with only what a fieldset selects.
         """
         stmt = (
             select(Item)
-            .options(selectinload(Item.collection))
+            .options(*self._load_options(fieldset))
             .filter(Item.id == item_id)
         )
         result = await db.execute(stmt)
         return result.scalars().first()
 
+    @cached("item")
     async def get_by_collection(
         self,
         db: AsyncSession,
         *,
         collection_id: uuid.UUID,
         skip: int = 0,
-        limit: int = 100
+        limit: int = 100,
+        order_by: str = "-created_at",
+        cursor: Optional[str] = None,
+        fieldset: Optional[FieldSet] = None,
     ) -> List[Item]:
+        """
+        Get the items of a collection. Pass the cursor of the previous page
+        instead of skip for keyset pagination.
+        """
+        order_by = normalize_order_by(order_by, ITEM_SORT_FIELDS, "-created_at")
         stmt = (
             select(Item)
-            .options(selectinload(Item.collection))
+            .options(*self._load_options(fieldset, order_by.lstrip("-")))
             .filter(Item.collection_id == collection_id)
-            .offset(skip)
-            .limit(limit)
+        )
+        stmt = paginate(
+            stmt, Item, order_by=order_by, skip=skip, limit=limit, cursor=cursor
         )
         result = await db.execute(stmt)
         return result.scalars().all()
 
+    @cached("item")
     async def get_all(
         self,
         db: AsyncSession,
         *,
         skip: int = 0,
         limit: int = 100,
-        order_by: str = "-created_at"
+        order_by: str = "-created_at",
+        cursor: Optional[str] = None,
+        fieldset: Optional[FieldSet] = None,
+    ) -> List[Item]:
+        """
+        Get all items. Pass the cursor of the previous page instead of skip
+        for keyset pagination.
+        """
+        order_by = normalize_order_by(order_by, ITEM_SORT_FIELDS, "-created_at")
+        stmt = select(Item).options(*self._load_options(fieldset, order_by.lstrip("-")))
+        stmt = paginate(
+            stmt, Item, order_by=order_by, skip=skip, limit=limit, cursor=cursor
+        )
+
+        result = await db.execute(stmt)
+        return result.scalars().all()
+
+    @cached("item")
+    async def get_summaries(
+        self,
+        db: AsyncSession,
+        *,
+        collection_id: Optional[uuid.UUID] = None,
+        skip: int = 0,
+        limit: int = 100,
+        order_by: str = "-created_at",
+        cursor: Optional[str] = None,
+    ) -> List[Any]:
+        """
+        Like get_all (or get_by_collection when collection_id is given), but
+        selects ItemSummary columns instead of loading Item objects.
+        """
+        order_by = normalize_order_by(order_by, ITEM_SORT_FIELDS, "-created_at")
+        stmt = item_summary_select()
+        if collection_id is not None:
+            stmt = stmt.filter(Item.collection_id == collection_id)
+        stmt = paginate(
+            stmt, Item, order_by=order_by, skip=skip, limit=limit, cursor=cursor
+        )
+        result = await db.execute(stmt)
+        return result.all()
+
+    @cached("item")
+    async def search(
+        self,
+        db: AsyncSession,
+        *,
+        query: str,
+        limit: int = 20,
+        cursor: Optional[str] = None,
     ) -> List[Item]:
+        """
+        Full-text search over name, description, fabric and fabric composition,
+        best matches first. Each item gets a ``search_rank`` attribute, which
+        is also the sort key of the "-search_rank" cursor.
+        """
+        tsquery = fts.prefix_tsquery(query)
+        if tsquery is None:
+            return []
+
+        rank = fts.rank(Item.search_vector, tsquery)
+        stmt = (
+            select(Item, rank.label("search_rank"))
+            .options(selectinload(Item.collection))
+            .filter(fts.matches(Item.search_vector, tsquery))
+        )
+        stmt = paginate(
+            stmt,
+            Item,
+            order_by="-search_rank",
+            limit=limit,
+            cursor=cursor,
+            sort_column=rank,
+        )
+        result = await db.execute(stmt)
+
+        items = []
+        for db_item, search_rank in result.all():
+            db_item.search_rank = search_rank
+            items.append(db_item)
+        return items
+
+    def _filter_criteria(
+        self,
+        *,
+        category: Optional[List[CategoryEnum]] = None,
+        colors: Optional[List[str]] = None,
+        sizes: Optional[List[str]] = None,
+        fabric: Optional[List[str]] = None,
+        price_min: Optional[Decimal] = None,
+        price_max: Optional[Decimal] = None,
+    ) -> Dict[str, list]:
+        """
+        WHERE criteria of a facet selection, keyed by facet ("price" for the
+        price range). Values within a facet are OR'ed, facets are AND'ed.
+        """
+        criteria = {}
+        if category:
+            criteria["category"] = [Item.category.in_(category)]
+        if colors:
+            criteria["colors"] = [Item.colors.overlap(list(colors))]
+        if sizes:
+            criteria["sizes"] = [Item.sizes.overlap(list(sizes))]
+        if fabric:
+            criteria["fabric"] = [Item.fabric.in_(fabric)]
+        price = []
+        if price_min is not None:
+            price.append(Item.price >= price_min)
+        if price_max is not None:
+            price.append(Item.price <= price_max)
+        if price:
+            criteria["price"] = price
+        return criteria
+
+    @staticmethod
+    def _criteria_except(criteria: Dict[str, list], facet: Optional[str]) -> list:
+        return [c for name, group in criteria.items() if name != facet for c in group]
+
+    @cached("item")
+    async def filter(
+        self,
+        db: AsyncSession,
+        *,
+        category: Optional[List[CategoryEnum]] = None,
+        colors: Optional[List[str]] = None,
+        sizes: Optional[List[str]] = None,
+        fabric: Optional[List[str]] = None,
+        price_min: Optional[Decimal] = None,
+        price_max: Optional[Decimal] = None,
+        limit: int = 100,
+        order_by: str = "-created_at",
+        cursor: Optional[str] = None,
+    ) -> List[Item]:
+        """
+        Items matching a facet selection. Pass the cursor of the previous
+        page for keyset pagination.
+        """
+        order_by = normalize_order_by(order_by, ITEM_SORT_FIELDS, "-created_at")
+        criteria = self._filter_criteria(
+            category=category,
+            colors=colors,
+            sizes=sizes,
+            fabric=fabric,
+            price_min=price_min,
+            price_max=price_max,
+        )
         stmt = (
             select(Item)
             .options(selectinload(Item.collection))
-            .offset(skip)
-            .limit(limit)
+            .filter(*self._criteria_except(criteria, None))
+        )
+        stmt = paginate(stmt, Item, order_by=order_by, limit=limit, cursor=cursor)
+        result = await db.execute(stmt)
+        return result.scalars().all()
+
+    def _facet_count_stmt(self, facet: str, criteria: list):
+        """
+        (facet, value, count) rows of one facet under criteria. Without
+        criteria the counts come from the trigger-maintained
+        item_facet_counts table instead of scanning items.
+        """
+        if not criteria:
+            return select(
+                ItemFacetCount.facet,
+                ItemFacetCount.value,
+                ItemFacetCount.item_count,
+            ).filter(ItemFacetCount.facet == facet, ItemFacetCount.item_count > 0)
+
+        if facet in ("colors", "sizes"):
+            values = (
+                func.unnest(getattr(Item, facet))
+                .table_valued("value")
+                .render_derived(name=f"{facet}_value")
+            )
+            return (
+                select(
+                    literal(facet),
+                    values.c.value,
+                    func.count(distinct(Item.id)),
+                )
+                .select_from(Item)
+                .join(values, true())
+                .filter(*criteria)
+                .group_by(values.c.value)
+            )
+
+        column = getattr(Item, facet)
+        if facet == "category":
+            # the enum's label, as stored in item_facet_counts
+            column = cast(column, String)
+        return (
+            select(literal(facet), column, func.count())
+            .filter(column.is_not(None), *criteria)
+            .group_by(column)
         )
 
-        if order_by.startswith("-"):
-            field = getattr(Item, order_by[1:])
-            stmt = stmt.order_by(field.desc())
+    @cached("item")
+    async def get_facet_counts(
+        self,
+        db: AsyncSession,
+        *,
+        category: Optional[List[CategoryEnum]] = None,
+        colors: Optional[List[str]] = None,
+        sizes: Optional[List[str]] = None,
+        fabric: Optional[List[str]] = None,
+        price_min: Optional[Decimal] = None,
+        price_max: Optional[Decimal] = None,
+    ) -> dict:
+        """
+        Value counts of every facet for a selection, plus the matching total
+        and the price range.
+
+        Each facet is counted with the filters on the other facets only, so
+        the values a shopper could still add to a facet keep their counts.
+        """
+        criteria = self._filter_criteria(
+            category=category,
+            colors=colors,
+            sizes=sizes,
+            fabric=fabric,
+            price_min=price_min,
+            price_max=price_max,
+        )
+        matching = self._criteria_except(criteria, None)
+        if matching:
+            total_stmt = select(literal("_all"), literal(""), func.count()).filter(
+                *matching
+            )
         else:
-            field = getattr(Item, order_by)
-            stmt = stmt.order_by(field.asc())
+            total_stmt = self._facet_count_stmt("_all", [])
 
+        stmt = union_all(
+            total_stmt,
+            *(
+                self._facet_count_stmt(facet, self._criteria_except(criteria, facet))
+                for facet in ITEM_FACETS
+            ),
+        )
         result = await db.execute(stmt)
-        return result.scalars().all()
 
+        facets = {facet: [] for facet in ITEM_FACETS}
+        total = 0
+        for facet, value, count in result.all():
+            if facet == "_all":
+                total = count
+            else:
+                facets[facet].append({"value": value, "count": count})
+        for values in facets.values():
+            values.sort(key=lambda v: (-v["count"], v["value"]))
+
+        price_stmt = select(func.min(Item.price), func.max(Item.price)).filter(
+            *self._criteria_except(criteria, "price")
+        )
+        low, high = (await db.execute(price_stmt)).one()
+        facets["price"] = {"min": low, "max": high}
+
+        return {"facets": facets, "total": total}
+
+    def export(
+        self,
+        db: AsyncSession,
+        *,
+        since: Optional[datetime] = None,
+        collection_id: Optional[uuid.UUID] = None,
+        category: Optional[List[CategoryEnum]] = None,
+        colors: Optional[List[str]] = None,
+        sizes: Optional[List[str]] = None,
+        fabric: Optional[List[str]] = None,
+        price_min: Optional[Decimal] = None,
+        price_max: Optional[Decimal] = None,
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Stream ITEM_EXPORT_COLUMNS of every matching item in batches, oldest
+        first. ``since`` keeps items created or updated from that time on.
+        """
+        criteria = self._criteria_except(
+            self._filter_criteria(
+                category=category,
+                colors=colors,
+                sizes=sizes,
+                fabric=fabric,
+                price_min=price_min,
+                price_max=price_max,
+            ),
+            None,
+        )
+        if collection_id is not None:
+            criteria.append(Item.collection_id == collection_id)
+        if since is not None:
+            criteria.append(changed_since(Item, since))
+
+        columns = [
+            getattr(Item, name)
+            for name in ITEM_EXPORT_COLUMNS
+            if name != "collection_name"
+        ]
+        stmt = (
+            select(*columns, Collection.name.label("collection_name"))
+            .outerjoin(Collection, Item.collection_id == Collection.id)
+            .filter(*criteria)
+            .order_by(Item.created_at, Item.id)
+        )
+        return stream_rows(db, stmt)
+
+    async def get_version(
+        self, db: AsyncSession, *, collection_id: Optional[uuid.UUID] = None
+    ) -> ListVersion:
+        """
+        Count and newest modification time of an item listing, used as its
+        HTTP validator.
+        """
+        criteria = []
+        if collection_id is not None:
+            criteria.append(Item.collection_id == collection_id)
+        return await get_list_version(db, Item, *criteria, related=(Collection,))
+
+    @invalidates(*CATALOG_NAMESPACES)
     async def update(
         self, db: AsyncSession, *, db_obj: Item, obj_in: ItemUpdate
     ) -> Item:
@@ -116,6 +559,14 @@ class ItemCRUD:
 
         for field, value in update_data.items():
             setattr(db_obj, field, value)
+        if "images" in update_data:
+            # Derivatives of images no longer on the item are dropped
+            images = set(db_obj.images or [])
+            db_obj.image_variants = {
+                src: variants
+                for src, variants in (db_obj.image_variants or {}).items()
+                if src in images
+            }
 
         db.add(db_obj)
         try:
@@ -127,6 +578,64 @@ class ItemCRUD:
 
         return db_obj
 
+    @invalidates(*CATALOG_NAMESPACES)
+    async def set_image_variants(
+        self, db: AsyncSession, *, db_obj: Item, variants: Dict[str, Any]
+    ) -> Item:
+        """
+        Store the derivatives of an item's images, as built by
+        app.images.image_pipeline.
+        """
+        if variants == db_obj.image_variants:
+            return db_obj
+        db_obj.image_variants = variants
+        db.add(db_obj)
+        await db.commit()
+        await db.refresh(db_obj)
+        return db_obj
+
+    @invalidates(*CATALOG_NAMESPACES)
+    async def append_image(
+        self,
+        db: AsyncSession,
+        *,
+        db_obj: Item,
+        url: str,
+        variants: Optional[Dict[str, Any]] = None,
+    ) -> Optional[Item]:
+        """
+        Append an image URL to an item, unless it is already there, and store
+        its derivatives when given. One UPDATE does both, so concurrent
+        uploads to an item can't drop each other's images. None when the
+        item is gone.
+        """
+        images = type_coerce(Item.images, ARRAY(String))
+        values = {
+            "images": case(
+                (literal(url) == any_(images), images),
+                else_=func.array_append(images, url),
+            )
+        }
+        if variants is not None:
+            values["image_variants"] = Item.image_variants.op("||")(
+                literal({url: variants}, JSONB)
+            )
+        stmt = (
+            update(Item)
+            .filter(Item.id == db_obj.id)
+            .values(**values)
+            .returning(Item.images, Item.image_variants, Item.updated_at)
+            .execution_options(synchronize_session=False)
+        )
+        row = (await db.execute(stmt)).first()
+        await db.commit()
+        if row is None:
+            return None
+        for name, value in row._mapping.items():
+            set_committed_value(db_obj, name, value)
+        return db_obj
+
+    @invalidates(*CATALOG_NAMESPACES)
     async def delete(self, db: AsyncSession, *, item_id: uuid.UUID) -> Optional[Item]:
         stmt = select(Item).filter(Item.id == item_id)
         result = await db.execute(stmt)
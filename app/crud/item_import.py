@@ -0,0 +1,256 @@
+import csv
+import itertools
+import json
+import uuid
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import select, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.exceptions.item_import import ImportMergeError
+from app.models.collection import Collection
+from app.models.item import CategoryEnum
+from app.schemas.item import ItemImportError, ItemImportResult, ItemImportRow
+
+STAGING_TABLE = "item_import_staging"
+STAGING_COLUMNS = (
+    "row_number",
+    "id",
+    "name",
+    "description",
+    "price",
+    "images",
+    "colors",
+    "sizes",
+    "fabric",
+    "fabric_composition",
+    "category",
+    "collection_id",
+)
+
+# Dropped with the transaction, so concurrent imports never share it
+CREATE_STAGING = f"""
+CREATE TEMPORARY TABLE {STAGING_TABLE} (
+    row_number integer NOT NULL,
+    id uuid NOT NULL,
+    name varchar(255) NOT NULL,
+    description text,
+    price numeric(10, 2) NOT NULL,
+    images varchar[] NOT NULL,
+    colors varchar[] NOT NULL,
+    sizes varchar[] NOT NULL,
+    fabric varchar(100),
+    fabric_composition varchar(255),
+    category text,
+    collection_id uuid NOT NULL
+) ON COMMIT DROP
+"""
+
+MERGED_COLUMNS = STAGING_COLUMNS[2:]
+
+# One statement for the whole import: the facet count triggers fire once and
+# every item lands or none does. When a file repeats an id its last row wins,
+# and an updated item drops the derivatives of images it no longer has.
+MERGE = f"""
+WITH merged AS (
+    INSERT INTO items AS i (id, {", ".join(MERGED_COLUMNS)})
+    SELECT DISTINCT ON (id)
+        id, {", ".join(MERGED_COLUMNS[:-2])},
+        category::categoryenum, collection_id
+    FROM {STAGING_TABLE}
+    ORDER BY id, row_number DESC
+    ON CONFLICT (id) DO UPDATE SET
+        {", ".join(f"{c} = EXCLUDED.{c}" for c in MERGED_COLUMNS)},
+        image_variants = COALESCE(
+            (
+                SELECT jsonb_object_agg(v.key, v.value)
+                FROM jsonb_each(i.image_variants) AS v
+                WHERE v.key = ANY(EXCLUDED.images)
+            ),
+            '{{}}'::jsonb
+        ),
+        updated_at = now()
+    RETURNING (xmax = 0) AS inserted
+)
+SELECT
+    count(*) FILTER (WHERE inserted) AS inserted,
+    count(*) FILTER (WHERE NOT inserted) AS updated
+FROM merged
+"""
+
+
+def read_records(lines: Iterable[str], fmt: str) -> Iterator[Tuple[int, Any]]:
+    """
+    Yield (row, record) for every record of a CSV (with header) or NDJSON
+    document; row counts data rows from 1. A line that cannot be parsed is
+    yielded as a ValueError instead of a dict.
+    """
+    if fmt == "csv":
+        for row, record in enumerate(csv.DictReader(lines), start=1):
+            yield row, record
+        return
+
+    row = 0
+    for line in lines:
+        if not line.strip():
+            continue
+        row += 1
+        try:
+            record = json.loads(line)
+        except ValueError as exc:
+            yield row, ValueError(f"invalid JSON: {exc}")
+            continue
+        if not isinstance(record, dict):
+            yield row, ValueError("each line must be a JSON object")
+            continue
+        yield row, record
+
+
+def _category_name(value: Optional[str], labels: Iterable[str]) -> Optional[str]:
+    """
+    Category as the items column stores it (the CategoryEnum member name,
+    like the ORM writes it), provided the database enum has that label.
+    """
+    if value is None:
+        return None
+    for member in CategoryEnum:
+        if value in (member.name, member.value) and member.name in labels:
+            return member.name
+    allowed = ", ".join(m.value for m in CategoryEnum if m.name in labels)
+    raise ValueError(f"category: must be one of {allowed}")
+
+
+def _validation_messages(exc: ValidationError) -> List[str]:
+    messages = []
+    for error in exc.errors():
+        location = ".".join(str(part) for part in error["loc"])
+        messages.append(f"{location}: {error['msg']}" if location else error["msg"])
+    return messages
+
+
+class ItemImporter:
+    """
+    Validate import rows and copy them into a temporary staging table in
+    batches, then merge the staging table into items with one statement.
+    """
+
+    def __init__(self, db: AsyncSession, *, batch_size: int = 0):
+        self.db = db
+        self.batch_size = batch_size or settings.IMPORT_BATCH_SIZE
+        self.result = ItemImportResult()
+        self._collections: Dict[str, uuid.UUID] = {}
+        self._collection_ids: set = set()
+        self._category_labels: set = set()
+        self._driver_connection = None
+
+    async def _prepare(self) -> None:
+        rows = await self.db.execute(select(Collection.name, Collection.id))
+        self._collections = dict(rows.all())
+        self._collection_ids = set(self._collections.values())
+        labels = await self.db.execute(
+            text("SELECT unnest(enum_range(NULL::categoryenum))::text")
+        )
+        self._category_labels = set(labels.scalars())
+
+        conn = await self.db.connection()
+        await conn.exec_driver_sql(CREATE_STAGING)
+        raw = await conn.get_raw_connection()
+        self._driver_connection = raw.driver_connection
+
+    def _fail(self, row: int, errors: List[str]) -> None:
+        self.result.failed += 1
+        if len(self.result.errors) < settings.IMPORT_MAX_REPORTED_ERRORS:
+            self.result.errors.append(ItemImportError(row=row, errors=errors))
+
+    def _stage_record(self, row: int, record: Any) -> Optional[tuple]:
+        if isinstance(record, Exception):
+            self._fail(row, [str(record)])
+            return None
+        try:
+            item = ItemImportRow.model_validate(record)
+            category = _category_name(item.category, self._category_labels)
+        except ValidationError as exc:
+            self._fail(row, _validation_messages(exc))
+            return None
+        except ValueError as exc:
+            self._fail(row, [str(exc)])
+            return None
+
+        collection_id = item.collection_id
+        if collection_id is None:
+            collection_id = self._collections.get(item.collection_name)
+            if collection_id is None:
+                self._fail(
+                    row, [f"collection_name: '{item.collection_name}' not found"]
+                )
+                return None
+        elif collection_id not in self._collection_ids:
+            self._fail(row, [f"collection_id: '{collection_id}' not found"])
+            return None
+
+        return (
+            row,
+            item.id or uuid.uuid4(),
+            item.name,
+            item.description,
+            item.price,
+            item.images or [],
+            item.colors or [],
+            item.sizes or [],
+            item.fabric,
+            item.fabric_composition,
+            category,
+            collection_id,
+        )
+
+    def _read_batch(
+        self, records: Iterator[Tuple[int, Any]]
+    ) -> Tuple[List[tuple], bool]:
+        """
+        Parse and validate up to batch_size records into staging rows, and
+        whether the records ran out. Blocking: parsing reads the upload file.
+        """
+        staged = []
+        read = 0
+        for row, record in itertools.islice(records, self.batch_size):
+            read += 1
+            self.result.received += 1
+            values = self._stage_record(row, record)
+            if values is not None:
+                staged.append(values)
+        return staged, read < self.batch_size
+
+    async def run(
+        self, records: Iterable[Tuple[int, Any]], *, dry_run: bool = False
+    ) -> ItemImportResult:
+        await self._prepare()
+        self.result.dry_run = dry_run
+
+        # Parsing reads the spooled upload file: keep it off the event loop
+        records = iter(records)
+        done = False
+        while not done:
+            staged, done = await run_in_threadpool(self._read_batch, records)
+            if staged:
+                await self._driver_connection.copy_records_to_table(
+                    STAGING_TABLE, records=staged, columns=STAGING_COLUMNS
+                )
+
+        conn = await self.db.connection()
+        try:
+            counts = (await conn.exec_driver_sql(MERGE)).one()
+        except DBAPIError as exc:
+            # e.g. a collection deleted while the file was being staged
+            await self.db.rollback()
+            raise ImportMergeError(str(exc.orig)) from exc
+        self.result.inserted, self.result.updated = counts
+
+        if dry_run:
+            await self.db.rollback()
+        else:
+            await self.db.commit()
+        return self.result
@@ -1,6 +1,7 @@
-from typing import List, Optional
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional
 from uuid import UUID
-from sqlalchemy import select
+from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError, NoResultFound
 from sqlalchemy.sql.expression import func
@@ -8,6 +9,27 @@ from sqlalchemy.sql.expression import func
 from app.models.package import Package
 from app.schemas.package import PackageCreate, PackageUpdate
 from app.exceptions.package import PackageNotFoundError, PackageAlreadyExistsError
+from app.cache import cached, invalidates
+from app.crud.version import ListVersion, get_list_version
+from app.crud import search as fts
+from app.crud.export import changed_since, stream_rows
+from app.crud.batch import apply_batch
+from app.crud.fieldsets import FieldSet
+from app.schemas.batch import BatchResult
+
+PACKAGE_EXPORT_COLUMNS = (
+    "id",
+    "name",
+    "price",
+    "description",
+    "features",
+    "pdf_url",
+    "is_active",
+    "is_popular",
+    "display_order",
+    "created_at",
+    "updated_at",
+)
 
 
 class PackageNotFoundError(Exception):
@@ -25,6 +47,7 @@ class PackageCRUD:
     """
 
     # --- CREATE ---
+    @invalidates("package")
     async def create(self, db: AsyncSession, *, obj_in: PackageCreate) -> Package:
         """
         Create a new Package.
@@ -50,11 +73,20 @@ class PackageCRUD:
             ) from e
 
     # --- READ ONE by ID ---
-    async def get_by_id(self, db: AsyncSession, package_id: UUID) -> Package:
+    @cached("package")
+    async def get_by_id(
+        self,
+        db: AsyncSession,
+        package_id: UUID,
+        *,
+        fieldset: Optional[FieldSet] = None,
+    ) -> Package:
         """
         Get a package by UUID. Raises PackageNotFoundError if not found.
         """
         stmt = select(Package).filter(Package.id == package_id)
+        if fieldset is not None:
+            stmt = stmt.options(*fieldset.options())
         result = await db.execute(stmt)
 
         try:
@@ -63,6 +95,7 @@ class PackageCRUD:
             raise PackageNotFoundError(f"Package with ID '{package_id}' not found.")
 
     # --- READ ONE by Name ---
+    @cached("package")
     async def get_by_name(self, db: AsyncSession, *, name: str) -> Optional[Package]:
         """
         Get a package by name.
@@ -72,17 +105,71 @@ class PackageCRUD:
         return result.scalars().first()
 
     # --- READ ALL ---
+    @cached("package")
     async def get_all(
-        self, db: AsyncSession, *, skip: int = 0, limit: int = 100
+        self,
+        db: AsyncSession,
+        *,
+        skip: int = 0,
+        limit: int = 100,
+        fieldset: Optional[FieldSet] = None,
     ) -> List[Package]:
         """
         Get all packages, ordered by display_order.
         """
         stmt = select(Package).order_by(Package.display_order).offset(skip).limit(limit)
+        if fieldset is not None:
+            stmt = stmt.options(*fieldset.options())
         result = await db.execute(stmt)
         return result.scalars().all()
 
+    # --- EXPORT ---
+    def export(
+        self,
+        db: AsyncSession,
+        *,
+        since: Optional[datetime] = None,
+        is_active: Optional[bool] = None,
+        is_popular: Optional[bool] = None,
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Stream PACKAGE_EXPORT_COLUMNS of every matching package in batches,
+        in display order. ``since`` keeps packages created or updated from
+        that time on.
+        """
+        criteria = []
+        if is_active is not None:
+            criteria.append(Package.is_active == is_active)
+        if is_popular is not None:
+            criteria.append(Package.is_popular == is_popular)
+        if since is not None:
+            criteria.append(changed_since(Package, since))
+
+        stmt = (
+            select(*(getattr(Package, name) for name in PACKAGE_EXPORT_COLUMNS))
+            .filter(*criteria)
+            .order_by(Package.display_order, Package.id)
+        )
+        return stream_rows(db, stmt)
+
+    # --- VERSION ---
+    async def get_version(
+        self, db: AsyncSession, *, name: Optional[str] = None
+    ) -> ListVersion:
+        """
+        Count and newest modification time of a package listing, used as its
+        HTTP validator.
+        """
+        criteria = []
+        if name is not None:
+            tsquery = fts.prefix_tsquery(name)
+            if tsquery is None:
+                return ListVersion(count=0, last_modified=None)
+            criteria.append(fts.matches(Package.search_vector, tsquery))
+        return await get_list_version(db, Package, *criteria)
+
     # --- UPDATE ---
+    @invalidates("package")
     async def update(
         self, db: AsyncSession, *, package_id: UUID, obj_in: PackageUpdate
     ) -> Package:
@@ -117,7 +204,30 @@ class PackageCRUD:
                 "Update failed due to a database integrity constraint."
             ) from e
 
+    # --- BROCHURE ---
+    @invalidates("package")
+    async def set_pdf_url(
+        self, db: AsyncSession, *, package_id: UUID, pdf_url: Optional[str]
+    ) -> Package:
+        """
+        Point a package at its brochure in one UPDATE. Raises
+        PackageNotFoundError if not found.
+        """
+        stmt = (
+            update(Package)
+            .filter(Package.id == package_id)
+            .values(pdf_url=pdf_url)
+            .returning(Package)
+            .execution_options(populate_existing=True)
+        )
+        db_package = (await db.execute(stmt)).scalars().first()
+        await db.commit()
+        if db_package is None:
+            raise PackageNotFoundError(f"Package with ID '{package_id}' not found.")
+        return db_package
+
     # --- DELETE ---
+    @invalidates("package")
     async def delete(self, db: AsyncSession, *, package_id: UUID) -> None:
         """
         Delete a package by UUID. Raises PackageNotFoundError if not found.
@@ -128,6 +238,14 @@ class PackageCRUD:
         await db.commit()
         # Returns None implicitly as status code 204 is handled by the API endpoint
 
+    # --- BATCH ---
+    @invalidates("package")
+    async def batch(self, db: AsyncSession, *, operations: List[Any]) -> BatchResult:
+        """
+        Apply create/update/delete operations in one transaction.
+        """
+        return await apply_batch(db, Package, operations)
+
     # --- EXISTS Check by ID ---
     async def exists(self, db: AsyncSession, *, package_id: UUID) -> bool:
         """
@@ -147,15 +265,20 @@ class PackageCRUD:
         return result.scalar() is not None
 
     # --- Search ---
+    @cached("package")
     async def search_by_name(
         self, db: AsyncSession, *, name: str, skip: int = 0, limit: int = 100
     ) -> List[Package]:
         """
-        Search packages by name (case-insensitive partial match).
+        Search packages by name. Every word of the term is matched as a word
+        prefix through the indexed search_vector.
         """
+        tsquery = fts.prefix_tsquery(name)
+        if tsquery is None:
+            return []
         stmt = (
             select(Package)
-            .filter(func.lower(Package.name).like(f"%{name.lower()}%"))
+            .filter(fts.matches(Package.search_vector, tsquery))
             .order_by(Package.display_order)
             .offset(skip)
             .limit(limit)
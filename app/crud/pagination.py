@@ -0,0 +1,143 @@
+import base64
+import json
+import uuid
+from datetime import datetime
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, or_, tuple_
+from sqlalchemy.sql import Select
+
+from app.exceptions.pagination import InvalidCursorError
+
+
+def normalize_order_by(order_by: str, allowed: Sequence[str], default: str) -> str:
+    """Return order_by ("field" or "-field") if field is sortable, else default."""
+    if order_by.lstrip("-") not in allowed:
+        return default
+    return order_by
+
+
+def _dump_value(value: Any) -> list:
+    if value is None:
+        return ["none", None]
+    if isinstance(value, datetime):
+        return ["datetime", value.isoformat()]
+    if isinstance(value, uuid.UUID):
+        return ["uuid", str(value)]
+    if isinstance(value, Decimal):
+        return ["decimal", str(value)]
+    if isinstance(value, Enum):
+        return ["str", value.value]
+    if isinstance(value, float):
+        return ["float", value]
+    if isinstance(value, bool) or not isinstance(value, (int, str)):
+        raise TypeError(f"Unsupported cursor value: {value!r}")
+    return ["int" if isinstance(value, int) else "str", value]
+
+
+def _load_value(tagged: list) -> Any:
+    kind, raw = tagged
+    if kind == "none":
+        return None
+    if kind == "datetime":
+        return datetime.fromisoformat(raw)
+    if kind == "uuid":
+        return uuid.UUID(raw)
+    if kind == "decimal":
+        return Decimal(raw)
+    if kind == "int":
+        return int(raw)
+    if kind == "float":
+        return float(raw)
+    if kind == "str":
+        return str(raw)
+    raise ValueError(kind)
+
+
+def encode_cursor(obj: Any, order_by: str) -> str:
+    """Opaque cursor pointing just past obj in the given ordering."""
+    field = order_by.lstrip("-")
+    payload = {
+        "o": order_by,
+        "k": [_dump_value(getattr(obj, field)), _dump_value(obj.id)],
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, order_by: str) -> Tuple[Any, Any]:
+    """Return the (sort value, id) pair encoded in a cursor."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        value, row_id = (_load_value(tagged) for tagged in payload["k"])
+    except (ValueError, TypeError, KeyError) as exc:
+        raise InvalidCursorError("Malformed pagination cursor.") from exc
+    if payload.get("o") != order_by:
+        raise InvalidCursorError(
+            f"Cursor was issued for order_by '{payload.get('o')}', not '{order_by}'."
+        )
+    return value, row_id
+
+
+def _after(column: Any, id_column: Any, descending: bool, value: Any, row_id: Any):
+    """
+    Rows strictly after (value, row_id), matching Postgres' default NULL
+    placement (NULLS LAST ascending, NULLS FIRST descending).
+    """
+    if column is id_column:
+        return id_column < row_id if descending else id_column > row_id
+
+    if descending:
+        if value is None:
+            return or_(and_(column.is_(None), id_column < row_id), column.is_not(None))
+        return tuple_(column, id_column) < tuple_(value, row_id)
+
+    if value is None:
+        return and_(column.is_(None), id_column > row_id)
+    return or_(tuple_(column, id_column) > tuple_(value, row_id), column.is_(None))
+
+
+def paginate(
+    stmt: Select,
+    model: Any,
+    *,
+    order_by: str,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    sort_column: Any = None,
+) -> Select:
+    """
+    Order stmt by order_by (with id as tie-breaker) and page it.
+
+    With a cursor the page starts right after the cursor's row using a
+    keyset predicate, so every page costs the same; ``skip`` is ignored.
+    Without one, plain OFFSET/LIMIT is used. ``sort_column`` replaces the
+    model attribute named by order_by with a computed expression.
+    """
+    field = order_by.lstrip("-")
+    descending = order_by.startswith("-")
+    column = sort_column if sort_column is not None else getattr(model, field)
+
+    if descending:
+        stmt = stmt.order_by(column.desc(), model.id.desc())
+    else:
+        stmt = stmt.order_by(column.asc(), model.id.asc())
+
+    if cursor:
+        value, row_id = decode_cursor(cursor, order_by)
+        stmt = stmt.filter(_after(column, model.id, descending, value, row_id))
+    elif skip:
+        stmt = stmt.offset(skip)
+
+    return stmt.limit(limit)
+
+
+def next_cursor(rows: Sequence[Any], order_by: str, limit: int) -> Optional[str]:
+    """Cursor for the page after rows, or None when rows was the last page."""
+    if not rows or len(rows) < limit:
+        return None
+    return encode_cursor(rows[-1], order_by)
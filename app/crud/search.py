@@ -0,0 +1,31 @@
+import re
+from typing import Any, Optional
+
+from sqlalchemy import func, literal_column
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.db_types import SEARCH_CONFIG
+
+_TERM = re.compile(r"\w+", re.UNICODE)
+
+
+def prefix_tsquery(text: str) -> Optional[ColumnElement]:
+    """
+    Build a tsquery matching every word of text as a prefix ("silk dre"
+    matches "silk dresses"). Returns None when text has no searchable terms.
+    """
+    terms = _TERM.findall(text.lower())
+    if not terms:
+        return None
+    return func.to_tsquery(
+        literal_column(f"'{SEARCH_CONFIG}'"), " & ".join(f"{t}:*" for t in terms)
+    )
+
+
+def matches(vector: Any, query: ColumnElement) -> ColumnElement:
+    return vector.op("@@")(query)
+
+
+def rank(vector: Any, query: ColumnElement) -> ColumnElement:
+    # Cover density ranking honours the A/B/C weights of the vector
+    return func.ts_rank_cd(vector, query)
@@ -1,14 +1,22 @@
-from typing import List, Optional
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
 from uuid import UUID
 from sqlalchemy import select
 from sqlalchemy.orm import selectinload
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.suite import Suite
+from app.models.collection import Collection
+from app.models.item import Item
 from app.schemas.suite import SuiteCreate, SuiteUpdate
+from app.cache import CATALOG_NAMESPACES, cached, invalidates
+from app.crud.version import ListVersion, get_list_version
+from app.crud.collection import collection_summary_select
+from app.crud.fieldsets import FieldSet
 
 
 class SuiteCRUD:
+    @invalidates(*CATALOG_NAMESPACES)
     async def create(self, db: AsyncSession, *, obj_in: SuiteCreate) -> Suite:
         """
         Create a new suite.
@@ -23,56 +31,116 @@ class SuiteCRUD:
         await db.refresh(db_suite)
         return db_suite
 
+    @cached("suite")
     async def get(self, db: AsyncSession, suite_id: UUID) -> Optional[Suite]:
         """
-        Get a suite by UUID with collections eagerly loaded.
+        Get a suite by UUID with collections and their items eagerly loaded.
         """
         stmt = (
             select(Suite)
-            .options(selectinload(Suite.collections))
+            .options(selectinload(Suite.collections).selectinload(Collection.items))
             .filter(Suite.id == suite_id)
         )
         result = await db.execute(stmt)
         return result.scalars().first()
 
-    async def get_by_name(self, db: AsyncSession, *, name: str) -> Optional[Suite]:
-        """
-        Get a suite by name with collections eagerly loaded.
-        """
-        stmt = (
-            select(Suite)
-            .options(selectinload(Suite.collections))
-            .filter(Suite.name == name)
-        )
+    @cached("suite")
+    async def get_by_name(
+        self, db: AsyncSession, *, name: str, fieldset: Optional[FieldSet] = None
+    ) -> Optional[Suite]:
+        """
+        Get a suite by name with collections and their items eagerly loaded,
+        or with only what a fieldset selects.
+        """
+        if fieldset is None:
+            options = [selectinload(Suite.collections).selectinload(Collection.items)]
+        else:
+            options = fieldset.options()
+        stmt = select(Suite).options(*options).filter(Suite.name == name)
         result = await db.execute(stmt)
         return result.scalars().first()
 
+    @cached("suite")
     async def get_all(
-        self, db: AsyncSession, *, skip: int = 0, limit: int = 100
+        self,
+        db: AsyncSession,
+        *,
+        skip: int = 0,
+        limit: int = 100,
+        fieldset: Optional[FieldSet] = None,
     ) -> List[Suite]:
         """
-        Get all suites (without collections for better performance).
+        Get all suites (without collections for better performance, unless a
+        fieldset includes them).
         """
         stmt = select(Suite).offset(skip).limit(limit)
+        if fieldset is not None:
+            stmt = stmt.options(*fieldset.options())
         result = await db.execute(stmt)
         return result.scalars().all()
 
+    @cached("suite")
     async def get_all_with_collections(
         self, db: AsyncSession, *, skip: int = 0, limit: int = 100
     ) -> List[Suite]:
         """
-        Get all suites with collections eagerly loaded.
+        Get all suites with collections and their items eagerly loaded.
         Use this only when you need collections data.
         """
         stmt = (
             select(Suite)
-            .options(selectinload(Suite.collections))
+            .options(selectinload(Suite.collections).selectinload(Collection.items))
             .offset(skip)
             .limit(limit)
         )
         result = await db.execute(stmt)
         return result.scalars().all()
 
+    @cached("suite")
+    async def get_all_with_collection_summaries(
+        self, db: AsyncSession, *, skip: int = 0, limit: int = 100
+    ) -> List[Dict[str, Any]]:
+        """
+        Get all suites with collection summaries (item count and cover
+        image instead of the items), in two statements.
+        """
+        stmt = (
+            select(
+                Suite.id,
+                Suite.name,
+                Suite.description,
+                Suite.is_active,
+                Suite.created_at,
+                Suite.updated_at,
+            )
+            .offset(skip)
+            .limit(limit)
+        )
+        suites = (await db.execute(stmt)).all()
+        if not suites:
+            return []
+
+        stmt = (
+            collection_summary_select()
+            .filter(Collection.suite_id.in_([s.id for s in suites]))
+            .order_by(Collection.display_order, Collection.id)
+        )
+        collections = defaultdict(list)
+        for row in (await db.execute(stmt)).all():
+            collections[row.suite_id].append(row)
+        return [{**s._asdict(), "collections": collections[s.id]} for s in suites]
+
+    async def get_version(
+        self, db: AsyncSession, *, with_collections: bool = False
+    ) -> ListVersion:
+        """
+        Count and newest modification time of the suite listing, used as its
+        HTTP validator.
+        """
+        related = (Collection, Item) if with_collections else ()
+        return await get_list_version(db, Suite, related=related)
+
+    @invalidates(*CATALOG_NAMESPACES)
     async def update(
         self, db: AsyncSession, *, db_obj: Suite, obj_in: SuiteUpdate
     ) -> Suite:
@@ -87,11 +155,18 @@ class SuiteCRUD:
         await db.refresh(db_obj)
         return db_obj
 
+    @invalidates(*CATALOG_NAMESPACES)
     async def delete(self, db: AsyncSession, *, suite_id: UUID) -> Optional[Suite]:
         """
         Delete a suite by UUID.
         """
-        stmt = select(Suite).filter(Suite.id == suite_id)
+        # The cascade needs every collection and item; load them up front
+        # instead of once per collection
+        stmt = (
+            select(Suite)
+            .options(selectinload(Suite.collections).selectinload(Collection.items))
+            .filter(Suite.id == suite_id)
+        )
         result = await db.execute(stmt)
         db_suite = result.scalars().first()
         if db_suite:
@@ -99,11 +174,16 @@ class SuiteCRUD:
             await db.commit()
         return db_suite
 
+    @invalidates(*CATALOG_NAMESPACES)
     async def delete_by_name(self, db: AsyncSession, *, name: str) -> Optional[Suite]:
         """
         Delete a suite by name.
         """
-        stmt = select(Suite).filter(Suite.name == name)
+        stmt = (
+            select(Suite)
+            .options(selectinload(Suite.collections).selectinload(Collection.items))
+            .filter(Suite.name == name)
+        )
         result = await db.execute(stmt)
         db_suite = result.scalars().first()
         if db_suite:
@@ -127,6 +207,7 @@ class SuiteCRUD:
         result = await db.execute(stmt)
         return result.scalar() is not None
 
+    @cached("suite")
     async def search_by_name(
         self, db: AsyncSession, *, name: str, skip: int = 0, limit: int = 100
     ) -> List[Suite]:
@@ -8,6 +8,19 @@ from sqlalchemy.sql.expression import func
 
 from app.models.testimonial import Testimonial
 from app.schemas.testimonial import TestimonialCreate, TestimonialUpdate
+from app.cache import cached, invalidates
+from app.crud.version import ListVersion, get_list_version
+from app.crud.pagination import normalize_order_by, paginate
+from app.crud.fieldsets import FieldSet
+from app.crud import search as fts
+
+TESTIMONIAL_SORT_FIELDS = (
+    "display_order",
+    "rating",
+    "client_name",
+    "created_at",
+    "updated_at",
+)
 
 
 class TestimonialNotFoundError(Exception):
@@ -28,6 +41,7 @@ class TestimonialCRUD:
     """
 
     # --- CREATE ---
+    @invalidates("testimonial")
     async def create(
         self, db: AsyncSession, *, obj_in: TestimonialCreate
     ) -> Testimonial:
@@ -54,11 +68,20 @@ class TestimonialCRUD:
             ) from e
 
     # --- READ ONE by ID ---
-    async def get_by_id(self, db: AsyncSession, testimonial_id: UUID) -> Testimonial:
+    @cached("testimonial")
+    async def get_by_id(
+        self,
+        db: AsyncSession,
+        testimonial_id: UUID,
+        *,
+        fieldset: Optional[FieldSet] = None,
+    ) -> Testimonial:
         """
         Get a testimonial by UUID. Raises TestimonialNotFoundError if not found.
         """
         stmt = select(Testimonial).filter(Testimonial.id == testimonial_id)
+        if fieldset is not None:
+            stmt = stmt.options(*fieldset.options())
         result = await db.execute(stmt)
 
         try:
@@ -69,6 +92,7 @@ class TestimonialCRUD:
             )
 
     # --- READ ONE by Client Name ---
+    @cached("testimonial")
     async def get_by_client_name(
         self, db: AsyncSession, *, client_name: str
     ) -> Optional[Testimonial]:
@@ -82,6 +106,7 @@ class TestimonialCRUD:
         return result.scalars().first()
 
     # --- READ ALL ---
+    @cached("testimonial")
     async def get_all(
         self,
         db: AsyncSession,
@@ -89,27 +114,58 @@ class TestimonialCRUD:
         skip: int = 0,
         limit: int = 100,
         order_by: str = "display_order",  # or "-created_at", "rating", etc.
+        cursor: Optional[str] = None,
+        fieldset: Optional[FieldSet] = None,
     ) -> List[Testimonial]:
         """
-        Get all testimonials with optional ordering.
+        Get all testimonials with optional ordering. Pass the cursor of the
+        previous page instead of skip for keyset pagination.
         """
-        # Parse order_by parameter
-        if order_by.startswith("-"):
-            field_name = order_by[1:]
-            order = getattr(Testimonial, field_name).desc()
-        else:
-            field_name = order_by
-            order = getattr(Testimonial, field_name).asc()
-
-        # Ensure the field exists, default to display_order
-        if not hasattr(Testimonial, field_name):
-            order = Testimonial.display_order.asc()
+        # Unknown sort fields fall back to display_order
+        order_by = normalize_order_by(
+            order_by, TESTIMONIAL_SORT_FIELDS, "display_order"
+        )
 
-        stmt = select(Testimonial).order_by(order).offset(skip).limit(limit)
+        stmt = select(Testimonial)
+        if fieldset is not None:
+            stmt = stmt.options(*fieldset.options(order_by.lstrip("-")))
+        stmt = paginate(
+            stmt,
+            Testimonial,
+            order_by=order_by,
+            skip=skip,
+            limit=limit,
+            cursor=cursor,
+        )
         result = await db.execute(stmt)
         return result.scalars().all()
 
+    # --- VERSION ---
+    async def get_version(
+        self,
+        db: AsyncSession,
+        *,
+        search: Optional[str] = None,
+        min_rating: Optional[int] = None,
+        max_rating: Optional[int] = None,
+    ) -> ListVersion:
+        """
+        Count and newest modification time of a testimonial listing, used as
+        its HTTP validator.
+        """
+        criteria = []
+        if search:
+            tsquery = fts.prefix_tsquery(search)
+            if tsquery is None:
+                return ListVersion(count=0, last_modified=None)
+            criteria.append(fts.matches(Testimonial.search_vector, tsquery))
+        elif min_rating is not None or max_rating is not None:
+            criteria.append(Testimonial.rating >= (min_rating or 0))
+            criteria.append(Testimonial.rating <= (max_rating or 5))
+        return await get_list_version(db, Testimonial, *criteria)
+
     # --- UPDATE ---
+    @invalidates("testimonial")
     async def update(
         self, db: AsyncSession, *, testimonial_id: UUID, obj_in: TestimonialUpdate
     ) -> Testimonial:
@@ -149,6 +205,7 @@ class TestimonialCRUD:
             ) from e
 
     # --- DELETE ---
+    @invalidates("testimonial")
     async def delete(self, db: AsyncSession, *, testimonial_id: UUID) -> None:
         """
         Delete a testimonial by UUID.
@@ -159,19 +216,20 @@ class TestimonialCRUD:
         await db.commit()
 
     # --- SEARCH ---
+    @cached("testimonial")
     async def search(
         self, db: AsyncSession, *, query: str, skip: int = 0, limit: int = 100
     ) -> List[Testimonial]:
         """
-        Search testimonials by client name or review text (case-insensitive).
+        Search testimonials by client name or review text. Every word of the
+        query is matched as a word prefix through the indexed search_vector.
         """
-        search_term = f"%{query}%"
+        tsquery = fts.prefix_tsquery(query)
+        if tsquery is None:
+            return []
         stmt = (
             select(Testimonial)
-            .filter(
-                func.lower(Testimonial.client_name).like(func.lower(search_term))
-                | func.lower(Testimonial.review_text).like(func.lower(search_term))
-            )
+            .filter(fts.matches(Testimonial.search_vector, tsquery))
             .order_by(Testimonial.display_order)
             .offset(skip)
             .limit(limit)
@@ -180,6 +238,7 @@ class TestimonialCRUD:
         return result.scalars().all()
 
     # --- Get by Rating ---
+    @cached("testimonial")
     async def get_by_rating(
         self,
         db: AsyncSession,
@@ -203,6 +262,7 @@ class TestimonialCRUD:
         return result.scalars().all()
 
     # --- Get Count ---
+    @cached("testimonial")
     async def get_count(self, db: AsyncSession) -> int:
         """
         Get total number of testimonials.
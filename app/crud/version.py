@@ -0,0 +1,38 @@
+from datetime import datetime
+from typing import Any, NamedTuple, Optional, Sequence
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+class ListVersion(NamedTuple):
+    count: int
+    last_modified: Optional[datetime]
+
+
+def _modified_at(model: Any):
+    return func.max(func.coalesce(model.updated_at, model.created_at))
+
+
+async def get_list_version(
+    db: AsyncSession,
+    model: Any,
+    *criteria: Any,
+    related: Sequence[Any] = (),
+) -> ListVersion:
+    """
+    Probe the row count and newest modification time of a listing in a single
+    statement, without loading any rows.
+
+    ``related`` lists models whose data is embedded in the listing's response
+    (e.g. the collection name on items); their newest modification time is
+    folded into ``last_modified``.
+    """
+    stmt = select(func.count(model.id), _modified_at(model)).where(*criteria)
+    for related_model in related:
+        stmt = stmt.add_columns(select(_modified_at(related_model)).scalar_subquery())
+
+    result = await db.execute(stmt)
+    count, *timestamps = result.one()
+    timestamps = [ts for ts in timestamps if ts is not None]
+    return ListVersion(count=count, last_modified=max(timestamps, default=None))
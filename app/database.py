@@ -1,7 +1,13 @@
 import sys
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+import time
+from typing import Any, Dict, Optional
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy.orm import declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
 from app.config import settings
+from app import metrics
+from app.query_log import install_slow_query_log
+from app.query_budget import install_query_tracking
 import os
 
 try:
@@ -20,11 +26,81 @@ except ImportError:
             return sessionmaker(*args, class_=AsyncSession, **kwargs)
 
 
-engine = create_async_engine(
-    settings.async_database_url,
-    echo=True if settings.ENVIRONMENT == "development" else False,
-    future=True,
-)
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool reporting how long each checkout waited for a connection."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            metrics.observe_pool_wait(time.perf_counter() - start)
+
+
+def build_engine(
+    *, pooled: bool = True, statement_timeout_ms: Optional[int] = None
+) -> AsyncEngine:
+    """
+    Create an async engine configured from Settings.
+
+    The API and the admin share the module-level ``engine`` below; Alembic
+    builds its own unpooled engine with no statement timeout so long
+    migrations (e.g. concurrent index builds) are not cut off.
+    """
+    if statement_timeout_ms is None:
+        statement_timeout_ms = settings.DB_STATEMENT_TIMEOUT_MS
+
+    connect_args: Dict[str, Any] = {}
+    if statement_timeout_ms:
+        # asyncpg applies server_settings to every new connection
+        connect_args["server_settings"] = {
+            "statement_timeout": str(statement_timeout_ms)
+        }
+
+    options: Dict[str, Any] = {
+        "echo": settings.DB_ECHO,
+        "future": True,
+        "connect_args": connect_args,
+    }
+    if pooled:
+        options.update(
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+            pool_pre_ping=settings.DB_POOL_PRE_PING,
+        )
+        if settings.METRICS_ENABLED:
+            options["poolclass"] = TimedQueuePool
+    else:
+        options["poolclass"] = NullPool
+
+    return create_async_engine(settings.async_database_url, **options)
+
+
+engine = build_engine()
+if settings.METRICS_ENABLED:
+    metrics.instrument_engine(engine.sync_engine)
+if settings.SLOW_QUERY_LOG_ENABLED:
+    install_slow_query_log(engine.sync_engine)
+install_query_tracking(engine.sync_engine)
+
+
+def pool_status() -> Dict[str, Any]:
+    """Live gauges of the shared connection pool."""
+    pool = engine.pool
+    if not hasattr(pool, "checkedout"):
+        return {"pool": type(pool).__name__}
+    return {
+        "pool": type(pool).__name__,
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "idle": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "capacity": pool.size() + settings.DB_MAX_OVERFLOW,
+    }
+
 
 AsyncSessionLocal = async_sessionmaker(
     engine,
@@ -6,6 +6,22 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Text search configuration used by the generated search_vector columns.
+# Queries must use the same one so stemming matches on both sides.
+SEARCH_CONFIG = "english"
+
+
+def weighted_vector_sql(*weighted_columns: tuple) -> str:
+    """
+    SQL expression for a generated tsvector column, e.g.
+    weighted_vector_sql(("name", "A"), ("description", "B")).
+    """
+    parts = [
+        f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce({column}, '')), '{weight}')"
+        for column, weight in weighted_columns
+    ]
+    return " || ".join(parts)
+
 
 class ListStringType(TypeDecorator):
     """
@@ -31,7 +47,8 @@ class ListStringType(TypeDecorator):
         if isinstance(value, list):
             result = [str(item).strip() for item in value if item]
             logger.debug(f"Processing as list: {result}")
-            return result or None
+            # An explicit empty list stays empty: colors/sizes are NOT NULL
+            return result
 
         # String input
         if isinstance(value, str):
@@ -0,0 +1,4 @@
+class InvalidFieldSetError(ValueError):
+    """Raised when fields= or include= names something a resource does not expose"""
+
+    pass
@@ -0,0 +1,4 @@
+class ImageSourceError(ValueError):
+    """Raised when an original image is missing, not local, or not a readable image"""
+
+    pass
@@ -0,0 +1,4 @@
+class ImportMergeError(ValueError):
+    """Raised when staged import rows cannot be merged into items, e.g. a collection was deleted meanwhile"""
+
+    pass
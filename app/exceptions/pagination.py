@@ -0,0 +1,4 @@
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor is malformed or was issued for another ordering"""
+
+    pass
@@ -0,0 +1,4 @@
+class QueryBudgetExceeded(RuntimeError):
+    """Raised in QUERY_BUDGET_MODE=raise when a route runs more queries than it declared"""
+
+    pass
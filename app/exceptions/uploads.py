@@ -0,0 +1,16 @@
+class InvalidUploadError(ValueError):
+    """Raised when an upload is not a multipart body with exactly one expected file"""
+
+    pass
+
+
+class UploadTooLargeError(InvalidUploadError):
+    """Raised when an upload goes past its size limit"""
+
+    pass
+
+
+class UnsupportedFileTypeError(InvalidUploadError):
+    """Raised when an uploaded file is not of an accepted type (judged by its content)"""
+
+    pass
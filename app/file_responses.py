@@ -0,0 +1,187 @@
+"""
+Byte-range support for FileResponse, which Starlette does not handle itself:
+a single ``Range: bytes=...`` is answered with 206 and just those bytes,
+an unsatisfiable one with 416, and If-Range falls back to the whole file
+when the client's copy is stale. Several ranges in one request get the
+whole file, which RFC 9110 allows.
+
+Where the server offers the ASGI ``http.response.zerocopysend`` extension
+the bytes go out through sendfile() without passing through Python.
+"""
+
+import os
+import re
+from typing import Optional, Tuple
+
+import anyio
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.types import Receive, Scope, Send
+
+_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    The inclusive (start, end) of a single-range header within ``size``
+    bytes. None when the header should be ignored (malformed or several
+    ranges); ValueError when the range can't be satisfied.
+    """
+    match = _RANGE.match(header.strip().replace(" ", ""))
+    if match is None:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0 or size == 0:
+            raise ValueError(header)
+        return max(0, size - length), size - 1
+    start = int(first)
+    if start >= size:
+        raise ValueError(header)
+    end = int(last) if last else size - 1
+    if end < start:
+        return None
+    return start, min(end, size - 1)
+
+
+def if_range_matches(if_range: str, response: Response) -> bool:
+    """Whether If-Range names the current representation (strong comparison)."""
+    if_range = if_range.strip()
+    if if_range.startswith(('"', "W/")):
+        etag = response.headers.get("etag", "")
+        return not if_range.startswith("W/") and if_range == etag
+    return if_range == response.headers.get("last-modified")
+
+
+ZEROCOPYSEND = "http.response.zerocopysend"
+
+
+class SendfileResponse(FileResponse):
+    """
+    A FileResponse sent with zero-copy sendfile where the server offers it.
+    ``start`` and ``end`` (inclusive) limit it to a part of the file.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        status_code: int = 200,
+        *,
+        start: int = 0,
+        end: Optional[int] = None,
+        **kwargs,
+    ):
+        super().__init__(path, status_code, **kwargs)
+        self.start = start
+        self.end = end
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if self.stat_result is None:
+            self.stat_result = await anyio.to_thread.run_sync(os.stat, self.path)
+            self.set_stat_headers(self.stat_result)
+        await send(
+            {
+                "type": "http.response.start",
+                "status": self.status_code,
+                "headers": self.raw_headers,
+            }
+        )
+        end = self.stat_result.st_size - 1 if self.end is None else self.end
+        if scope["method"].upper() == "HEAD" or end < self.start:
+            await send({"type": "http.response.body", "body": b""})
+        elif ZEROCOPYSEND in scope.get("extensions", {}):
+            await self._zerocopysend(send, end)
+        else:
+            await self._chunked_send(send, end)
+        if self.background is not None:
+            await self.background()
+
+    async def _zerocopysend(self, send: Send, end: int) -> None:
+        file = await anyio.to_thread.run_sync(open, self.path, "rb")
+        try:
+            await send(
+                {
+                    "type": ZEROCOPYSEND,
+                    "file": file,
+                    "offset": self.start,
+                    "count": end - self.start + 1,
+                }
+            )
+        finally:
+            await anyio.to_thread.run_sync(file.close)
+
+    async def _chunked_send(self, send: Send, end: int) -> None:
+        remaining = end - self.start + 1
+        async with await anyio.open_file(self.path, mode="rb") as file:
+            await file.seek(self.start)
+            while remaining:
+                chunk = await file.read(min(self.chunk_size, remaining))
+                remaining -= len(chunk)
+                # A file truncated since its stat ends the body early
+                more_body = bool(remaining and chunk)
+                await send(
+                    {
+                        "type": "http.response.body",
+                        "body": chunk,
+                        "more_body": more_body,
+                    }
+                )
+                if not more_body:
+                    break
+
+
+class PartialFileResponse(SendfileResponse):
+    """One byte range (inclusive start and end) of a file, as a 206."""
+
+    def __init__(self, path: str, start: int, end: int, size: int, **kwargs):
+        super().__init__(path, start=start, end=end, status_code=206, **kwargs)
+        self.headers["content-range"] = f"bytes {start}-{end}/{size}"
+        self.headers["content-length"] = str(end - start + 1)
+
+
+def ranged(response: FileResponse, request_headers: Headers) -> Response:
+    """
+    ``response`` (a FileResponse with its stat headers set), or the part of
+    it the request's Range header asks for. Either way it advertises
+    Accept-Ranges. Parts are sent with sendfile where the server offers it;
+    make ``response`` a SendfileResponse for the whole file to be too.
+    """
+    response.headers["accept-ranges"] = "bytes"
+    range_header = request_headers.get("range")
+    if not range_header or response.status_code != 200:
+        return response
+    if_range = request_headers.get("if-range")
+    if if_range is not None and not if_range_matches(if_range, response):
+        return response
+
+    size = int(response.headers["content-length"])
+    try:
+        byte_range = parse_range(range_header, size)
+    except ValueError:
+        return Response(
+            status_code=416,
+            headers={
+                "content-range": f"bytes */{size}",
+                "accept-ranges": "bytes",
+            },
+        )
+    if byte_range is None:
+        return response
+
+    headers = {
+        name: value
+        for name, value in response.headers.items()
+        if name not in ("content-length", "content-type")
+    }
+    return PartialFileResponse(
+        response.path,
+        *byte_range,
+        size,
+        headers=headers,
+        media_type=response.media_type,
+        stat_result=response.stat_result,
+    )
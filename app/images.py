@@ -0,0 +1,304 @@
+"""
+Image derivatives: fixed-width WebP and JPEG renditions of an item's
+original images plus a blurhash placeholder, so storefront grids fetch the
+size they display instead of the full-size original.
+
+Pillow runs in a process pool and the event loop only awaits it.
+Renditions are written under static/ with content-hashed file names, so a
+published URL never changes meaning. An item stores them per original in
+``image_variants``, with the digest of the original so unchanged images
+are not rendered again.
+"""
+
+import asyncio
+import hashlib
+import io
+import logging
+import math
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from app.config import settings
+from app.exceptions.images import ImageSourceError
+
+logger = logging.getLogger(__name__)
+
+STATIC_DIR = Path("static")
+STATIC_URL = "/static"
+
+# Pillow format, MIME type and file extension of each derivative format
+FORMATS = {
+    "webp": ("WEBP", "image/webp", "webp"),
+    "jpeg": ("JPEG", "image/jpeg", "jpg"),
+}
+
+_BASE83 = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz#$%*+,-.:;=?@[]^_{|}~"
+_SRGB_TO_LINEAR = [
+    v / 12.92 if v <= 0.04045 else ((v + 0.055) / 1.055) ** 2.4
+    for v in (i / 255 for i in range(256))
+]
+
+
+def derivative_widths() -> Tuple[int, ...]:
+    return tuple(
+        sorted({int(w) for w in settings.IMAGE_DERIVATIVE_WIDTHS.split(",") if w})
+    )
+
+
+def derivative_formats() -> Tuple[str, ...]:
+    formats = tuple(
+        f.strip().lower() for f in settings.IMAGE_DERIVATIVE_FORMATS.split(",")
+    )
+    unknown = [f for f in formats if f not in FORMATS]
+    if unknown:
+        raise ValueError(f"Unknown IMAGE_DERIVATIVE_FORMATS: {', '.join(unknown)}")
+    return formats
+
+
+def is_local(src: str) -> bool:
+    """Whether an image URL points into this app rather than another host."""
+    parts = urlsplit(src)
+    return not parts.scheme and not parts.netloc
+
+
+def local_path(src: str) -> Path:
+    """The file under static/ behind an image URL such as /static/images/a.jpg."""
+    if not is_local(src):
+        raise ImageSourceError(f"{src} is not a local image")
+    path = urlsplit(src).path.lstrip("/")
+    prefix = STATIC_URL.strip("/") + "/"
+    if path.startswith(prefix):
+        path = path[len(prefix) :]
+    root = STATIC_DIR.resolve()
+    file = (root / path).resolve()
+    if root not in file.parents or not file.is_file():
+        raise ImageSourceError(f"{src} is not a file under {STATIC_URL}")
+    return file
+
+
+def _base83(value: int, length: int) -> str:
+    return "".join(_BASE83[value // 83 ** (length - i - 1) % 83] for i in range(length))
+
+
+def _linear_to_srgb(value: float) -> int:
+    v = max(0.0, min(1.0, value))
+    if v <= 0.0031308:
+        return int(v * 12.92 * 255 + 0.5)
+    return int((1.055 * v ** (1 / 2.4) - 0.055) * 255 + 0.5)
+
+
+def blurhash(image: Image.Image) -> str:
+    """The blurhash (https://blurha.sh) of an image, from a 32px thumbnail."""
+    small = image.convert("RGB")
+    small.thumbnail((32, 32))
+    width, height = small.size
+    pixels = [tuple(_SRGB_TO_LINEAR[c] for c in px) for px in small.getdata()]
+    cx, cy = (4, 3) if width >= height else (3, 4)
+
+    factors = []
+    for j in range(cy):
+        cos_y = [math.cos(math.pi * j * y / height) for y in range(height)]
+        for i in range(cx):
+            cos_x = [math.cos(math.pi * i * x / width) for x in range(width)]
+            r = g = b = 0.0
+            for y in range(height):
+                row = y * width
+                for x in range(width):
+                    basis = cos_x[x] * cos_y[y]
+                    pr, pg, pb = pixels[row + x]
+                    r += basis * pr
+                    g += basis * pg
+                    b += basis * pb
+            scale = (1 if i == 0 and j == 0 else 2) / (width * height)
+            factors.append((r * scale, g * scale, b * scale))
+
+    dc, ac = factors[0], factors[1:]
+    result = _base83(cx - 1 + (cy - 1) * 9, 1)
+    largest = max(abs(v) for factor in ac for v in factor)
+    quantised = max(0, min(82, math.floor(largest * 166 - 0.5)))
+    max_value = (quantised + 1) / 166
+    result += _base83(quantised, 1)
+    result += _base83(
+        (_linear_to_srgb(dc[0]) << 16)
+        + (_linear_to_srgb(dc[1]) << 8)
+        + _linear_to_srgb(dc[2]),
+        4,
+    )
+    for factor in ac:
+        r, g, b = (
+            max(
+                0,
+                min(
+                    18,
+                    math.floor(math.copysign(abs(v / max_value) ** 0.5, v) * 9 + 9.5),
+                ),
+            )
+            for v in factor
+        )
+        result += _base83(r * 19 * 19 + g * 19 + b, 2)
+    return result
+
+
+def _write_once(directory: Path, data: bytes, suffix: str) -> Path:
+    """Write data under a name derived from its content, unless already there."""
+    digest = hashlib.blake2b(data, digest_size=8).hexdigest()
+    path = directory / f"{digest}-{suffix}"
+    if not path.exists():
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+    return path
+
+
+def render_derivatives(
+    source: str,
+    widths: Sequence[int],
+    formats: Sequence[str],
+    known_digest: Optional[str] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    Process-pool entry point: render and write the derivatives of one
+    original and return its image_variants entry, or None when the
+    original's digest is ``known_digest`` (nothing to do).
+    """
+    try:
+        data = Path(source).read_bytes()
+    except OSError as e:
+        raise ImageSourceError(f"{source} could not be read: {e}") from None
+    digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+    if digest == known_digest:
+        return None
+    try:
+        with Image.open(io.BytesIO(data)) as opened:
+            image = ImageOps.exif_transpose(opened)
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError) as e:
+        raise ImageSourceError(f"{source} is not a readable image: {e}") from None
+
+    has_alpha = image.mode in ("RGBA", "LA") or "transparency" in image.info
+    image = image.convert("RGBA" if has_alpha else "RGB")
+    width, height = image.size
+    directory = STATIC_DIR / settings.IMAGE_DERIVATIVES_DIR
+    directory.mkdir(parents=True, exist_ok=True)
+
+    renditions = {name: [] for name in formats}
+    # Never upscale: widths past the original collapse into the original's
+    for target in sorted({min(w, width) for w in widths}):
+        resized = image
+        if target != width:
+            size = (target, max(1, round(height * target / width)))
+            resized = image.resize(size, Image.Resampling.LANCZOS, reducing_gap=3.0)
+        for name in formats:
+            pillow_format, mime_type, extension = FORMATS[name]
+            frame = resized
+            buffer = io.BytesIO()
+            if pillow_format == "JPEG":
+                if has_alpha:
+                    frame = Image.new("RGB", resized.size, "white")
+                    frame.paste(resized, mask=resized.getchannel("A"))
+                frame.save(
+                    buffer,
+                    "JPEG",
+                    quality=settings.IMAGE_JPEG_QUALITY,
+                    optimize=True,
+                    progressive=True,
+                )
+            else:
+                frame.save(
+                    buffer, "WEBP", quality=settings.IMAGE_WEBP_QUALITY, method=4
+                )
+            path = _write_once(directory, buffer.getvalue(), f"{target}w.{extension}")
+            renditions[name].append(
+                {
+                    "url": f"{STATIC_URL}/{path.relative_to(STATIC_DIR).as_posix()}",
+                    "width": resized.width,
+                    "height": resized.height,
+                    "type": mime_type,
+                }
+            )
+
+    return {
+        "digest": digest,
+        "width": width,
+        "height": height,
+        "blurhash": blurhash(image),
+        # Grouped by format, narrowest first, for one <source> per type
+        "srcset": [r for name in formats for r in renditions[name]],
+    }
+
+
+class ImagePipeline:
+    """Runs render_derivatives in a process pool, started on first use."""
+
+    def __init__(self):
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn: forking a process that holds an event loop and a
+            # connection pool is not safe
+            self._executor = ProcessPoolExecutor(
+                max_workers=settings.IMAGE_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    async def derive(
+        self, src: str, known_digest: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """The image_variants entry of one local image (see render_derivatives)."""
+        path = local_path(src)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._pool(),
+            render_derivatives,
+            str(path),
+            derivative_widths(),
+            derivative_formats(),
+            known_digest,
+        )
+
+    async def derive_all(
+        self,
+        images: Iterable[str],
+        variants: Optional[Dict[str, Any]] = None,
+        force: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        image_variants for a list of images, reusing the entries of
+        ``variants`` whose original is unchanged unless ``force``. Remote
+        images are left out; local ones that can't be read are logged and
+        left out.
+        """
+        variants = variants or {}
+        images = [src for src in dict.fromkeys(images) if is_local(src)]
+
+        async def derive_one(src: str) -> Any:
+            known = None if force else (variants.get(src) or {}).get("digest")
+            try:
+                return await self.derive(src, known)
+            except ImageSourceError as e:
+                logger.warning("No derivatives for %s: %s", src, e)
+                return e
+
+        results = await asyncio.gather(*(derive_one(src) for src in images))
+        derived = {}
+        for src, result in zip(images, results):
+            if result is None:
+                derived[src] = variants[src]
+            elif not isinstance(result, ImageSourceError):
+                derived[src] = result
+        return derived
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+
+image_pipeline = ImagePipeline()
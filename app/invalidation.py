@@ -0,0 +1,153 @@
+"""
+Cross-process read cache invalidation over Postgres LISTEN/NOTIFY.
+
+Every worker holds one connection of its own (outside the pool) listening
+on CHANNEL. The namespaces a write invalidates, in CRUD methods marked
+@invalidates or admin ModelView hooks, are published on it after the
+commit, and every other worker drops them from its read cache as the
+notification arrives, typically within milliseconds.
+
+Other channels can share the connection (see subscribe); the catalog
+version (app.catalog_version) arrives that way, and with it the catalog
+writes made outside the app.
+
+Notifications sent while a worker is reconnecting are lost, so it clears
+its whole read cache once it is listening again.
+"""
+
+import asyncio
+import contextlib
+import logging
+import os
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+import asyncpg
+from sqlalchemy.engine import make_url
+
+from app.cache import on_invalidate, read_cache
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "cache_invalidation"
+RECONNECT_SECONDS = 5.0
+
+
+def listener_dsn() -> str:
+    """DATABASE_URL in the form asyncpg itself accepts."""
+    url = make_url(settings.async_database_url).set(drivername="postgresql")
+    return url.render_as_string(hide_password=False)
+
+
+class InvalidationListener:
+    """Publishes this process's invalidations and applies everyone else's."""
+
+    def __init__(self):
+        # Tells our own notifications apart from the others'
+        self.origin = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self.received = 0
+        self.published = 0
+        self._conn: Optional[asyncpg.Connection] = None
+        self._task: Optional[asyncio.Task] = None
+        self._sends: Set[asyncio.Task] = set()
+        self._lock = asyncio.Lock()
+        self._channels: Dict[str, Callable[[str], None]] = {}
+        self._on_listening: List[Callable[[], Awaitable[None]]] = []
+
+    @property
+    def listening(self) -> bool:
+        return self._conn is not None and not self._conn.is_closed()
+
+    def subscribe(
+        self,
+        channel: str,
+        callback: Callable[[str], None],
+        on_listening: Optional[Callable[[], Awaitable[None]]] = None,
+    ) -> None:
+        """
+        Also listen on ``channel``, calling ``callback(payload)`` for every
+        notification on it. ``on_listening`` is awaited each time the
+        connection is (re)established, after the listeners are in place,
+        e.g. to catch up on what was missed.
+        """
+        self._channels[channel] = callback
+        if on_listening is not None:
+            self._on_listening.append(on_listening)
+
+    def publish(self, namespaces: Tuple[str, ...]) -> None:
+        """on_invalidate hook: send the namespaces without holding up the write."""
+        if not self.listening or not namespaces:
+            return
+        task = asyncio.get_running_loop().create_task(self._notify(namespaces))
+        self._sends.add(task)
+        task.add_done_callback(self._sends.discard)
+
+    async def _notify(self, namespaces: Tuple[str, ...]) -> None:
+        payload = f"{self.origin} {','.join(namespaces)}"
+        try:
+            # One connection serves one query at a time
+            async with self._lock:
+                await self._conn.execute("SELECT pg_notify($1, $2)", CHANNEL, payload)
+            self.published += 1
+        except Exception:
+            # Other workers fall back on the catalog version poll and the TTL
+            logger.warning("Could not publish cache invalidation", exc_info=True)
+
+    def _on_notification(self, conn, pid: int, channel: str, payload: str) -> None:
+        origin, _, namespaces = payload.partition(" ")
+        if origin == self.origin or not namespaces:
+            return
+        self.received += 1
+        read_cache.invalidate(*namespaces.split(","))
+
+    async def _listen(self) -> None:
+        first = True
+        while True:
+            closed = asyncio.Event()
+            try:
+                self._conn = await asyncpg.connect(listener_dsn())
+                self._conn.add_termination_listener(lambda _: closed.set())
+                await self._conn.add_listener(CHANNEL, self._on_notification)
+                for channel, callback in self._channels.items():
+                    await self._conn.add_listener(
+                        channel, lambda c, pid, ch, payload, cb=callback: cb(payload)
+                    )
+                if not first:
+                    read_cache.clear()
+                    logger.info("Listening for cache invalidations again")
+                first = False
+                for on_listening in self._on_listening:
+                    await on_listening()
+                await closed.wait()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.warning("Cache invalidation listener failed", exc_info=True)
+            finally:
+                if self._conn is not None and not self._conn.is_closed():
+                    await self._conn.close()
+                self._conn = None
+            await asyncio.sleep(RECONNECT_SECONDS)
+
+    def start(self) -> None:
+        if self._task is None and settings.CACHE_INVALIDATION_ENABLED:
+            self._task = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "listening": self.listening,
+            "published": self.published,
+            "received": self.received,
+        }
+
+
+invalidation_listener = InvalidationListener()
+on_invalidate(invalidation_listener.publish)
@@ -1,13 +1,24 @@
 from dotenv import load_dotenv
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
 from starlette.middleware.sessions import SessionMiddleware
 from app.config import settings
-from app.api import collections, items, package, suite, package, testimonial
+from app.api import catalog, collections, items, package, suite, package, testimonial
 from app.admin import admin, setup_admin_views
+from app.assets import AssetFiles
+from app.cache import read_cache
+from app.catalog_version import (
+    CATALOG_VERSION_HEADER,
+    CatalogVersionMiddleware,
+    catalog_watcher,
+)
+from app.compression import CompressionMiddleware, compressed_cache
+from app.database import engine, pool_status
+from app.images import image_pipeline
+from app.invalidation import invalidation_listener
+from app.metrics import MetricsMiddleware, metrics_response
+from app.request_id import REQUEST_ID_HEADER, RequestIDMiddleware
 
-from sqlalchemy.ext.asyncio import create_async_engine
 import os
 from app.config import (
     get_settings,
@@ -17,8 +28,6 @@ from app.config import (
 load_dotenv()
 
 settings = get_settings()
-ASYNC_DATABASE_URL = settings.async_database_url
-async_engine = create_async_engine(ASYNC_DATABASE_URL, echo=True)
 
 app = FastAPI(
     title=settings.PROJECT_NAME, openapi_url=f"{settings.API_V1_STR}/openapi.json"
@@ -40,10 +49,28 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[
+        "ETag",
+        "X-Next-Cursor",
+        REQUEST_ID_HEADER,
+        CATALOG_VERSION_HEADER,
+    ],
 )
 
-# Serve static files (for admin images, etc.)
-app.mount("/static", StaticFiles(directory="static"), name="static")
+app.add_middleware(RequestIDMiddleware)
+
+app.add_middleware(CatalogVersionMiddleware)
+
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware)
+
+# Outermost, so the timings include every other middleware
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
+# Serve static files (for admin images, etc.): fingerprinted names are cached
+# for good, see app.assets
+app.mount("/static", AssetFiles(directory="static"), name="static")
 
 # Setup admin views
 setup_admin_views(admin)
@@ -64,6 +91,10 @@ app.include_router(
 
 app.include_router(items.router, prefix=f"{settings.API_V1_STR}/items", tags=["items"])
 
+app.include_router(
+    catalog.router, prefix=f"{settings.API_V1_STR}/catalog", tags=["catalog"]
+)
+
 app.include_router(
     package.router, prefix=f"{settings.API_V1_STR}/packages", tags=["packages"]
 )
@@ -83,3 +114,43 @@ async def root():
 @app.get("/health")
 async def health_check():
     return {"status": "healthy"}
+
+
+@app.on_event("startup")
+async def start_invalidation_listener():
+    invalidation_listener.start()
+
+
+@app.on_event("shutdown")
+async def stop_invalidation_listener():
+    await invalidation_listener.stop()
+
+
+@app.on_event("shutdown")
+async def dispose_engine():
+    await engine.dispose()
+
+
+@app.on_event("shutdown")
+async def shutdown_image_pipeline():
+    image_pipeline.shutdown()
+
+
+@app.get("/health/db")
+async def db_pool_stats():
+    return pool_status()
+
+
+@app.get("/health/cache")
+async def cache_stats():
+    return {
+        **read_cache.stats(),
+        "catalog_version": catalog_watcher.version,
+        "invalidation": invalidation_listener.stats(),
+        "compressed": compressed_cache.stats(),
+    }
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return metrics_response()
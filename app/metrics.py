@@ -0,0 +1,200 @@
+"""
+Prometheus metrics for HTTP requests and database access.
+
+Every series is labelled by route template (``/api/v1/items/{item_id}``),
+never by raw path, so cardinality stays bounded. When the
+PROMETHEUS_MULTIPROC_DIR environment variable points at an empty directory,
+prometheus_client keeps values in per-process files there and ``/metrics``
+aggregates all workers of the host.
+"""
+
+import os
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+from prometheus_client import multiprocess
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Label for database work done outside any request (startup, scripts)
+NO_ROUTE = "none"
+UNMATCHED_ROUTE = "unmatched"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1, 5)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100)
+
+REQUESTS = Counter(
+    "http_requests_total", "HTTP requests", ["method", "route", "status"]
+)
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Time from receiving a request to sending the last body byte",
+    ["method", "route"],
+    buckets=LATENCY_BUCKETS,
+)
+# Labelled by method only: the route is not known until the request is routed
+REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "Requests being handled",
+    ["method"],
+    multiprocess_mode="livesum",
+)
+RESPONSE_SIZE = Histogram(
+    "http_response_size_bytes",
+    "Response body size",
+    ["method", "route"],
+    buckets=SIZE_BUCKETS,
+)
+DB_STATEMENT_DURATION = Histogram(
+    "db_statement_duration_seconds",
+    "Database statement execution time",
+    ["route", "operation"],
+    buckets=DB_BUCKETS,
+)
+DB_QUERIES_PER_REQUEST = Histogram(
+    "db_queries_per_request",
+    "Database statements executed while handling one request",
+    ["route"],
+    buckets=QUERY_COUNT_BUCKETS,
+)
+DB_POOL_WAIT = Histogram(
+    "db_pool_wait_seconds",
+    "Time spent getting a connection from the pool (including connecting)",
+    ["route"],
+    buckets=DB_BUCKETS,
+)
+
+
+@dataclass
+class RequestStats:
+    scope: Scope
+    queries: int = 0
+    route: Optional[str] = None
+
+    def route_label(self) -> str:
+        # Routing happens inside the app, so resolve the template lazily
+        if self.route is None:
+            route = self.scope.get("route")
+            if route is not None:
+                self.route = route.path
+            elif self.scope.get("root_path"):
+                self.route = self.scope["root_path"]
+            else:
+                return UNMATCHED_ROUTE
+        return self.route
+
+
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar(
+    "request_stats", default=None
+)
+
+
+def current_route() -> str:
+    stats = _request_stats.get()
+    return stats.route_label() if stats else NO_ROUTE
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware (it doesn't buffer or re-wrap streaming bodies)
+    recording latency, status, response size and in-flight requests.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(scope=scope)
+        token = _request_stats.set(stats)
+        method = scope["method"]
+        status = 500
+        size = 0
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            elif message["type"] == "http.response.zerocopysend":
+                size += message.get("count") or 0
+            await send(message)
+
+        in_progress = REQUESTS_IN_PROGRESS.labels(method)
+        in_progress.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            in_progress.dec()
+            _request_stats.reset(token)
+
+            route = stats.route_label()
+            REQUESTS.labels(method, route, str(status)).inc()
+            REQUEST_DURATION.labels(method, route).observe(elapsed)
+            RESPONSE_SIZE.labels(method, route).observe(size)
+            DB_QUERIES_PER_REQUEST.labels(route).observe(stats.queries)
+
+
+def observe_pool_wait(seconds: float) -> None:
+    DB_POOL_WAIT.labels(current_route()).observe(seconds)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("metrics_query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["metrics_query_start"].pop()
+    operation = statement.lstrip().split(None, 1)[0].upper() if statement else ""
+    DB_STATEMENT_DURATION.labels(current_route(), operation).observe(
+        time.perf_counter() - started
+    )
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.queries += 1
+
+
+def _handle_error(exception_context):
+    # after_cursor_execute doesn't fire for failed statements
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("metrics_query_start"):
+        conn.info["metrics_query_start"].pop()
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Time every statement executed through engine (a sync Engine)."""
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+
+def metrics_response() -> Response:
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry: Any = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
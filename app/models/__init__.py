@@ -5,7 +5,18 @@ from app.database import Base
 from app.models.suite import Suite
 from app.models.collection import Collection
 from app.models.item import Item
+from app.models.facet import ItemFacetCount
+from app.models.catalog_version import catalog_version_seq
 from app.models.package import Package
 from app.models.testimonial import Testimonial
 
-__all__ = ["Base", "Suite", "Collection", "Item", "Package", "Testimonial"]
+__all__ = [
+    "Base",
+    "Suite",
+    "Collection",
+    "Item",
+    "ItemFacetCount",
+    "catalog_version_seq",
+    "Package",
+    "Testimonial",
+]
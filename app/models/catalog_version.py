@@ -0,0 +1,12 @@
+from sqlalchemy import Sequence
+
+from app.database import Base
+
+# Goes up with every statement that writes suites, collections or items.
+#
+# Statement-level triggers on those tables take the next value, so admin
+# edits, imports and raw SQL count as well as the API's CRUD paths. nextval
+# takes no lock and is never rolled back: concurrent writes don't wait on
+# each other, and a rolled-back write costs at most one needless
+# invalidation. Readers look at last_value.
+catalog_version_seq = Sequence("catalog_version_seq", metadata=Base.metadata)
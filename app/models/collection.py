@@ -1,4 +1,13 @@
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey
+from sqlalchemy import (
+    Column,
+    Integer,
+    String,
+    Text,
+    Boolean,
+    DateTime,
+    ForeignKey,
+    Index,
+)
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
@@ -9,6 +18,10 @@ from sqlalchemy.dialects.postgresql import UUID
 
 class Collection(Base):
     __tablename__ = "collections"
+    __table_args__ = (
+        Index("ix_collections_suite_id", "suite_id"),
+        Index("ix_collections_display_order", "display_order", "id"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     name = Column(String(255), nullable=False, unique=True)
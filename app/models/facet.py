@@ -0,0 +1,19 @@
+from sqlalchemy import Column, Integer, String
+
+from app.database import Base
+
+
+class ItemFacetCount(Base):
+    """
+    Number of items carrying each facet value (category, fabric, colors,
+    sizes), plus a ("_all", "") row with the total item count.
+
+    Rows are maintained by statement-level triggers on items, so reading
+    unfiltered facet counts never scans items.
+    """
+
+    __tablename__ = "item_facet_counts"
+
+    facet = Column(String(20), primary_key=True)
+    value = Column(String(255), primary_key=True)
+    item_count = Column(Integer, nullable=False, default=0)
@@ -9,16 +9,18 @@ from sqlalchemy import (
     ARRAY,
     Numeric,
     Enum,
+    Index,
+    Computed,
 )
-from sqlalchemy.orm import relationship, Mapped, mapped_column
-from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship, Mapped, mapped_column, deferred
+from sqlalchemy.sql import func, text
 from app.database import Base
 from typing import List
 import enum
 
 import uuid
-from sqlalchemy.dialects.postgresql import UUID
-from app.db_types import ListStringType
+from sqlalchemy.dialects.postgresql import JSONB, UUID, TSVECTOR
+from app.db_types import ListStringType, weighted_vector_sql
 
 
 class CategoryEnum(enum.Enum):
@@ -29,6 +31,16 @@ class CategoryEnum(enum.Enum):
 
 class Item(Base):
     __tablename__ = "items"
+    __table_args__ = (
+        Index("ix_items_collection_id_created_at", "collection_id", "created_at", "id"),
+        Index("ix_items_created_at", "created_at", "id"),
+        Index("ix_items_category_created_at", "category", "created_at", "id"),
+        Index("ix_items_search_vector", "search_vector", postgresql_using="gin"),
+        Index("ix_items_colors", "colors", postgresql_using="gin"),
+        Index("ix_items_sizes", "sizes", postgresql_using="gin"),
+        Index("ix_items_fabric", "fabric"),
+        Index("ix_items_price", "price", "id"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     name = Column(String(255), nullable=False)
@@ -42,6 +54,11 @@ class Item(Base):
         ListStringType(length=512)
     )  # For multiple image URLs/paths
 
+    # Derivatives of the local images, keyed by image URL (see app.images)
+    image_variants = Column(
+        JSONB, nullable=False, default=dict, server_default=text("'{}'::jsonb")
+    )
+
     fabric = Column(String(100))
     fabric_composition = Column(String(255))
     category = Column(Enum(CategoryEnum))
@@ -51,6 +68,22 @@ class Item(Base):
         UUID(as_uuid=True), ForeignKey("collections.id", ondelete="CASCADE")
     )
 
+    # Full-text search document, maintained by Postgres (never loaded by default)
+    search_vector = deferred(
+        Column(
+            TSVECTOR,
+            Computed(
+                weighted_vector_sql(
+                    ("name", "A"),
+                    ("description", "B"),
+                    ("fabric", "C"),
+                    ("fabric_composition", "C"),
+                ),
+                persisted=True,
+            ),
+        )
+    )
+
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
@@ -7,14 +7,18 @@ from sqlalchemy import (
     DateTime,
     Numeric,
     CheckConstraint,
+    Index,
+    Computed,
 )
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred
 from sqlalchemy.sql import func
 from app.database import Base  # Assuming this import is correct
 
 import uuid
-from sqlalchemy.dialects.postgresql import UUID
-from app.db_types import ListStringType
+from sqlalchemy.dialects.postgresql import UUID, TSVECTOR
+from app.config import settings
+from app.db_types import ListStringType, weighted_vector_sql
+from app.uploads import upload_url_prefix
 from sqlalchemy.orm import Mapped, mapped_column
 from typing import List
 
@@ -25,6 +29,8 @@ class Package(Base):
         CheckConstraint(
             "display_order >= 0", name="ck_packages_display_order_nonnegative"
         ),
+        Index("ix_packages_display_order", "display_order", "id"),
+        Index("ix_packages_search_vector", "search_vector", postgresql_using="gin"),
     )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
@@ -39,10 +45,21 @@ class Package(Base):
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     is_popular = Column(Boolean, default=False)
 
+    # Full-text search document over the name, maintained by Postgres
+    search_vector = deferred(
+        Column(
+            TSVECTOR,
+            Computed(weighted_vector_sql(("name", "A")), persisted=True),
+        )
+    )
+
     @property
     def package_name(self):
         return self.name if self.name else None
 
     @property
     def download_link(self):
+        # Uploaded brochures are downloaded through the API (ranges, sendfile)
+        if self.pdf_url and self.pdf_url.startswith(upload_url_prefix("packages")):
+            return f"{settings.API_V1_STR}/packages/{self.id}/brochure"
         return self.pdf_url if self.pdf_url else None
@@ -1,14 +1,31 @@
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, Numeric
-from sqlalchemy.orm import relationship
+from sqlalchemy import (
+    Column,
+    Integer,
+    String,
+    Text,
+    Boolean,
+    DateTime,
+    Numeric,
+    Index,
+    Computed,
+    text,
+)
+from sqlalchemy.orm import relationship, deferred
 from sqlalchemy.sql import func
 from app.database import Base
 
 import uuid
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import UUID, TSVECTOR
+from app.db_types import weighted_vector_sql
 
 
 class Testimonial(Base):
     __tablename__ = "testimonials"
+    __table_args__ = (
+        Index("ix_testimonials_display_order", "display_order", "id"),
+        Index("ix_testimonials_rating", text("rating DESC"), "display_order"),
+        Index("ix_testimonials_search_vector", "search_vector", postgresql_using="gin"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     client_name = Column(String(100), nullable=False, unique=True)
@@ -17,3 +34,14 @@ class Testimonial(Base):
     display_order = Column(Integer, default=0)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    # Full-text search document, maintained by Postgres
+    search_vector = deferred(
+        Column(
+            TSVECTOR,
+            Computed(
+                weighted_vector_sql(("client_name", "A"), ("review_text", "B")),
+                persisted=True,
+            ),
+        )
+    )
@@ -0,0 +1,103 @@
+"""
+Per-route database query budgets.
+
+Decorate a route function with ``@query_budget(n)`` to declare that one call
+runs at most n statements, and that no statement shape repeats more than
+QUERY_BUDGET_MAX_REPEATS times (the signature of an N+1 loop). Violations
+are logged in QUERY_BUDGET_MODE=warn and raise QueryBudgetExceeded in
+QUERY_BUDGET_MODE=raise, meant for tests and local runs. With "off" the
+decorator returns the function untouched.
+
+Lazy loads during response serialization can't issue queries under
+asyncio (they fail with MissingGreenlet instead), so counting the route
+function's own execution covers every query of the request.
+"""
+
+import functools
+import logging
+import re
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.config import settings
+from app.exceptions.query_budget import QueryBudgetExceeded
+
+logger = logging.getLogger("app.query_budget")
+
+# Statements differing only in the number of bound parameters (IN lists,
+# multi-row VALUES) have the same shape
+_PARAMETER_LIST = re.compile(r"\$\d+(?:::[\w\[\]]+)?(?:\s*,\s*\$\d+(?:::[\w\[\]]+)?)*")
+
+
+@dataclass
+class QueryTracker:
+    name: str
+    shapes: Counter = field(default_factory=Counter)
+
+    @property
+    def count(self) -> int:
+        return sum(self.shapes.values())
+
+    def violations(self, max_queries: int, max_repeats: int) -> List[str]:
+        problems = []
+        if self.count > max_queries:
+            problems.append(f"ran {self.count} queries, budget is {max_queries}")
+        for shape, repeats in self.shapes.most_common():
+            if repeats <= max_repeats:
+                break
+            problems.append(f"ran the same statement {repeats} times: {shape[:300]}")
+        return problems
+
+
+_tracker: ContextVar[Optional[QueryTracker]] = ContextVar("query_tracker", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    tracker = _tracker.get()
+    if tracker is not None:
+        tracker.shapes[_PARAMETER_LIST.sub("?", " ".join(statement.split()))] += 1
+
+
+def install_query_tracking(engine: Engine) -> None:
+    """Count statements of engine (a sync Engine) for the active budget."""
+    if settings.QUERY_BUDGET_MODE == "off":
+        return
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+
+
+def query_budget(max_queries: int, *, max_repeats: Optional[int] = None) -> Callable:
+    """Declare how many queries one call of an async route function may run."""
+    if max_repeats is None:
+        max_repeats = settings.QUERY_BUDGET_MAX_REPEATS
+
+    def decorator(func: Callable) -> Callable:
+        if settings.QUERY_BUDGET_MODE == "off":
+            return func
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            tracker = QueryTracker(name=func.__qualname__)
+            token = _tracker.set(tracker)
+            try:
+                result = await func(*args, **kwargs)
+            finally:
+                _tracker.reset(token)
+
+            problems = tracker.violations(max_queries, max_repeats)
+            if problems:
+                message = f"{func.__module__}.{tracker.name}: " + "; ".join(problems)
+                if settings.QUERY_BUDGET_MODE == "raise":
+                    raise QueryBudgetExceeded(message)
+                logger.warning(message)
+            return result
+
+        wrapper.query_budget = max_queries
+        return wrapper
+
+    return decorator
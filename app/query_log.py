@@ -0,0 +1,108 @@
+"""
+Structured slow-query log, replacing engine echo.
+
+Statements slower than SLOW_QUERY_MS are logged as one JSON object on the
+"app.slow_query" logger with the request's correlation ID and route. Bound
+parameters are redacted to their types unless SLOW_QUERY_LOG_PARAMETERS is
+set. A sampled fraction (SLOW_QUERY_EXPLAIN_RATE) of slow SELECTs is run
+again under EXPLAIN (ANALYZE, BUFFERS) and the plan attached. Fast
+statements only cost two perf_counter() calls.
+"""
+
+import json
+import logging
+import random
+import time
+from typing import Any, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.config import settings
+from app.metrics import current_route
+from app.request_id import get_request_id
+
+logger = logging.getLogger("app.slow_query")
+
+MAX_STATEMENT_LENGTH = 4000
+MAX_PARAMETER_LENGTH = 200
+
+
+def _redact(parameters: Any, executemany: bool) -> Any:
+    if executemany:
+        return {"executemany": len(parameters)}
+    if settings.SLOW_QUERY_LOG_PARAMETERS:
+        values = parameters.values() if isinstance(parameters, dict) else parameters
+        return [repr(value)[:MAX_PARAMETER_LENGTH] for value in values or ()]
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    return [type(value).__name__ for value in parameters or ()]
+
+
+def _explain(conn, statement: str, parameters: Any) -> Optional[Any]:
+    """
+    Re-run a SELECT under EXPLAIN ANALYZE on the raw DBAPI connection (so the
+    event hooks don't see it), inside a savepoint so a failure can't abort
+    the caller's transaction.
+    """
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        cursor.execute("SAVEPOINT slow_query_explain")
+        try:
+            cursor.execute(
+                f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {statement}", parameters
+            )
+            plan = cursor.fetchone()[0]
+        except Exception as exc:
+            cursor.execute("ROLLBACK TO SAVEPOINT slow_query_explain")
+            return {"error": str(exc)[:MAX_PARAMETER_LENGTH]}
+        cursor.execute("RELEASE SAVEPOINT slow_query_explain")
+        return json.loads(plan) if isinstance(plan, str) else plan
+    finally:
+        cursor.close()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("slow_query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed_ms = (time.perf_counter() - conn.info["slow_query_start"].pop()) * 1000
+    if elapsed_ms < settings.SLOW_QUERY_MS:
+        return
+    if random.random() >= settings.SLOW_QUERY_SAMPLE_RATE:
+        return
+
+    record = {
+        "event": "slow_query",
+        "duration_ms": round(elapsed_ms, 2),
+        "threshold_ms": settings.SLOW_QUERY_MS,
+        "request_id": get_request_id(),
+        "route": current_route(),
+        "rowcount": cursor.rowcount,
+        "statement": " ".join(statement.split())[:MAX_STATEMENT_LENGTH],
+        "parameters": _redact(parameters, executemany),
+    }
+    if (
+        not executemany
+        and statement.lstrip()[:6].upper() == "SELECT"
+        and random.random() < settings.SLOW_QUERY_EXPLAIN_RATE
+    ):
+        record["plan"] = _explain(conn, statement, parameters)
+
+    logger.warning(json.dumps(record, default=str))
+
+
+def _handle_error(exception_context):
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("slow_query_start"):
+        conn.info["slow_query_start"].pop()
+
+
+def install_slow_query_log(engine: Engine) -> None:
+    """Attach the slow-query log to engine (a sync Engine)."""
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
@@ -0,0 +1,57 @@
+from typing import Generic, List, Literal, Optional, TypeVar, Union
+from typing_extensions import Annotated
+from pydantic import BaseModel, Field
+import uuid
+
+from app.config import settings
+
+CreateT = TypeVar("CreateT", bound=BaseModel)
+UpdateT = TypeVar("UpdateT", bound=BaseModel)
+
+
+class BatchCreate(BaseModel, Generic[CreateT]):
+    op: Literal["create"]
+    data: CreateT
+
+
+class BatchUpdate(BaseModel, Generic[UpdateT]):
+    op: Literal["update"]
+    id: uuid.UUID
+    data: UpdateT
+
+
+class BatchDelete(BaseModel):
+    op: Literal["delete"]
+    id: uuid.UUID
+
+
+class BatchRequest(BaseModel, Generic[CreateT, UpdateT]):
+    """
+    Operations applied in one transaction: all creates, then all updates,
+    then all deletes, each kind with a single statement.
+    """
+
+    operations: List[
+        Annotated[
+            Union[BatchCreate[CreateT], BatchUpdate[UpdateT], BatchDelete],
+            Field(discriminator="op"),
+        ]
+    ] = Field(..., min_length=1, max_length=settings.BATCH_MAX_OPERATIONS)
+
+
+class BatchOperationResult(BaseModel):
+    index: int
+    op: str
+    id: Optional[uuid.UUID] = None
+    # created / updated / deleted / not_found / failed / rolled_back
+    status: str
+    error: Optional[str] = None
+
+
+class BatchResult(BaseModel):
+    committed: bool
+    created: int = 0
+    updated: int = 0
+    deleted: int = 0
+    not_found: int = 0
+    results: List[BatchOperationResult]
@@ -0,0 +1,15 @@
+from typing import List
+
+from app.schemas.collection import CollectionInDBBase
+from app.schemas.item import ItemSummary
+from app.schemas.suite import Suite
+
+
+class CatalogCollection(CollectionInDBBase):
+    """A collection in the catalog tree, with its items as summaries"""
+
+    items: List[ItemSummary]
+
+
+class CatalogSuite(Suite):
+    collections: List[CatalogCollection]
@@ -3,6 +3,7 @@ from datetime import datetime
 from click import UUID
 from pydantic import BaseModel, Field
 from app.schemas.item import Item
+from app.schemas.batch import BatchRequest
 import uuid
 from sqlalchemy.dialects.postgresql import UUID
 
@@ -50,3 +51,15 @@ class Collection(CollectionInDBBase):
 
 
 CollectionResponse = Collection
+
+
+class CollectionSummary(CollectionInDBBase):
+    """A collection without its items, as list routes return it by default"""
+
+    suite_name: Optional[str] = None
+    item_count: int
+    # First image of the newest item that has one
+    cover_image: Optional[str]
+
+
+CollectionBatchRequest = BatchRequest[CollectionCreate, CollectionUpdate]
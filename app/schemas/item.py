@@ -1,12 +1,30 @@
-from typing import List, Optional
+from typing import Dict, List, Optional
 from datetime import datetime
 from decimal import Decimal
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, Field, field_validator, model_validator, validator
 import uuid
 import json
+from app.schemas.batch import BatchRequest
 import re
 
 
+class ImageRendition(BaseModel):
+    url: str
+    width: int
+    height: int
+    type: str
+
+
+class ImageVariants(BaseModel):
+    """Derivatives of one item image: srcset candidates and a placeholder"""
+
+    width: int
+    height: int
+    blurhash: str
+    # Grouped by type, narrowest first
+    srcset: List[ImageRendition] = Field(default_factory=list)
+
+
 class ItemBase(BaseModel):
     name: str = Field(..., max_length=255)
     description: Optional[str] = None
@@ -42,6 +60,8 @@ class ItemInDBBase(ItemBase):
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
     collection_name: Optional[str] = None
+    # Keyed by image URL, for the images that have derivatives
+    image_variants: Dict[str, ImageVariants] = Field(default_factory=dict)
 
     class Config:
         from_attributes = True
@@ -52,3 +72,102 @@ class Item(ItemInDBBase):
 
 
 ItemResponse = Item
+
+
+class ItemSummary(BaseModel):
+    """The columns an item card needs, for list routes with view=summary"""
+
+    id: uuid.UUID
+    name: str
+    price: Optional[Decimal] = None
+    category: Optional[str] = None
+    # First of the item's images
+    cover_image: Optional[str]
+    cover_variants: Optional[ImageVariants] = None
+    collection_id: uuid.UUID
+    collection_name: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class ItemSearchResult(Item):
+    search_rank: float = 0.0
+
+
+class FacetValue(BaseModel):
+    value: str
+    count: int
+
+
+class PriceRange(BaseModel):
+    min: Optional[Decimal] = None
+    max: Optional[Decimal] = None
+
+
+class ItemFacets(BaseModel):
+    category: List[FacetValue] = Field(default_factory=list)
+    colors: List[FacetValue] = Field(default_factory=list)
+    sizes: List[FacetValue] = Field(default_factory=list)
+    fabric: List[FacetValue] = Field(default_factory=list)
+    price: PriceRange = Field(default_factory=PriceRange)
+
+
+class ItemFacetPage(BaseModel):
+    items: List[Item]
+    facets: ItemFacets
+    total: int
+    next_cursor: Optional[str] = None
+
+
+class ItemImportRow(ItemBase):
+    """
+    One row of a bulk import. Rows with the id of an existing item update
+    it; the collection may be given by id or by name.
+    """
+
+    id: Optional[uuid.UUID] = None
+    price: Decimal = Field(..., ge=0)
+    collection_id: Optional[uuid.UUID] = None
+    collection_name: Optional[str] = None
+
+    @model_validator(mode="before")
+    @classmethod
+    def blank_to_none(cls, data):
+        # CSV cells are never missing, only empty
+        if isinstance(data, dict):
+            return {k: (None if v == "" else v) for k, v in data.items()}
+        return data
+
+    @field_validator("images", "colors", "sizes", mode="before")
+    @classmethod
+    def split_list(cls, value):
+        # Comma-separated in CSV, as written by /items/export
+        if isinstance(value, str):
+            return [v.strip() for v in value.split(",") if v.strip()]
+        return value or []
+
+    @model_validator(mode="after")
+    def require_collection(self):
+        if self.collection_id is None and not self.collection_name:
+            raise ValueError("collection_id or collection_name is required")
+        return self
+
+
+class ItemImportError(BaseModel):
+    row: int
+    errors: List[str]
+
+
+class ItemImportResult(BaseModel):
+    received: int = 0
+    inserted: int = 0
+    updated: int = 0
+    failed: int = 0
+    dry_run: bool = False
+    errors: List[ItemImportError] = Field(default_factory=list)
+
+
+ItemBatchRequest = BatchRequest[ItemCreate, ItemUpdate]
@@ -4,6 +4,8 @@ from datetime import datetime
 from decimal import Decimal
 import uuid
 
+from app.schemas.batch import BatchRequest
+
 
 class PackageBase(BaseModel):
     name: str = Field(..., max_length=255)
@@ -28,7 +30,7 @@ class PackageUpdate(BaseModel):
     name: Optional[str] = Field(None, max_length=255)
     price: Optional[Decimal] = Field(None, gt=0)
     description: Optional[str] = None
-    featurees: Optional[List[str]] = None
+    features: Optional[List[str]] = None
     pdf_url: Optional[str] = Field(None, max_length=512)
     is_active: Optional[bool] = None
     display_order: Optional[int] = Field(None, ge=0)
@@ -45,3 +47,6 @@ class PackageOut(PackageBase):
 
     class Config:
         from_attributes = True
+
+
+PackageBatchRequest = BatchRequest[PackageCreate, PackageUpdate]
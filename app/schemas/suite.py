@@ -1,7 +1,7 @@
 from pydantic import BaseModel, Field
 from typing import List, Optional
 from datetime import datetime
-from app.schemas.collection import Collection
+from app.schemas.collection import Collection, CollectionSummary
 
 import uuid
 from sqlalchemy.dialects.postgresql import UUID
@@ -45,6 +45,13 @@ class SuiteWithCollections(Suite):
         from_attributes = True
 
 
+class SuiteWithCollectionSummaries(Suite):
+    collections: List[CollectionSummary]
+
+    class Config:
+        from_attributes = True
+
+
 SuiteResponse = Suite
 
 
@@ -0,0 +1,255 @@
+"""
+Streaming multipart uploads. The request body is fed to python-multipart as
+it arrives and the file part goes straight to disk through aiofiles, hashed
+on the way, so an upload holds about one network chunk in memory whatever
+its size (Starlette's form parser would spool it to a temporary file first
+and leave the copy to us).
+
+Files are stored under the hash of their content, so the same photo
+uploaded twice is stored once. Types are judged by the file's leading
+bytes, not by what the client claims.
+"""
+
+import contextlib
+import hashlib
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+
+import aiofiles
+import aiofiles.os
+from multipart.exceptions import MultipartParseError
+from multipart.multipart import MultipartParser, parse_options_header
+from starlette.requests import Request
+
+from app.config import settings
+from app.exceptions.uploads import (
+    InvalidUploadError,
+    UnsupportedFileTypeError,
+    UploadTooLargeError,
+)
+from app.images import STATIC_DIR, STATIC_URL
+
+# Room for the boundaries and part headers around the file in a body
+MULTIPART_OVERHEAD = 16 * 1024
+
+
+@dataclass(frozen=True)
+class FileType:
+    content_type: str
+    extension: str
+    signature: bytes
+    offset: int = 0
+    # Required at offset 0 as well, for signatures inside a container format
+    container: bytes = b""
+
+    def matches(self, head: bytes) -> bool:
+        end = self.offset + len(self.signature)
+        return (
+            head.startswith(self.container)
+            and head[self.offset : end] == self.signature
+        )
+
+
+IMAGE_TYPES = (
+    FileType("image/jpeg", ".jpg", b"\xff\xd8\xff"),
+    FileType("image/png", ".png", b"\x89PNG\r\n\x1a\n"),
+    FileType("image/webp", ".webp", b"WEBP", offset=8, container=b"RIFF"),
+)
+
+PDF_TYPES = (FileType("application/pdf", ".pdf", b"%PDF-"),)
+
+# Enough leading bytes for every signature above
+SNIFF_BYTES = 16
+
+
+@dataclass
+class StoredUpload:
+    path: Path
+    url: str
+    content_type: str
+    size: int
+    digest: str
+    # As sent by the client; the stored name is the digest
+    filename: Optional[str] = None
+    # False when an identical file was stored before
+    created: bool = True
+
+
+def upload_dir(kind: str) -> Path:
+    """Where uploads of one kind ("items", "packages") are stored."""
+    return STATIC_DIR / settings.UPLOAD_DIR / kind
+
+
+def upload_url_prefix(kind: str) -> str:
+    return f"{STATIC_URL}/{settings.UPLOAD_DIR}/{kind}/"
+
+
+def stored_path(url: str, kind: str) -> Optional[Path]:
+    """The file behind a URL store_upload() returned for ``kind``, if any."""
+    prefix = upload_url_prefix(kind)
+    name = url[len(prefix) :] if url.startswith(prefix) else ""
+    if not name or "/" in name or name.startswith("."):
+        return None
+    path = upload_dir(kind) / name
+    return path if path.is_file() else None
+
+
+class _FilePartReader:
+    """
+    python-multipart callbacks picking out the one file sent as ``field``.
+    Callbacks can't await, so they only queue the file's data; store_upload
+    writes it out between network chunks. Other parts are ignored.
+    """
+
+    def __init__(self, field: str):
+        self.field = field
+        self.filename: Optional[str] = None
+        self.found = False
+        self.finished = False
+        self._in_file = False
+        self._disposition = b""
+        self._header_name = b""
+        self._header_value = b""
+        self._chunks: List[bytes] = []
+
+    def callbacks(self) -> Dict[str, Callable]:
+        return {
+            "on_part_begin": self.on_part_begin,
+            "on_part_data": self.on_part_data,
+            "on_part_end": self.on_part_end,
+            "on_header_field": self.on_header_field,
+            "on_header_value": self.on_header_value,
+            "on_header_end": self.on_header_end,
+            "on_headers_finished": self.on_headers_finished,
+        }
+
+    def take(self) -> List[bytes]:
+        chunks, self._chunks = self._chunks, []
+        return chunks
+
+    def on_part_begin(self) -> None:
+        self._disposition = b""
+
+    def on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header_name += data[start:end]
+
+    def on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._header_value += data[start:end]
+
+    def on_header_end(self) -> None:
+        if self._header_name.lower() == b"content-disposition":
+            self._disposition = self._header_value
+        self._header_name = self._header_value = b""
+
+    def on_headers_finished(self) -> None:
+        _, options = parse_options_header(self._disposition)
+        name = options.get(b"name", b"").decode("utf-8", "replace")
+        if name != self.field or b"filename" not in options:
+            return
+        if self.found:
+            raise InvalidUploadError(f"Only one {self.field!r} file can be uploaded")
+        self.found = self._in_file = True
+        self.filename = options[b"filename"].decode("utf-8", "replace") or None
+
+    def on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if self._in_file:
+            self._chunks.append(data[start:end])
+
+    def on_part_end(self) -> None:
+        if self._in_file:
+            self._in_file = False
+            self.finished = True
+
+
+def _file_type(head: bytes, accept: Sequence[FileType]) -> FileType:
+    for file_type in accept:
+        if file_type.matches(head):
+            return file_type
+    accepted = ", ".join(t.content_type for t in accept)
+    raise UnsupportedFileTypeError(f"Unsupported file type; expected {accepted}")
+
+
+async def store_upload(
+    request: Request,
+    directory: Path,
+    *,
+    accept: Sequence[FileType],
+    max_bytes: int,
+    field: str = "file",
+) -> StoredUpload:
+    """
+    Stream the ``field`` file of a multipart/form-data request into
+    ``directory`` (under static/), named after its content hash. Raises
+    InvalidUploadError, or its subclasses UploadTooLargeError and
+    UnsupportedFileTypeError; nothing is left on disk when it does.
+    """
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    if content_type != b"multipart/form-data" or b"boundary" not in params:
+        raise InvalidUploadError("Expected a multipart/form-data body")
+    length = request.headers.get("content-length", "")
+    if length.isdigit() and int(length) > max_bytes + MULTIPART_OVERHEAD:
+        raise UploadTooLargeError(f"Uploads are limited to {max_bytes} bytes")
+
+    reader = _FilePartReader(field)
+    parser = MultipartParser(params[b"boundary"], reader.callbacks())
+    await aiofiles.os.makedirs(directory, exist_ok=True)
+    tmp = directory / f".upload-{uuid.uuid4().hex}.tmp"
+    hasher = hashlib.blake2b(digest_size=16)
+    size = 0
+    head = b""
+    file_type: Optional[FileType] = None
+    try:
+        async with aiofiles.open(tmp, "wb") as out:
+            try:
+                async for chunk in request.stream():
+                    parser.write(chunk)
+                    for data in reader.take():
+                        size += len(data)
+                        if size > max_bytes:
+                            raise UploadTooLargeError(
+                                f"Uploads are limited to {max_bytes} bytes"
+                            )
+                        if file_type is None and len(head) < SNIFF_BYTES:
+                            head += data[: SNIFF_BYTES - len(head)]
+                            if len(head) == SNIFF_BYTES:
+                                file_type = _file_type(head, accept)
+                        hasher.update(data)
+                        await out.write(data)
+                parser.finalize()
+            except MultipartParseError as exc:
+                raise InvalidUploadError(f"Malformed multipart body: {exc}") from exc
+        if not reader.finished:
+            raise InvalidUploadError(f"No {field!r} file in the upload")
+        if file_type is None:
+            file_type = _file_type(head, accept)
+
+        digest = hasher.hexdigest()
+        path = directory / f"{digest}{file_type.extension}"
+        created = not await aiofiles.os.path.exists(path)
+        if created:
+            await aiofiles.os.replace(tmp, path)
+        else:
+            await aiofiles.os.remove(tmp)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            await aiofiles.os.remove(tmp)
+        raise
+
+    return StoredUpload(
+        path=path,
+        url=f"{STATIC_URL}/{path.relative_to(STATIC_DIR).as_posix()}",
+        content_type=file_type.content_type,
+        size=size,
+        digest=digest,
+        filename=reader.filename,
+        created=created,
+    )
+
+
+async def discard_upload(upload: StoredUpload) -> None:
+    """Remove a stored upload that turned out unusable, unless it predates it."""
+    if upload.created:
+        with contextlib.suppress(FileNotFoundError):
+            await aiofiles.os.remove(upload.path)
@@ -0,0 +1,16 @@
+"""
+Load tests for the HTTP API.
+
+Fill a local database with a synthetic catalog, then replay a scenario for
+every route and write latency percentiles, throughput and queries per
+request to JSON:
+
+    python -m benchmarks.generate --items 100000 --reset
+    python -m benchmarks.run --output before.json
+    python -m benchmarks.run --url http://localhost:8000 --output after.json
+    python -m benchmarks.compare before.json after.json
+
+Without --url the app is driven in-process, which is convenient for quick
+comparisons but shares one event loop between client and server; against
+a uvicorn/gunicorn server the numbers include the real network stack.
+"""
@@ -0,0 +1,98 @@
+"""
+Compare two benchmark reports scenario by scenario:
+
+    python -m benchmarks.compare before.json after.json
+    python -m benchmarks.compare before.json after.json --fail-above 10
+
+With --fail-above the exit status is 1 when any scenario's p95 latency grew
+by more than that many percent, so a CI job can reject regressions.
+"""
+
+import argparse
+import json
+import sys
+from typing import Optional
+
+
+def change(before: Optional[float], after: Optional[float]) -> Optional[float]:
+    if before is None or after is None or before == 0:
+        return None
+    return (after - before) / before * 100
+
+
+def _format(value: Optional[float], percent: Optional[float]) -> str:
+    if value is None:
+        return f"{'-':>18}"
+    delta = f"{percent:+.0f}%" if percent is not None else ""
+    return f"{value:>11.1f} {delta:>6}"
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("before")
+    parser.add_argument("after")
+    parser.add_argument(
+        "--fail-above",
+        type=float,
+        help="exit with status 1 when a p95 latency grew by more than this percent",
+    )
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    with open(args.before) as f:
+        before = json.load(f)
+    with open(args.after) as f:
+        after = json.load(f)
+
+    for report in (before, after):
+        meta = report["meta"]
+        print(
+            f"{meta.get('label') or meta['started_at']}: commit {meta['commit']}, "
+            f"{meta['target']}, concurrency {meta['concurrency']}, "
+            f"dataset {meta['dataset']}"
+        )
+    print()
+    print(
+        f"{'scenario':34} {'p50 ms':>18} {'p95 ms':>18} {'p99 ms':>18} "
+        f"{'req/s':>18} {'queries':>15}"
+    )
+
+    regressions = []
+    for name, new in after["scenarios"].items():
+        old = before["scenarios"].get(name)
+        if old is None:
+            continue
+        columns = []
+        for key in ("p50", "p95", "p99"):
+            percent = change(old["latency_ms"][key], new["latency_ms"][key])
+            columns.append(_format(new["latency_ms"][key], percent))
+            if (
+                key == "p95"
+                and args.fail_above is not None
+                and percent is not None
+                and percent > args.fail_above
+            ):
+                regressions.append(name)
+        columns.append(
+            _format(
+                new["throughput_rps"],
+                change(old["throughput_rps"], new["throughput_rps"]),
+            )
+        )
+        queries = f"{old['queries_per_request']} -> {new['queries_per_request']}"
+        print(f"{name:34} {' '.join(columns)} {queries:>15}")
+
+    if regressions:
+        print(
+            f"\np95 regressed by more than {args.fail_above:g}%: "
+            + ", ".join(regressions),
+            file=sys.stderr,
+        )
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
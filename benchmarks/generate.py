@@ -0,0 +1,399 @@
+"""
+Fill the database with a synthetic catalog for load tests:
+
+    python -m benchmarks.generate --items 100000 --reset
+    python -m benchmarks.generate --items 1000000 --reset --seed 7
+
+Collections, suites and testimonials scale with --items unless given
+explicitly. The same seed always produces the same catalog. Rows are
+written with COPY, so a million items take minutes, not hours.
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Iterator, List, Sequence, Tuple
+
+from sqlalchemy import text
+
+from app.database import engine
+from app.models.item import CategoryEnum
+
+COLORS = [
+    "black",
+    "white",
+    "ivory",
+    "red",
+    "blue",
+    "navy",
+    "green",
+    "emerald",
+    "pink",
+    "blush",
+    "gold",
+    "silver",
+    "beige",
+    "burgundy",
+    "lilac",
+    "champagne",
+]
+SIZES = ["XS", "S", "M", "L", "XL", "XXL"]
+FABRICS = {
+    "silk": "100% silk",
+    "satin": "95% polyester, 5% elastane",
+    "chiffon": "100% polyester",
+    "lace": "80% nylon, 20% cotton",
+    "tulle": "100% nylon",
+    "organza": "100% silk",
+    "crepe": "97% polyester, 3% spandex",
+    "velvet": "82% viscose, 18% silk",
+    "cotton": "100% cotton",
+    "linen": "100% linen",
+}
+GARMENTS = [
+    "dress",
+    "gown",
+    "jumpsuit",
+    "skirt",
+    "blouse",
+    "kaftan",
+    "abaya",
+    "suit",
+    "cape",
+    "veil",
+]
+STYLES = [
+    "embroidered",
+    "beaded",
+    "pleated",
+    "draped",
+    "tailored",
+    "layered",
+    "sequined",
+    "floral",
+    "minimal",
+    "classic",
+]
+DETAILS = [
+    "a sweetheart neckline",
+    "hand-sewn pearls",
+    "a detachable train",
+    "sheer sleeves",
+    "a low back",
+    "a cinched waist",
+    "scalloped edges",
+    "a flowing skirt",
+    "covered buttons",
+    "a high collar",
+]
+SEASONS = ["Spring", "Summer", "Autumn", "Winter", "Resort", "Bridal"]
+OCCASIONS = ["Wedding", "Engagement", "Henna", "Graduation", "Gala", "Photoshoot"]
+TIERS = ["Essential", "Classic", "Signature", "Premium", "Couture"]
+FEATURES = [
+    "Personal stylist",
+    "Two fittings",
+    "Free alterations",
+    "Accessories included",
+    "Home delivery",
+    "Steaming and pressing",
+    "Makeup consultation",
+    "Priority booking",
+]
+FIRST_NAMES = ["Amira", "Lina", "Sara", "Maya", "Nour", "Hana", "Rania", "Dina"]
+LAST_NAMES = ["Haddad", "Khalil", "Mansour", "Saleh", "Nasser", "Aziz", "Farah"]
+PRAISE = [
+    "The fit was perfect",
+    "Everyone asked where my dress was from",
+    "The team was patient and kind",
+    "Delivery was right on time",
+    "The fabric feels luxurious",
+    "Alterations were quick and precise",
+]
+
+CATALOG_TABLES = ("suite", "collections", "items", "packages", "testimonials")
+
+SUITE_COLUMNS = ("id", "name", "description", "is_active", "created_at", "updated_at")
+COLLECTION_COLUMNS = (
+    "id",
+    "name",
+    "description",
+    "is_active",
+    "display_order",
+    "suite_id",
+    "created_at",
+    "updated_at",
+)
+ITEM_COLUMNS = (
+    "id",
+    "name",
+    "description",
+    "price",
+    "images",
+    "colors",
+    "sizes",
+    "fabric",
+    "fabric_composition",
+    "category",
+    "collection_id",
+    "created_at",
+    "updated_at",
+)
+PACKAGE_COLUMNS = (
+    "id",
+    "name",
+    "price",
+    "description",
+    "features",
+    "is_active",
+    "is_popular",
+    "display_order",
+    "created_at",
+    "updated_at",
+)
+TESTIMONIAL_COLUMNS = (
+    "id",
+    "client_name",
+    "review_text",
+    "rating",
+    "display_order",
+    "created_at",
+    "updated_at",
+)
+
+
+class CatalogGenerator:
+    """Deterministic rows for every catalog table, drawn from one seed."""
+
+    def __init__(self, seed: int, categories: Sequence[str]):
+        self.rng = random.Random(seed)
+        self.categories = list(categories)
+        self.now = datetime.now(timezone.utc)
+
+    def new_id(self) -> uuid.UUID:
+        return uuid.UUID(int=self.rng.getrandbits(128), version=4)
+
+    def timestamps(self) -> Tuple[datetime, datetime]:
+        created = self.now - timedelta(seconds=self.rng.randrange(365 * 86400))
+        updated = created + timedelta(seconds=self.rng.randrange(30 * 86400))
+        return created, min(updated, self.now)
+
+    def price(self, low: int, high: int) -> Decimal:
+        return Decimal(self.rng.randrange(low * 100, high * 100)) / 100
+
+    def suites(self, count: int) -> List[tuple]:
+        rows = []
+        for n in range(1, count + 1):
+            season = SEASONS[n % len(SEASONS)]
+            rows.append(
+                (
+                    self.new_id(),
+                    f"{season} {2000 + n}",
+                    f"The {season.lower()} line, edition {n}.",
+                    True,
+                    *self.timestamps(),
+                )
+            )
+        return rows
+
+    def collections(self, count: int, suite_ids: Sequence[uuid.UUID]) -> List[tuple]:
+        rows = []
+        for n in range(1, count + 1):
+            style = self.rng.choice(STYLES)
+            fabric = self.rng.choice(list(FABRICS))
+            rows.append(
+                (
+                    self.new_id(),
+                    f"{style.capitalize()} {fabric} {n}",
+                    f"{style.capitalize()} pieces in {fabric}.",
+                    self.rng.random() > 0.05,
+                    n,
+                    suite_ids[n % len(suite_ids)],
+                    *self.timestamps(),
+                )
+            )
+        return rows
+
+    def items(self, count: int, collection_ids: Sequence[uuid.UUID]) -> Iterator[tuple]:
+        rng = self.rng
+        for n in range(1, count + 1):
+            item_id = self.new_id()
+            style = rng.choice(STYLES)
+            garment = rng.choice(GARMENTS)
+            fabric = rng.choice(list(FABRICS))
+            colors = rng.sample(COLORS, rng.randint(1, 4))
+            first = rng.randrange(len(SIZES) - 1)
+            sizes = SIZES[first : rng.randint(first + 1, len(SIZES))]
+            images = [
+                f"/static/images/items/{item_id}-{i}.jpg"
+                for i in range(rng.randint(1, 5))
+            ]
+            yield (
+                item_id,
+                f"{style.capitalize()} {fabric} {garment} {n}",
+                f"{style.capitalize()} {fabric} {garment} in {colors[0]} "
+                f"with {rng.choice(DETAILS)}.",
+                self.price(40, 4000),
+                images,
+                colors,
+                sizes,
+                fabric,
+                FABRICS[fabric],
+                rng.choice(self.categories) if self.categories else None,
+                rng.choice(collection_ids),
+                *self.timestamps(),
+            )
+
+    def packages(self, count: int) -> List[tuple]:
+        rows = []
+        for n in range(1, count + 1):
+            tier = TIERS[n % len(TIERS)]
+            occasion = OCCASIONS[n % len(OCCASIONS)]
+            rows.append(
+                (
+                    self.new_id(),
+                    f"{tier} {occasion} Package {n}",
+                    self.price(100, 10000),
+                    f"{tier} styling for your {occasion.lower()}.",
+                    self.rng.sample(FEATURES, self.rng.randint(2, 6)),
+                    self.rng.random() > 0.1,
+                    self.rng.random() < 0.2,
+                    n,
+                    *self.timestamps(),
+                )
+            )
+        return rows
+
+    def testimonials(self, count: int) -> List[tuple]:
+        rows = []
+        for n in range(1, count + 1):
+            name = f"{self.rng.choice(FIRST_NAMES)} {self.rng.choice(LAST_NAMES)} {n}"
+            review = ". ".join(self.rng.sample(PRAISE, self.rng.randint(1, 3))) + "."
+            rows.append(
+                (
+                    self.new_id(),
+                    name,
+                    review,
+                    self.rng.choices([3, 4, 5], weights=[1, 3, 6])[0],
+                    n,
+                    *self.timestamps(),
+                )
+            )
+        return rows
+
+
+def _batches(rows: Iterator[tuple], size: int) -> Iterator[List[tuple]]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--items", type=int, default=10000)
+    parser.add_argument(
+        "--collections", type=int, help="default: one per 250 items, at least 5"
+    )
+    parser.add_argument(
+        "--suites", type=int, help="default: one per 10 collections, at least 2"
+    )
+    parser.add_argument("--packages", type=int, default=40)
+    parser.add_argument(
+        "--testimonials", type=int, help="default: one per 500 items, at least 50"
+    )
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument(
+        "--batch-size", type=int, default=50000, help="item rows per COPY"
+    )
+    parser.add_argument(
+        "--reset",
+        action="store_true",
+        help="delete the existing catalog first (required when it is not empty)",
+    )
+    return parser.parse_args()
+
+
+async def main() -> int:
+    args = parse_args()
+    collections = args.collections or max(5, args.items // 250)
+    suites = args.suites or max(2, collections // 10)
+    testimonials = args.testimonials or max(50, args.items // 500)
+    started = time.perf_counter()
+
+    async with engine.begin() as conn:
+        if args.reset:
+            await conn.execute(text(f"TRUNCATE {', '.join(CATALOG_TABLES)} CASCADE"))
+        else:
+            existing = (await conn.execute(text("SELECT count(*) FROM items"))).scalar()
+            if existing:
+                print(
+                    f"The database already has {existing} items; "
+                    "pass --reset to replace the catalog.",
+                    file=sys.stderr,
+                )
+                return 1
+
+        labels = await conn.execute(
+            text("SELECT unnest(enum_range(NULL::categoryenum))::text")
+        )
+        # The items column stores CategoryEnum names, like the ORM writes them
+        categories = set(labels.scalars())
+        generator = CatalogGenerator(
+            args.seed, [m.name for m in CategoryEnum if m.name in categories]
+        )
+
+        raw = await conn.get_raw_connection()
+        copy = raw.driver_connection.copy_records_to_table
+
+        suite_rows = generator.suites(suites)
+        await copy("suite", records=suite_rows, columns=SUITE_COLUMNS)
+        collection_rows = generator.collections(
+            collections, [row[0] for row in suite_rows]
+        )
+        await copy("collections", records=collection_rows, columns=COLLECTION_COLUMNS)
+
+        collection_ids = [row[0] for row in collection_rows]
+        written = 0
+        for batch in _batches(
+            generator.items(args.items, collection_ids), args.batch_size
+        ):
+            await copy("items", records=batch, columns=ITEM_COLUMNS)
+            written += len(batch)
+            print(f"items: {written}/{args.items}", file=sys.stderr)
+
+        await copy(
+            "packages",
+            records=generator.packages(args.packages),
+            columns=PACKAGE_COLUMNS,
+        )
+        await copy(
+            "testimonials",
+            records=generator.testimonials(testimonials),
+            columns=TESTIMONIAL_COLUMNS,
+        )
+
+    # Fresh statistics, so the first benchmark run gets the same plans as later ones
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.execute(text(f"ANALYZE {', '.join(CATALOG_TABLES)}"))
+    await engine.dispose()
+
+    print(
+        f"{suites} suites, {collections} collections, {args.items} items, "
+        f"{args.packages} packages, {testimonials} testimonials "
+        f"in {time.perf_counter() - started:.1f}s"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,321 @@
+"""
+Replay every scenario against the API and write a JSON report:
+
+    python -m benchmarks.run --output results.json
+    python -m benchmarks.run --url http://localhost:8000 --concurrency 32
+    python -m benchmarks.run --scenario items. --read-only
+
+For each scenario the report holds p50/p95/p99 latency, throughput, status
+codes and the mean number of database queries per request. Query counts
+come from the db_queries_per_request histogram on /metrics, so they need
+METRICS_ENABLED (and PROMETHEUS_MULTIPROC_DIR when the server runs more
+than one worker); otherwise they are reported as null.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import platform
+import random
+import subprocess
+import sys
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+from fastapi.routing import APIRoute
+from prometheus_client.parser import text_string_to_metric_families
+from sqlalchemy import text
+
+from app.config import settings
+from app.database import engine
+from benchmarks.generate import CATALOG_TABLES
+from benchmarks.scenarios import SCENARIOS, Fixtures, Scenario, cleanup, load_fixtures
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+
+def percentile(ordered: List[float], p: float) -> Optional[float]:
+    """Nearest-rank percentile of an ascending list."""
+    if not ordered:
+        return None
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+
+async def query_totals(client: httpx.AsyncClient) -> Optional[Dict[str, Tuple]]:
+    """(sum, count) of db_queries_per_request by route, or None without metrics."""
+    try:
+        response = await client.get("/metrics")
+    except httpx.HTTPError:
+        return None
+    if response.status_code != 200:
+        return None
+    totals: Dict[str, list] = {}
+    for family in text_string_to_metric_families(response.text):
+        if family.name != "db_queries_per_request":
+            continue
+        for sample in family.samples:
+            route = sample.labels.get("route")
+            if sample.name.endswith("_sum"):
+                totals.setdefault(route, [0.0, 0.0])[0] = sample.value
+            elif sample.name.endswith("_count"):
+                totals.setdefault(route, [0.0, 0.0])[1] = sample.value
+    return {route: tuple(values) for route, values in totals.items()}
+
+
+def queries_per_request(before, after, route: str) -> Optional[float]:
+    if before is None or after is None:
+        return None
+    total_before, count_before = before.get(route, (0.0, 0.0))
+    total_after, count_after = after.get(route, (0.0, 0.0))
+    if count_after == count_before:
+        return None
+    return round((total_after - total_before) / (count_after - count_before), 2)
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    scenario: Scenario,
+    fixtures: Fixtures,
+    *,
+    requests: int,
+    concurrency: int,
+    warmup: int,
+    seed: int,
+) -> dict:
+    rng = random.Random(f"{seed}:{scenario.name}")
+    if scenario.max_requests is not None:
+        requests = min(requests, scenario.max_requests)
+        warmup = min(warmup, scenario.max_requests)
+    url_prefix = settings.API_V1_STR + scenario.prefix
+
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    remaining = warmup + requests
+
+    async def send(record: bool) -> None:
+        spec = scenario.build(fixtures, rng)
+        started = time.perf_counter()
+        try:
+            response = await client.request(
+                scenario.method,
+                url_prefix + spec.path,
+                params=spec.params,
+                json=spec.json,
+                files=spec.files,
+                headers=spec.headers,
+            )
+            # Read streamed bodies to the end so exports are timed in full
+            await response.aread()
+        except httpx.HTTPError as exc:
+            if record:
+                statuses[type(exc).__name__] += 1
+            return
+        elapsed = time.perf_counter() - started
+        if response.is_success and scenario.record is not None:
+            scenario.record(fixtures, response)
+        if record:
+            latencies.append(elapsed)
+            statuses[str(response.status_code)] += 1
+
+    async def worker(record: bool) -> None:
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            await send(record)
+
+    remaining = warmup
+    await asyncio.gather(*(worker(False) for _ in range(concurrency)))
+
+    route = settings.API_V1_STR + scenario.route
+    before = await query_totals(client)
+    remaining = requests
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(True) for _ in range(concurrency)))
+    wall = time.perf_counter() - started
+    after = await query_totals(client)
+
+    latencies.sort()
+    ms = [value * 1000 for value in latencies]
+    completed = len(latencies)
+    errors = sum(
+        count
+        for status, count in statuses.items()
+        if not status.isdigit() or int(status) >= 400
+    )
+    return {
+        "method": scenario.method,
+        "route": route,
+        "requests": completed,
+        "errors": errors,
+        "status_counts": dict(statuses),
+        "throughput_rps": round(completed / wall, 2) if wall else None,
+        "latency_ms": {
+            "p50": _round(percentile(ms, 50)),
+            "p95": _round(percentile(ms, 95)),
+            "p99": _round(percentile(ms, 99)),
+            "mean": _round(sum(ms) / completed) if completed else None,
+            "max": _round(ms[-1]) if ms else None,
+        },
+        "queries_per_request": queries_per_request(before, after, route),
+    }
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return None if value is None else round(value, 3)
+
+
+def uncovered_routes() -> List[str]:
+    from app.main import app
+
+    covered = {(s.method, settings.API_V1_STR + s.route) for s in SCENARIOS}
+    missing = []
+    for route in app.routes:
+        if not isinstance(route, APIRoute):
+            continue
+        if not route.path.startswith(settings.API_V1_STR):
+            continue
+        for method in route.methods:
+            if (method, route.path) not in covered:
+                missing.append(f"{method} {route.path}")
+    return sorted(missing)
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--url", help="server to load, e.g. http://localhost:8000 (default: in-process)"
+    )
+    parser.add_argument(
+        "--requests", type=int, default=200, help="measured requests per scenario"
+    )
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument(
+        "--warmup", type=int, default=20, help="unmeasured requests per scenario"
+    )
+    parser.add_argument(
+        "--scenario",
+        action="append",
+        default=[],
+        help="only run scenarios whose name starts with this (repeatable)",
+    )
+    parser.add_argument(
+        "--read-only", action="store_true", help="skip scenarios that write"
+    )
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--label", help="free-form description stored in the report")
+    parser.add_argument(
+        "--output", help="report path (default: benchmarks/results/<time>.json)"
+    )
+    return parser.parse_args()
+
+
+async def main() -> int:
+    args = parse_args()
+    scenarios = [
+        s
+        for s in SCENARIOS
+        if (not args.scenario or any(s.name.startswith(p) for p in args.scenario))
+        and not (args.read_only and s.writes)
+    ]
+    if not scenarios:
+        print("No scenario matches.", file=sys.stderr)
+        return 1
+    for route in uncovered_routes():
+        print(f"warning: no scenario for {route}", file=sys.stderr)
+
+    run_id = uuid.uuid4().hex[:8]
+    async with engine.connect() as conn:
+        fixtures = await load_fixtures(conn, run_id)
+        dataset = {
+            table: (await conn.execute(text(f"SELECT count(*) FROM {table}"))).scalar()
+            for table in CATALOG_TABLES
+        }
+
+    if args.url:
+        client = httpx.AsyncClient(
+            base_url=args.url,
+            timeout=120,
+            limits=httpx.Limits(max_connections=args.concurrency),
+        )
+    else:
+        from app.main import app
+
+        client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app, raise_app_exceptions=False),
+            base_url="http://benchmark",
+            timeout=120,
+        )
+
+    started_at = datetime.now(timezone.utc)
+    results = {}
+    try:
+        async with client:
+            for scenario in scenarios:
+                results[scenario.name] = result = await run_scenario(
+                    client,
+                    scenario,
+                    fixtures,
+                    requests=args.requests,
+                    concurrency=args.concurrency,
+                    warmup=args.warmup,
+                    seed=args.seed,
+                )
+                latency = {k: str(v) for k, v in result["latency_ms"].items()}
+                print(
+                    f"{scenario.name:34} p50 {latency['p50']:>9} ms  "
+                    f"p95 {latency['p95']:>9} ms  p99 {latency['p99']:>9} ms  "
+                    f"{str(result['throughput_rps']):>8} req/s  "
+                    f"queries {result['queries_per_request']}  "
+                    f"errors {result['errors']}",
+                    file=sys.stderr,
+                )
+    finally:
+        async with engine.begin() as conn:
+            await cleanup(conn, run_id)
+        await engine.dispose()
+
+    report = {
+        "meta": {
+            "label": args.label,
+            "started_at": started_at.isoformat(),
+            "commit": git_commit(),
+            "target": args.url or "in-process",
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "warmup": args.warmup,
+            "seed": args.seed,
+            "python": platform.python_version(),
+            "dataset": dataset,
+        },
+        "scenarios": results,
+    }
+    if args.output:
+        output = Path(args.output)
+    else:
+        RESULTS_DIR.mkdir(exist_ok=True)
+        output = RESULTS_DIR / f"{started_at:%Y%m%dT%H%M%S}.json"
+    output.write_text(json.dumps(report, indent=2) + "\n")
+    print(f"Report written to {output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
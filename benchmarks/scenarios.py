@@ -0,0 +1,598 @@
+"""
+One scenario per route in app/api. Each scenario builds a request from
+fixtures sampled out of the database, so repeated requests spread over the
+catalog instead of hitting a single cached row.
+
+Write scenarios create their own ``bench-<run id>-<n>`` rows, update and
+delete those again, and anything left over is removed by ``cleanup``.
+"""
+
+import io
+import itertools
+import json
+import random
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+import httpx
+from PIL import Image
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from benchmarks.generate import COLORS, FABRICS, GARMENTS, SIZES, STYLES
+
+SEARCH_WORDS = STYLES + GARMENTS + list(FABRICS)
+
+
+class RequestSpec(NamedTuple):
+    # Relative to the scenario's resource, e.g. "/search" for /items/search
+    path: str
+    params: Optional[Dict[str, Any]] = None
+    json: Any = None
+    files: Optional[Dict[str, Any]] = None
+    headers: Optional[Dict[str, str]] = None
+
+
+@dataclass
+class Fixtures:
+    run_id: str
+    item_ids: List[str]
+    collection_ids: List[str]
+    collection_names: List[str]
+    suite_names: List[str]
+    package_ids: List[str]
+    testimonial_ids: List[str]
+    client_names: List[str]
+    # ids created by write scenarios, for the update and delete scenarios
+    created: Dict[str, List[str]] = field(default_factory=dict)
+    counter: Any = field(default_factory=itertools.count)
+
+    def bench_name(self) -> str:
+        return f"bench-{self.run_id}-{next(self.counter)}"
+
+    def take_created(self, pool: str) -> str:
+        ids = self.created.get(pool)
+        # Nothing left to delete: a missing id still exercises the route
+        return ids.pop() if ids else str(uuid.uuid4())
+
+    def pick_created(self, pool: str, rng: random.Random) -> str:
+        ids = self.created.get(pool)
+        return rng.choice(ids) if ids else str(uuid.uuid4())
+
+
+async def load_fixtures(
+    conn: AsyncConnection, run_id: str, sample: int = 500
+) -> Fixtures:
+    async def column(query: str) -> List[str]:
+        rows = await conn.execute(text(query), {"sample": sample})
+        return [str(value) for value in rows.scalars()]
+
+    return Fixtures(
+        run_id=run_id,
+        item_ids=await column("SELECT id FROM items ORDER BY random() LIMIT :sample"),
+        collection_ids=await column(
+            "SELECT id FROM collections ORDER BY random() LIMIT :sample"
+        ),
+        collection_names=await column(
+            "SELECT name FROM collections ORDER BY random() LIMIT :sample"
+        ),
+        suite_names=await column(
+            "SELECT name FROM suite ORDER BY random() LIMIT :sample"
+        ),
+        package_ids=await column(
+            "SELECT id FROM packages ORDER BY random() LIMIT :sample"
+        ),
+        testimonial_ids=await column(
+            "SELECT id FROM testimonials ORDER BY random() LIMIT :sample"
+        ),
+        client_names=await column(
+            "SELECT client_name FROM testimonials ORDER BY random() LIMIT :sample"
+        ),
+    )
+
+
+async def cleanup(conn: AsyncConnection, run_id: str) -> None:
+    """Delete every row the write scenarios of run_id created."""
+    pattern = f"bench-{run_id}-%"
+    for table, column in (
+        ("items", "name"),
+        ("collections", "name"),
+        ("suite", "name"),
+        ("packages", "name"),
+        ("testimonials", "client_name"),
+    ):
+        await conn.execute(
+            text(f"DELETE FROM {table} WHERE {column} LIKE :pattern"),
+            {"pattern": pattern},
+        )
+
+
+@dataclass
+class Scenario:
+    name: str
+    method: str
+    # Route template below API_V1_STR, as reported in the route metrics label
+    route: str
+    build: Callable[[Fixtures, random.Random], RequestSpec]
+    # Called with every successful response, e.g. to remember created ids
+    record: Optional[Callable[[Fixtures, httpx.Response], None]] = None
+    writes: bool = False
+    max_requests: Optional[int] = None
+
+    @property
+    def prefix(self) -> str:
+        return "/" + self.route.split("/")[1]
+
+
+def _remember(pool: str) -> Callable[[Fixtures, httpx.Response], None]:
+    def record(fixtures: Fixtures, response: httpx.Response) -> None:
+        fixtures.created.setdefault(pool, []).append(response.json()["id"])
+
+    return record
+
+
+def _remember_batch(pool: str) -> Callable[[Fixtures, httpx.Response], None]:
+    def record(fixtures: Fixtures, response: httpx.Response) -> None:
+        fixtures.created.setdefault(pool, []).extend(
+            result["id"]
+            for result in response.json()["results"]
+            if result["status"] == "created"
+        )
+
+    return record
+
+
+def _batch(fixtures: Fixtures, pool: str, create: Callable[[], dict]) -> RequestSpec:
+    # Create ten rows and delete the ten created by the previous request
+    previous = fixtures.created.get(pool, [])
+    deletes = [previous.pop() for _ in range(min(10, len(previous)))]
+    operations = [{"op": "create", "data": create()} for _ in range(10)]
+    operations += [{"op": "delete", "id": row_id} for row_id in deletes]
+    return RequestSpec("/batch", json={"operations": operations})
+
+
+def _item_body(fixtures: Fixtures, rng: random.Random) -> dict:
+    fabric = rng.choice(list(FABRICS))
+    return {
+        "name": fixtures.bench_name(),
+        "description": f"{rng.choice(STYLES)} {fabric} {rng.choice(GARMENTS)}",
+        "price": round(rng.uniform(40, 4000), 2),
+        "images": [],
+        "colors": rng.sample(COLORS, 2),
+        "sizes": rng.sample(SIZES, 2),
+        "fabric": fabric,
+        "fabric_composition": FABRICS[fabric],
+        "collection_id": rng.choice(fixtures.collection_ids),
+    }
+
+
+def _import_file(fixtures: Fixtures, rng: random.Random) -> RequestSpec:
+    lines = []
+    for _ in range(100):
+        row = _item_body(fixtures, rng)
+        row.pop("collection_id")
+        row["collection_name"] = rng.choice(fixtures.collection_names)
+        lines.append(json.dumps(row))
+    body = ("\n".join(lines) + "\n").encode()
+    return RequestSpec(
+        "/import",
+        params={"dry_run": "true", "format": "ndjson"},
+        files={"file": ("bench.ndjson", body, "application/x-ndjson")},
+    )
+
+
+def _image_file(rng: random.Random) -> Dict[str, Any]:
+    # A small photo-sized JPEG; a new colour each time, so it is stored anew
+    colour = tuple(rng.randrange(256) for _ in range(3))
+    buffer = io.BytesIO()
+    Image.new("RGB", (640, 480), colour).save(buffer, "JPEG", quality=85)
+    return {"file": ("bench.jpg", buffer.getvalue(), "image/jpeg")}
+
+
+def _brochure_file(rng: random.Random) -> Dict[str, Any]:
+    # Only the leading bytes are checked; the rest is a brochure-sized body
+    body = b"%PDF-1.4\n" + rng.randbytes(512 * 1024)
+    return {"file": ("bench.pdf", body, "application/pdf")}
+
+
+def _facet_params(rng: random.Random) -> dict:
+    params: Dict[str, Any] = {"limit": 24}
+    if rng.random() < 0.6:
+        params["colors"] = rng.sample(COLORS, rng.randint(1, 2))
+    if rng.random() < 0.4:
+        params["sizes"] = rng.sample(SIZES, 1)
+    if rng.random() < 0.3:
+        params["fabric"] = rng.sample(list(FABRICS), 1)
+    if rng.random() < 0.3:
+        params["price_max"] = rng.choice([100, 500, 1000])
+    return params
+
+
+def _paged(rng: random.Random, order_by: str = "-created_at") -> dict:
+    return {"skip": 24 * rng.randrange(10), "limit": 24, "order_by": order_by}
+
+
+SCENARIOS: List[Scenario] = [
+    # items
+    Scenario(
+        "items.list",
+        "GET",
+        "/items/",
+        lambda f, rng: RequestSpec(
+            "/", params=_paged(rng, rng.choice(["-created_at", "price", "name"]))
+        ),
+    ),
+    Scenario(
+        "items.list_sparse",
+        "GET",
+        "/items/",
+        lambda f, rng: RequestSpec(
+            "/", params={**_paged(rng), "fields": "id,name,price,images[0]"}
+        ),
+    ),
+    Scenario(
+        "items.search",
+        "GET",
+        "/items/search",
+        lambda f, rng: RequestSpec(
+            "/search", params={"q": " ".join(rng.sample(SEARCH_WORDS, 2))}
+        ),
+    ),
+    Scenario(
+        "items.facets",
+        "GET",
+        "/items/facets",
+        lambda f, rng: RequestSpec("/facets", params=_facet_params(rng)),
+    ),
+    Scenario(
+        "items.export",
+        "GET",
+        "/items/export",
+        lambda f, rng: RequestSpec("/export", params={"format": "ndjson"}),
+        max_requests=5,
+    ),
+    Scenario(
+        "items.get",
+        "GET",
+        "/items/{item_id}",
+        lambda f, rng: RequestSpec(f"/{rng.choice(f.item_ids)}"),
+    ),
+    Scenario(
+        "items.get_by_slug",
+        "GET",
+        "/items/slug/{slug}",
+        lambda f, rng: RequestSpec(f"/slug/{rng.choice(f.item_ids)}"),
+    ),
+    Scenario(
+        "items.list_by_collection",
+        "GET",
+        "/items/collection/{collection_id}",
+        lambda f, rng: RequestSpec(
+            f"/collection/{rng.choice(f.collection_ids)}", params=_paged(rng)
+        ),
+    ),
+    Scenario(
+        "items.import_dry_run",
+        "POST",
+        "/items/import",
+        _import_file,
+        max_requests=20,
+    ),
+    Scenario(
+        "items.create",
+        "POST",
+        "/items/",
+        lambda f, rng: RequestSpec("/", json=_item_body(f, rng)),
+        record=_remember("items"),
+        writes=True,
+    ),
+    Scenario(
+        "items.batch",
+        "POST",
+        "/items/batch",
+        lambda f, rng: _batch(f, "items.batch", lambda: _item_body(f, rng)),
+        record=_remember_batch("items.batch"),
+        writes=True,
+    ),
+    Scenario(
+        "items.update",
+        "PUT",
+        "/items/{item_id}",
+        lambda f, rng: RequestSpec(
+            f"/{f.pick_created('items', rng)}",
+            json={"price": round(rng.uniform(40, 4000), 2)},
+        ),
+        writes=True,
+    ),
+    Scenario(
+        "items.upload_image",
+        "POST",
+        "/items/{item_id}/images",
+        lambda f, rng: RequestSpec(
+            f"/{f.pick_created('items', rng)}/images", files=_image_file(rng)
+        ),
+        writes=True,
+        max_requests=20,
+    ),
+    Scenario(
+        "items.derive_images",
+        "POST",
+        "/items/{item_id}/images/derivatives",
+        lambda f, rng: RequestSpec(
+            f"/{f.pick_created('items', rng)}/images/derivatives",
+            params={"force": "true"},
+        ),
+        writes=True,
+        max_requests=20,
+    ),
+    Scenario(
+        "items.delete",
+        "DELETE",
+        "/items/{item_id}",
+        lambda f, rng: RequestSpec(f"/{f.take_created('items')}"),
+        writes=True,
+    ),
+    # collections
+    Scenario(
+        "collections.list",
+        "GET",
+        "/collections/",
+        lambda f, rng: RequestSpec("/", params={"limit": 50}),
+    ),
+    Scenario(
+        "collections.list_sparse",
+        "GET",
+        "/collections/",
+        lambda f, rng: RequestSpec(
+            "/",
+            params={"limit": 10, "fields": "id,name,suite_name,items.id,items.name"},
+        ),
+    ),
+    Scenario(
+        "collections.list_by_suite",
+        "GET",
+        "/collections/suite/{suite_name}",
+        lambda f, rng: RequestSpec(f"/suite/{rng.choice(f.suite_names)}"),
+    ),
+    Scenario(
+        "collections.get",
+        "GET",
+        "/collections/{collection_name}",
+        lambda f, rng: RequestSpec(f"/{rng.choice(f.collection_names)}"),
+    ),
+    Scenario(
+        "collections.create",
+        "POST",
+        "/collections/",
+        lambda f, rng: RequestSpec("/", json={"name": f.bench_name()}),
+        record=_remember("collections"),
+        writes=True,
+    ),
+    Scenario(
+        "collections.batch",
+        "POST",
+        "/collections/batch",
+        lambda f, rng: _batch(f, "collections.batch", lambda: {"name": f.bench_name()}),
+        record=_remember_batch("collections.batch"),
+        writes=True,
+    ),
+    Scenario(
+        "collections.update",
+        "PUT",
+        "/collections/{collection_id}",
+        lambda f, rng: RequestSpec(
+            f"/{f.pick_created('collections', rng)}", json={"description": "updated"}
+        ),
+        writes=True,
+    ),
+    Scenario(
+        "collections.delete",
+        "DELETE",
+        "/collections/{collection_id}",
+        lambda f, rng: RequestSpec(f"/{f.take_created('collections')}"),
+        writes=True,
+    ),
+    # packages
+    Scenario(
+        "packages.list",
+        "GET",
+        "/packages/",
+        lambda f, rng: RequestSpec("/"),
+    ),
+    Scenario(
+        "packages.search",
+        "GET",
+        "/packages/search",
+        lambda f, rng: RequestSpec(
+            "/search", params={"name": rng.choice(["wedding", "classic", "gala"])}
+        ),
+    ),
+    Scenario(
+        "packages.export",
+        "GET",
+        "/packages/export",
+        lambda f, rng: RequestSpec("/export", params={"format": "csv"}),
+        max_requests=20,
+    ),
+    Scenario(
+        "packages.get",
+        "GET",
+        "/packages/{package_id}",
+        lambda f, rng: RequestSpec(f"/{rng.choice(f.package_ids)}"),
+    ),
+    Scenario(
+        "packages.create",
+        "POST",
+        "/packages/",
+        lambda f, rng: RequestSpec(
+            "/", json={"name": f.bench_name(), "price": 250, "features": ["Fitting"]}
+        ),
+        record=_remember("packages"),
+        writes=True,
+    ),
+    Scenario(
+        "packages.batch",
+        "POST",
+        "/packages/batch",
+        lambda f, rng: _batch(
+            f,
+            "packages.batch",
+            lambda: {"name": f.bench_name(), "price": 250, "features": ["Fitting"]},
+        ),
+        record=_remember_batch("packages.batch"),
+        writes=True,
+    ),
+    Scenario(
+        "packages.update",
+        "PUT",
+        "/packages/{package_id}",
+        lambda f, rng: RequestSpec(
+            f"/{f.pick_created('packages', rng)}", json={"price": 300}
+        ),
+        writes=True,
+    ),
+    # On the packages of packages.batch: the last ten it creates are kept
+    Scenario(
+        "packages.upload_brochure",
+        "POST",
+        "/packages/{package_id}/brochure",
+        lambda f, rng: RequestSpec(
+            f"/{f.pick_created('packages.batch', rng)}/brochure",
+            files=_brochure_file(rng),
+        ),
+        record=_remember("brochures"),
+        writes=True,
+        max_requests=20,
+    ),
+    Scenario(
+        "packages.download_brochure",
+        "GET",
+        "/packages/{package_id}/brochure",
+        lambda f, rng: RequestSpec(f"/{f.pick_created('brochures', rng)}/brochure"),
+        writes=True,
+    ),
+    Scenario(
+        "packages.download_brochure_range",
+        "GET",
+        "/packages/{package_id}/brochure",
+        lambda f, rng: RequestSpec(
+            f"/{f.pick_created('brochures', rng)}/brochure",
+            headers={"Range": f"bytes={64 * 1024 * rng.randrange(8)}-"},
+        ),
+        writes=True,
+    ),
+    Scenario(
+        "packages.delete",
+        "DELETE",
+        "/packages/{package_id}",
+        lambda f, rng: RequestSpec(f"/{f.take_created('packages')}"),
+        writes=True,
+    ),
+    # suites
+    Scenario(
+        "suites.list",
+        "GET",
+        "/suites/",
+        lambda f, rng: RequestSpec("/"),
+    ),
+    Scenario(
+        "suites.get_by_name",
+        "GET",
+        "/suites/name/{suite_name}",
+        lambda f, rng: RequestSpec(f"/name/{rng.choice(f.suite_names)}"),
+    ),
+    Scenario(
+        "suites.list_with_collections",
+        "GET",
+        "/suites/with-collections/",
+        lambda f, rng: RequestSpec("/with-collections/", params={"limit": 5}),
+    ),
+    Scenario(
+        "suites.create",
+        "POST",
+        "/suites/",
+        lambda f, rng: RequestSpec("/", json={"name": f.bench_name()}),
+        record=_remember("suites"),
+        writes=True,
+    ),
+    Scenario(
+        "suites.update",
+        "PUT",
+        "/suites/{suite_id}",
+        lambda f, rng: RequestSpec(
+            f"/{f.pick_created('suites', rng)}", json={"description": "updated"}
+        ),
+        writes=True,
+    ),
+    Scenario(
+        "suites.delete",
+        "DELETE",
+        "/suites/{suite_id}",
+        lambda f, rng: RequestSpec(f"/{f.take_created('suites')}"),
+        writes=True,
+    ),
+    # testimonials
+    Scenario(
+        "testimonials.list",
+        "GET",
+        "/testimonials/",
+        lambda f, rng: RequestSpec("/", params={"limit": 20}),
+    ),
+    Scenario(
+        "testimonials.get",
+        "GET",
+        "/testimonials/{testimonial_id}",
+        lambda f, rng: RequestSpec(f"/{rng.choice(f.testimonial_ids)}"),
+    ),
+    Scenario(
+        "testimonials.get_by_client_name",
+        "GET",
+        "/testimonials/client/{client_name}",
+        lambda f, rng: RequestSpec(f"/client/{rng.choice(f.client_names)}"),
+    ),
+    Scenario(
+        "testimonials.count",
+        "GET",
+        "/testimonials/stats/count",
+        lambda f, rng: RequestSpec("/stats/count"),
+    ),
+    Scenario(
+        "testimonials.create",
+        "POST",
+        "/testimonials/",
+        lambda f, rng: RequestSpec(
+            "/",
+            json={
+                "client_name": f.bench_name(),
+                "review_text": "Benchmark testimonial text.",
+                "rating": 5,
+            },
+        ),
+        record=_remember("testimonials"),
+        writes=True,
+    ),
+    Scenario(
+        "testimonials.update",
+        "PUT",
+        "/testimonials/{testimonial_id}",
+        lambda f, rng: RequestSpec(
+            f"/{f.pick_created('testimonials', rng)}", json={"rating": 4}
+        ),
+        writes=True,
+    ),
+    Scenario(
+        "testimonials.delete",
+        "DELETE",
+        "/testimonials/{testimonial_id}",
+        lambda f, rng: RequestSpec(f"/{f.take_created('testimonials')}"),
+        writes=True,
+    ),
+    # catalog
+    Scenario(
+        "catalog.tree",
+        "GET",
+        "/catalog/tree",
+        lambda f, rng: RequestSpec("/tree"),
+    ),
+]
@@ -0,0 +1,135 @@
+"""
+Measure the CPU cost of rendering large list pages, per request:
+
+    python -m benchmarks.serialization
+    python -m benchmarks.serialization --items 1000 --repeat 50
+
+Each page is rendered the way FastAPI does it for the route (validate
+against the response_model, serialize, stdlib json) and with
+app.api.responses.model_response (TypeAdapter validation once, orjson).
+Pages are built from synthetic ORM objects, so no database is needed.
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from types import SimpleNamespace
+from typing import Any, Callable, List
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute, serialize_response
+
+from app.api.responses import model_response
+from app.config import settings
+from app.models.collection import Collection
+from app.models.item import CategoryEnum, Item
+from app.schemas.item import ItemResponse, ItemSummary
+from benchmarks.generate import ITEM_COLUMNS, CatalogGenerator
+
+
+def build_items(count: int, seed: int) -> List[Item]:
+    generator = CatalogGenerator(seed, [m.name for m in CategoryEnum])
+    collection = Collection(id=generator.new_id(), name="Benchmark collection")
+    items = []
+    for row in generator.items(count, [collection.id]):
+        values = dict(zip(ITEM_COLUMNS, row))
+        values["category"] = CategoryEnum[values["category"]]
+        item = Item(**values)
+        item.collection = collection
+        items.append(item)
+    return items
+
+
+def summaries_of(items: List[Item]) -> List[SimpleNamespace]:
+    """Stand-ins for the rows of ItemCRUD.get_summaries."""
+    return [
+        SimpleNamespace(
+            id=item.id,
+            name=item.name,
+            price=item.price,
+            category=item.category,
+            cover_image=item.images[0] if item.images else None,
+            collection_id=item.collection_id,
+            collection_name=item.collection_name,
+            created_at=item.created_at,
+            updated_at=item.updated_at,
+        )
+        for item in items
+    ]
+
+
+def route_for(path: str) -> APIRoute:
+    from app.main import app
+
+    for route in app.routes:
+        if (
+            isinstance(route, APIRoute)
+            and route.path == path
+            and "GET" in route.methods
+        ):
+            return route
+    raise LookupError(path)
+
+
+def cpu_ms(render: Callable[[], bytes], repeat: int) -> float:
+    render()  # warm up caches (TypeAdapter, pydantic validators)
+    started = time.process_time()
+    for _ in range(repeat):
+        render()
+    return (time.process_time() - started) / repeat * 1000
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--items", type=int, default=1000, help="items per page")
+    parser.add_argument("--repeat", type=int, default=30, help="renders per path")
+    parser.add_argument("--seed", type=int, default=1)
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    settings.FAST_JSON_RESPONSES = True
+    items = build_items(args.items, args.seed)
+    route = route_for(f"{settings.API_V1_STR}/items/")
+    loop = asyncio.new_event_loop()
+    pages = [
+        ("items view=full", items, List[ItemResponse]),
+        ("items view=summary", summaries_of(items), List[ItemSummary]),
+    ]
+
+    print(
+        f"{args.items} items per page, CPU ms per request "
+        f"(mean of {args.repeat} renders)\n"
+    )
+    print(f"{'page':20} {'response_model':>15} {'model_response':>15} {'saved':>7}")
+    for name, content, page_type in pages:
+
+        def default_path(content: Any = content) -> bytes:
+            value = loop.run_until_complete(
+                serialize_response(
+                    field=route.secure_cloned_response_field,
+                    response_content=content,
+                )
+            )
+            return JSONResponse(value).body
+
+        def fast_path(content: Any = content, page_type: Any = page_type) -> bytes:
+            return model_response(page_type, content).body
+
+        if json.loads(default_path()) != json.loads(fast_path()):
+            print(f"{name}: the two paths render different JSON", file=sys.stderr)
+            return 1
+        before = cpu_ms(default_path, args.repeat)
+        after = cpu_ms(fast_path, args.repeat)
+        print(
+            f"{name:20} {before:>15.1f} {after:>15.1f} "
+            f"{(before - after) / before * 100:>6.0f}%"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
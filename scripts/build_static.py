@@ -0,0 +1,83 @@
+"""
+Prepare static/ for deployment: write pre-compressed .br and .gz siblings of
+compressible assets, and the manifest of fingerprinted names that app.assets
+serves with immutable caching:
+
+    python -m scripts.build_static
+
+Run it again whenever files under static/ change: siblings older than their
+file are skipped, but an outdated manifest keeps handing out old fingerprints.
+"""
+
+import argparse
+import gzip
+import json
+import os
+import sys
+from mimetypes import guess_type
+from pathlib import Path
+
+from app.assets import MANIFEST_NAME, PRECOMPRESSED, build_manifest, is_asset
+from app.compression import COMPRESSIBLE_TYPES, brotli
+from app.config import settings
+from app.images import STATIC_DIR
+
+# Keep a sibling only when it saves at least this fraction of the file
+MIN_SAVING = 0.1
+
+
+def compressors() -> dict:
+    result = {"gzip": lambda data: gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        result["br"] = lambda data: brotli.compress(data, quality=11)
+    return result
+
+
+def precompress(directory: Path) -> int:
+    written = 0
+    codings = compressors()
+    for path in sorted(directory.rglob("*")):
+        if not path.is_file() or not is_asset(path, directory):
+            continue
+        media_type = guess_type(path.name)[0] or ""
+        if not media_type.startswith(COMPRESSIBLE_TYPES):
+            continue
+        data = path.read_bytes()
+        if len(data) < settings.COMPRESSION_MIN_SIZE:
+            continue
+        for coding, compress in codings.items():
+            sibling = path.with_name(path.name + PRECOMPRESSED[coding])
+            compressed = compress(data)
+            if len(compressed) > len(data) * (1 - MIN_SAVING):
+                sibling.unlink(missing_ok=True)
+                continue
+            sibling.write_bytes(compressed)
+            written += 1
+    return written
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--no-compress",
+        action="store_true",
+        help="only write the manifest",
+    )
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    siblings = 0 if args.no_compress else precompress(STATIC_DIR)
+    manifest = build_manifest(STATIC_DIR)
+    path = STATIC_DIR / MANIFEST_NAME
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_text(json.dumps(manifest, indent=2, sort_keys=True) + "\n")
+    os.replace(tmp, path)
+
+    print(f"{len(manifest)} assets in {path}, {siblings} pre-compressed siblings")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
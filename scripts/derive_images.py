@@ -0,0 +1,59 @@
+"""
+Render the image derivatives (resized WebP/JPEG copies and a blurhash) of
+every item with images under /static, the command-line counterpart of
+POST /items/{id}/images/derivatives:
+
+    python -m scripts.derive_images
+    python -m scripts.derive_images --force
+
+Originals that are unchanged since their last run are skipped unless
+--force is given.
+"""
+
+import argparse
+import asyncio
+import sys
+
+from sqlalchemy import select
+
+from app.crud import item
+from app.crud.item import first_image
+from app.database import AsyncSessionLocal, engine
+from app.images import image_pipeline
+from app.models.item import Item
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="render unchanged originals as well",
+    )
+    return parser.parse_args()
+
+
+async def main() -> int:
+    args = parse_args()
+    updated = 0
+    async with AsyncSessionLocal() as db:
+        stmt = select(Item.id).filter(first_image().is_not(None)).order_by(Item.id)
+        item_ids = (await db.execute(stmt)).scalars().all()
+        for item_id in item_ids:
+            db_obj = await db.get(Item, item_id)
+            variants = await image_pipeline.derive_all(
+                db_obj.images, db_obj.image_variants, force=args.force
+            )
+            if variants != db_obj.image_variants:
+                await item.set_image_variants(db, db_obj=db_obj, variants=variants)
+                updated += 1
+            db.expunge(db_obj)
+    image_pipeline.shutdown()
+    await engine.dispose()
+
+    print(f"{len(item_ids)} items with images, {updated} updated")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,193 @@
+"""
+EXPLAIN the hot catalog queries issued by app/crud and check that each one
+is answered through the index that was added for it.
+
+Run against a migrated database:
+
+    python -m scripts.explain_hot_queries
+
+Sequential scans are disabled for the check so a near-empty development
+database still reveals whether an index is usable; on a large table the
+planner makes the same choice on its own.
+"""
+
+import asyncio
+import json
+import sys
+import uuid
+from datetime import datetime, timezone
+from decimal import Decimal
+from types import SimpleNamespace
+from typing import Any, Awaitable, Callable, Iterator, List, Tuple
+
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.cache import read_cache
+from app.crud import collection, item, package, testimonial
+from app.crud.pagination import encode_cursor
+from app.database import AsyncSessionLocal, engine
+
+
+def _cursor(order_by: str, **values: Any) -> str:
+    return encode_cursor(SimpleNamespace(id=uuid.uuid4(), **values), order_by)
+
+
+NOW = datetime.now(timezone.utc)
+
+# (label, CRUD call, index expected somewhere in its plans)
+HOT_QUERIES: List[Tuple[str, Callable[[AsyncSession], Awaitable[Any]], str]] = [
+    (
+        "item.get_all (-created_at)",
+        lambda db: item.get_all(db),
+        "ix_items_created_at",
+    ),
+    (
+        "item.get_all (cursor)",
+        lambda db: item.get_all(db, cursor=_cursor("-created_at", created_at=NOW)),
+        "ix_items_created_at",
+    ),
+    (
+        "item.get_by_collection",
+        lambda db: item.get_by_collection(db, collection_id=uuid.uuid4()),
+        "ix_items_collection_id_created_at",
+    ),
+    (
+        "item.get_by_collection (cursor)",
+        lambda db: item.get_by_collection(
+            db,
+            collection_id=uuid.uuid4(),
+            cursor=_cursor("-created_at", created_at=NOW),
+        ),
+        "ix_items_collection_id_created_at",
+    ),
+    (
+        "item.search",
+        lambda db: item.search(db, query="silk dress"),
+        "ix_items_search_vector",
+    ),
+    (
+        "item.get_facet_counts (colors)",
+        lambda db: item.get_facet_counts(db, colors=["red", "blue"]),
+        "ix_items_colors",
+    ),
+    (
+        "item.get_facet_counts (sizes)",
+        lambda db: item.get_facet_counts(db, sizes=["S"]),
+        "ix_items_sizes",
+    ),
+    (
+        "item.get_facet_counts (fabric)",
+        lambda db: item.get_facet_counts(db, fabric=["silk"]),
+        "ix_items_fabric",
+    ),
+    (
+        "item.filter (price, cursor)",
+        lambda db: item.filter(
+            db,
+            price_min=10,
+            order_by="price",
+            cursor=_cursor("price", price=Decimal("10")),
+        ),
+        "ix_items_price",
+    ),
+    (
+        "item.get_facet_counts",
+        lambda db: item.get_facet_counts(db),
+        "item_facet_counts_pkey",
+    ),
+    (
+        "collection.get_all",
+        lambda db: collection.get_all(db),
+        "ix_collections_display_order",
+    ),
+    (
+        "collection.get_summaries",
+        lambda db: collection.get_summaries(db),
+        "ix_items_collection_id_created_at",
+    ),
+    (
+        "item.get_summaries (collection)",
+        lambda db: item.get_summaries(db, collection_id=uuid.uuid4()),
+        "ix_items_collection_id_created_at",
+    ),
+    (
+        "collection.get_by_suite_name",
+        lambda db: collection.get_by_suite_name(db, suite_name="explain"),
+        "ix_collections_suite_id",
+    ),
+    (
+        "package.get_all",
+        lambda db: package.get_all(db),
+        "ix_packages_display_order",
+    ),
+    (
+        "package.search_by_name",
+        lambda db: package.search_by_name(db, name="wedding"),
+        "ix_packages_search_vector",
+    ),
+    (
+        "testimonial.search",
+        lambda db: testimonial.search(db, query="beautiful"),
+        "ix_testimonials_search_vector",
+    ),
+    (
+        "testimonial.get_all",
+        lambda db: testimonial.get_all(db),
+        "ix_testimonials_display_order",
+    ),
+    (
+        "testimonial.get_by_rating",
+        lambda db: testimonial.get_by_rating(db, min_rating=4, max_rating=5),
+        "ix_testimonials_rating",
+    ),
+]
+
+
+def _index_names(plan: dict) -> Iterator[str]:
+    if "Index Name" in plan:
+        yield plan["Index Name"]
+    for child in plan.get("Plans", []):
+        yield from _index_names(child)
+
+
+async def explain(label: str, call, expected: str) -> bool:
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    async with AsyncSessionLocal() as db:
+        await db.execute(text("SET enable_seqscan = off"))
+        event.listen(engine.sync_engine, "before_cursor_execute", record)
+        try:
+            with read_cache.bypass():
+                await call(db)
+        finally:
+            event.remove(engine.sync_engine, "before_cursor_execute", record)
+
+        used = set()
+        conn = await db.connection()
+        for statement, parameters in statements:
+            result = await conn.exec_driver_sql(
+                f"EXPLAIN (FORMAT JSON) {statement}", parameters
+            )
+            plan = result.scalar()
+            plan = json.loads(plan) if isinstance(plan, str) else plan
+            used.update(_index_names(plan[0]["Plan"]))
+        await db.rollback()
+
+    ok = expected in used
+    status = "ok  " if ok else "MISS"
+    print(f"[{status}] {label}: expected {expected}, used {sorted(used) or '-'}")
+    return ok
+
+
+async def main() -> int:
+    results = [await explain(*query) for query in HOT_QUERIES]
+    await engine.dispose()
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
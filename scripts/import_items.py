@@ -0,0 +1,61 @@
+"""
+Bulk create or update items from a CSV (with header) or NDJSON file, the
+command-line counterpart of POST /items/import:
+
+    python -m scripts.import_items season.csv
+    python -m scripts.import_items season.ndjson --dry-run
+
+Exits with status 1 when any row was rejected.
+"""
+
+import argparse
+import asyncio
+import sys
+
+from app.crud import item
+from app.database import AsyncSessionLocal, engine
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("path", help="CSV or NDJSON file to import")
+    parser.add_argument(
+        "--format",
+        choices=("csv", "ndjson"),
+        help="file format (default: from the file extension)",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="validate and merge, then roll back",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=0,
+        help="rows per COPY batch (default: IMPORT_BATCH_SIZE)",
+    )
+    return parser.parse_args()
+
+
+async def main() -> int:
+    args = parse_args()
+    fmt = args.format or ("csv" if args.path.lower().endswith(".csv") else "ndjson")
+
+    with open(args.path, encoding="utf-8-sig", newline="") as lines:
+        async with AsyncSessionLocal() as db:
+            result = await item.bulk_import(
+                db,
+                lines=lines,
+                fmt=fmt,
+                dry_run=args.dry_run,
+                batch_size=args.batch_size,
+            )
+    await engine.dispose()
+
+    print(result.model_dump_json(indent=2))
+    return 1 if result.failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))